@@ -1,5 +1,8 @@
 from .database import engine, Base, get_db
-from .models import Customer, Tire, Rack, Brand, TireSize, TireHistory
+from .models import Customer, Tire, TireItem, Rack, Brand, TireSize, TireHistory
+from . import rack_counter  # noqa: F401  (raf sayacını güncelleyen session event'leri)
+from . import data_version  # noqa: F401  (sayfa ETag'leri için tablo sürümleri)
+from . import tire_items  # noqa: F401  (tire1..tire6 kolonlarını tire_items'a yazan session event'i)
 
-__all__ = ["engine", "Base", "get_db", "Customer", "Tire", "Rack", "Brand", "TireSize", "TireHistory"]
+__all__ = ["engine", "Base", "get_db", "Customer", "Tire", "TireItem", "Rack", "Brand", "TireSize", "TireHistory"]
 
@@ -0,0 +1,181 @@
+"""
+Per-table data versions for conditional GET (ETag / 304) on the HTML pages.
+
+Her commit'te o transaction'da yazılan tabloların sürümü bir artırılır. Yazılan tablolar
+Session event'lerinden toplanır: flush edilen ORM nesneleri (tire_routes, rack_routes,
+customer_routes, web_routes formları) ve ORM üzerinden çalıştırılan toplu
+INSERT/UPDATE/DELETE'ler. Rollback olan transaction sürüm değiştirmez.
+
+Sürümler veritabanındaki `data_versions` tablosunda tutulur ve yazan transaction'ın içinde
+(commit'ten hemen önce) artırılır; böylece tüm worker'lar aynı sürümleri görür ve ETag'ler
+worker'lar arasında tutarlıdır. Bir worker kendi commit'lerinin sürümünü hemen öğrenir;
+diğer worker'ların yazmalarını tabloyu en fazla DATA_VERSION_POLL_SECONDS aralıkla okuyarak
+görür (0 = her kontrolde oku). PAGE_ETAG_TTL > 0 ise ETag ayrıca o kadar saniyede bir değişir.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Iterable
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+DATA_VERSION_TABLE = "data_versions"
+
+_PENDING_TABLES_KEY = "data_version_tables"
+_COMMITTED_VERSIONS_KEY = "data_version_committed"
+
+
+def ensure_data_versions(engine):
+    """Create the data_versions table (idempotent)"""
+    with engine.begin() as conn:
+        _ensure_table(conn)
+
+
+def _ensure_table(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+            table_name VARCHAR PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """))
+
+
+class DataVersions:
+    """Per-table version counters shared by all workers through the data_versions table"""
+
+    def __init__(self, poll_seconds: float = 1.0, ttl: float = 0.0):
+        self.poll_seconds = poll_seconds
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._refreshed_at = float("-inf")
+        self._ensured = set()
+        # Son commit'in zamanı (monotonic); bkz. app.models.read_replica
+        self.last_write_at = float("-inf")
+        # Tablo başına başka bir process'in yazmasının fark edildiği son an (monotonic)
+        self.external_write_at = {}
+
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._versions)
+
+    def refresh_due(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.poll_seconds
+
+    def refresh(self, db: Session):
+        """Pick up versions committed by other processes (reads the data_versions table)"""
+        started = time.monotonic()
+        rows = db.execute(text(f"SELECT table_name, version FROM {DATA_VERSION_TABLE}")).all()
+        self._merge(rows, local=False)
+        with self._lock:
+            self._refreshed_at = max(self._refreshed_at, started)
+
+    def refresh_if_due(self, db: Session):
+        if self.refresh_due():
+            self.refresh(db)
+
+    def changed_externally_since(self, table: str, since: float) -> bool:
+        """True if another process committed to `table` after monotonic time `since`"""
+        return self.external_write_at.get(table, float("-inf")) >= since
+
+    def _bump_in_transaction(self, conn, tables: Iterable[str]) -> list:
+        """Increment the given tables' versions in the caller's transaction; [(table, new version)]"""
+        if conn.engine.url not in self._ensured:
+            _ensure_table(conn)
+            self._ensured.add(conn.engine.url)
+        versions = []
+        # Sabit sıra: PostgreSQL'de iki transaction aynı satırları ters sırayla kilitlemesin
+        for table in sorted(tables):
+            versions.append((table, conn.execute(text(f"""
+                INSERT INTO {DATA_VERSION_TABLE} (table_name, version) VALUES (:table_name, 1)
+                ON CONFLICT (table_name) DO UPDATE SET version = {DATA_VERSION_TABLE}.version + 1
+                RETURNING version
+            """), {"table_name": table}).scalar_one()))
+        return versions
+
+    def _merge(self, versions, local: bool):
+        now = time.monotonic()
+        with self._lock:
+            for table, version in versions:
+                known = self._versions.get(table, 0)
+                if version <= known:
+                    continue
+                # Kendi commit'imiz sürümü bir artırır; daha büyük bir sıçrama arada başka
+                # bir process'in yazdığını gösterir
+                if not local or version > known + 1:
+                    self.external_write_at[table] = now
+                self._versions[table] = version
+            if local:
+                self.last_write_at = now
+
+    def etag(self, scope: str, tables: Iterable[str], params: Iterable = ()) -> str:
+        """Weak ETag from the given table versions plus request-specific `params`"""
+        parts = [scope]
+        parts.extend(f"{table}={self.version(table)}" for table in tables)
+        parts.extend(str(param) for param in params)
+        if self.ttl > 0:
+            parts.append(str(int(time.time() // self.ttl)))
+        digest = hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:20]
+        return f'W/"{digest}"'
+
+
+data_versions = DataVersions(
+    poll_seconds=float(os.getenv("DATA_VERSION_POLL_SECONDS", "1")),
+    ttl=float(os.getenv("PAGE_ETAG_TTL", "0"))
+)
+
+
+def _pending_tables(session) -> set:
+    return session.info.setdefault(_PENDING_TABLES_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    # after_flush'ta new / dirty / deleted hâlâ flush öncesi durumu gösterir
+    tables = _pending_tables(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        mapper = getattr(obj, "__mapper__", None)
+        if mapper is not None:
+            tables.update(table.name for table in mapper.tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    # query.update() / query.delete() / insert(...) flush event'lerini tetiklemez
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None and getattr(table, "name", None):
+        _pending_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_tables_in_transaction(session):
+    if session.get_nested_transaction() is not None:
+        return  # SAVEPOINT; sürüm dış transaction commit edilirken artar
+    # commit'in kendi flush'ı bu event'ten sonra çalışır; yazılan tabloları önce topla
+    session.flush()
+    tables = session.info.get(_PENDING_TABLES_KEY)
+    if tables:
+        session.info[_COMMITTED_VERSIONS_KEY] = data_versions._bump_in_transaction(session.connection(), tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_versions(session):
+    if session.get_nested_transaction() is not None:
+        return
+    session.info.pop(_PENDING_TABLES_KEY, None)
+    versions = session.info.pop(_COMMITTED_VERSIONS_KEY, None)
+    if versions:
+        data_versions._merge(versions, local=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tables(session):
+    session.info.pop(_PENDING_TABLES_KEY, None)
+    session.info.pop(_COMMITTED_VERSIONS_KEY, None)
@@ -1,7 +1,14 @@
 import os
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from .pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, track_pre_ping_failures
+from .read_replica import REPLICA, configure_read_only, replica_router
+from .sqlite_mode import WRITE_OPTION, configure_sqlite
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
@@ -9,11 +16,45 @@ if not DATABASE_URL:
     print("WARNING: DATABASE_URL is not set. Using fallback SQLite.")
     DATABASE_URL = "sqlite:///./fallback.db"
 
+# İsteğe bağlı okuma replikası; GET route'ları ve HTML sayfaları kullanır (bkz. read_replica)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+
+# Bağlantı havuzu ayarları (worker sayısına göre boyutlandırılır; bkz. GET /api/metrics/pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # saniye; havuz doluyken bağlantı bekleme süresi
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # saniye; -1 = bağlantılar yenilenmez
+# Web sayfalarının async havuzu; verilmezse sync havuz ayarları kullanılır
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+# Sorgu zaman aşımı (ms, 0 = yok). PostgreSQL statement_timeout; SQLite'ta karşılığı yok
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+def engine_options(url, pool_size: int, max_overflow: int, asynchronous: bool = False) -> dict:
+    """create_engine / create_async_engine keyword arguments for `url` from the DB_* settings"""
+    url = make_url(url)
+    options = {"echo": False, "pool_pre_ping": True, "pool_recycle": DB_POOL_RECYCLE}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Bellek içi SQLite tek bağlantılı havuz kullanır; havuz ayarları uygulanmaz
+        return options
+    options.update({
+        "poolclass": TimedAsyncAdaptedQueuePool if asynchronous else TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    })
+    if DB_STATEMENT_TIMEOUT_MS > 0 and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
 engine = create_engine(
     DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True
+    **engine_options(DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW)
 )
+track_pre_ping_failures(engine)
+configure_sqlite(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -21,6 +62,78 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Yazma işlemleri: aynı havuz, SQLite'ta transaction BEGIN IMMEDIATE ile açılır (bkz. sqlite_mode)
+write_engine = engine.execution_options(**{WRITE_OPTION: True})
+
+WriteSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=write_engine
+)
+
+# Web sayfaları (app/routes/web_routes.py) için async engine: aynı veritabanı, async sürücü
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+}
+
+
+def async_database_url(url: str):
+    """`url` with the async driver of its backend (aiosqlite / psycopg async)"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))
+
+
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    **engine_options(DATABASE_URL, DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW, asynchronous=True)
+)
+track_pre_ping_failures(async_engine.sync_engine)
+configure_sqlite(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine,
+    class_=AsyncSession
+)
+
+# Okuma replikası: birincil ile aynı havuz ayarları, bağlantılar salt okunur
+read_engine = None
+ReadSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+
+if DATABASE_READ_URL:
+    read_engine = create_engine(
+        DATABASE_READ_URL,
+        **engine_options(DATABASE_READ_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW)
+    )
+    track_pre_ping_failures(read_engine)
+    configure_sqlite(read_engine)
+    configure_read_only(read_engine)
+
+    ReadSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=read_engine
+    )
+
+    async_read_engine = create_async_engine(
+        async_database_url(DATABASE_READ_URL),
+        **engine_options(DATABASE_READ_URL, DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW, asynchronous=True)
+    )
+    track_pre_ping_failures(async_read_engine.sync_engine)
+    configure_sqlite(async_read_engine.sync_engine)
+    configure_read_only(async_read_engine.sync_engine)
+
+    AsyncReadSessionLocal = async_sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        bind=async_read_engine,
+        class_=AsyncSession
+    )
+
 Base = declarative_base()
 
 def get_db():
@@ -29,3 +142,47 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_write_db():
+    """Session for routes that write (POST / PUT / DELETE); on SQLite it takes the write lock up front"""
+    db = WriteSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Session for read-only GET routes: the replica when DATABASE_READ_URL is set, otherwise
+    the primary. Falls back to the primary after a recent write or when replica lag is too high.
+    """
+    use_replica = read_engine is not None and \
+        replica_router.route(read_engine, request.scope.get("session")) == REPLICA
+    db = ReadSessionLocal() if use_replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    AsyncSession dependency for the web pages.
+
+    Mevcut senkron sorgu kodu `await db.run_sync(fn, ...)` ile çalıştırılır: fn normal bir
+    Session alır, sorgular async sürücü üzerinden yürür ve beklerken event loop bloklanmaz.
+    Session event'leri (rack_counter, data_version) aynı şekilde tetiklenir.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    """get_async_db for the GET pages, routed like get_read_db"""
+    use_replica = async_read_engine is not None and \
+        await replica_router.aroute(async_read_engine, request.scope.get("session")) == REPLICA
+    session_factory = AsyncReadSessionLocal if use_replica else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
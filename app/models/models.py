@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Index, CheckConstraint
+from sqlalchemy.orm import column_property, relationship, validates
 from sqlalchemy.sql import func
 import enum
 from .database import Base
+from app.utils.rack_codes import rack_sort_keys
+from app.utils.text_utils import normalize_turkish_text
 
 
 # Enum classes
@@ -35,18 +37,32 @@ class RackDurumEnum(str, enum.Enum):
     DOLU = "Dolu"
 
 
+def enum_check(table: str, column: str, enum_class) -> CheckConstraint:
+    """CHECK that `column` only holds member names of `enum_class` (the stored form) or NULL"""
+    names = ", ".join(f"'{member.name}'" for member in enum_class)
+    return CheckConstraint(f"{column} IN ({names})", name=f"ck_{table}_{column}")
+
+
 # Database Models
 class Customer(Base):
     __tablename__ = "customers"
 
     id = Column(Integer, primary_key=True, index=True)
     ad_soyad = Column(String, nullable=False)
+    ad_soyad_norm = Column(String, nullable=True, index=True)  # normalize_name(ad_soyad), arama için
     telefon = Column(String, nullable=False)
+    telefon_norm = Column(String, nullable=True, index=True)  # normalize_phone(telefon): yalnızca rakamlar
     plaka = Column(String, nullable=False)
+    plaka_norm = Column(String, nullable=True, index=True)  # normalize_plate(plaka): küçük harf + rakam
 
     # Relationship: one customer can have multiple tires (cascade delete)
     tires = relationship("Tire", back_populates="customer", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # /musteriler keyset pagination: ORDER BY ad_soyad, id
+        Index("ix_customers_ad_soyad_id", "ad_soyad", "id"),
+    )
+
 
 class Brand(Base):
     __tablename__ = "brands"
@@ -70,12 +86,27 @@ class Rack(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     kod = Column(String, nullable=False, unique=True)
-    durum = Column(Enum(RackDurumEnum), nullable=False, default=RackDurumEnum.BOS)
+    sort_prefix = Column(String, nullable=True)  # rack_sort_keys(kod)[0], /raflar gruplaması için
+    sort_number = Column(Integer, nullable=True)  # rack_sort_keys(kod)[1], grup içi doğal sıralama
+    # Raftaki DEPODA lastik sayısı; app/models/rack_counter.py tarafından güncellenir
+    active_tire_count = Column(Integer, nullable=False, default=0, server_default="0")
+    durum = Column(Enum(RackDurumEnum), nullable=False, default=RackDurumEnum.BOS)  # active_tire_count'tan türetilir
     not_ = Column("not", Text, nullable=True)
 
     # Relationship: one rack can store multiple tires
     tires = relationship("Tire", back_populates="rack")
 
+    __table_args__ = (
+        Index("ix_racks_sort_prefix_number", "sort_prefix", "sort_number"),
+        enum_check("racks", "durum", RackDurumEnum),
+    )
+
+    @validates("kod")
+    def _set_sort_keys(self, key, kod):
+        # Sıralama anahtarlarını kod ile birlikte güncel tut
+        self.sort_prefix, self.sort_number = rack_sort_keys(kod)
+        return kod
+
 
 class Tire(Base):
     __tablename__ = "tires"
@@ -88,10 +119,15 @@ class Tire(Base):
     mevsim = Column(Enum(MevsimEnum), nullable=False)
     dis_durumu = Column(Enum(DisDurumuEnum), nullable=False)
     not_ = Column("not", Text, nullable=True)
-    raf_id = Column(Integer, ForeignKey("racks.id"), nullable=True)
+    # active_history: expire edilmiş değer değiştirilirken eski değer yüklenir; raf sayacı
+    # (rack_counter) eski rafı history'den bulur
+    raf_id = column_property(Column(Integer, ForeignKey("racks.id"), nullable=True, index=True), active_history=True)
     giris_tarihi = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     cikis_tarihi = Column(DateTime(timezone=True), nullable=True)
-    durum = Column(Enum(TireDurumEnum, native_enum=False, length=20), nullable=False, default=TireDurumEnum.DEPODA)
+    durum = column_property(
+        Column(Enum(TireDurumEnum, native_enum=False, length=20), nullable=False, default=TireDurumEnum.DEPODA),
+        active_history=True
+    )
     
     # Multiple tire support (up to 6 tires)
     tire1_size = Column(String, nullable=True)
@@ -123,6 +159,51 @@ class Tire(Base):
     customer = relationship("Customer", back_populates="tires")
     brand = relationship("Brand", back_populates="tires")
     rack = relationship("Rack", back_populates="tires")
+    # tire1..tire6 kolonlarının normalize kopyası; app/models/tire_items.py tarafından eşitlenir
+    items = relationship(
+        "TireItem", back_populates="tire", cascade="all, delete-orphan", order_by="TireItem.position"
+    )
+
+    __table_args__ = (
+        # Keyset pagination: ORDER BY giris_tarihi DESC, id DESC
+        Index("ix_tires_giris_tarihi_id", "giris_tarihi", "id"),
+        # "Müşterinin en güncel lastiği" kontrolü (NOT EXISTS alt sorgusu)
+        Index("ix_tires_musteri_id_giris_tarihi", "musteri_id", "giris_tarihi", "id"),
+        # Enum kolonlarında yalnızca üye adları (bkz. migrate_normalize_enum_values.py)
+        enum_check("tires", "mevsim", MevsimEnum),
+        enum_check("tires", "dis_durumu", DisDurumuEnum),
+        enum_check("tires", "durum", TireDurumEnum),
+        *[enum_check("tires", f"tire{i}_mevsim", MevsimEnum) for i in range(1, 7)],
+    )
+
+
+class TireItem(Base):
+    """One stored tire (slot 1-6) of a Tire record"""
+    __tablename__ = "tire_items"
+
+    id = Column(Integer, primary_key=True)
+    tire_id = Column(Integer, ForeignKey("tires.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)  # tire{position}_* slotu
+    size = Column(String, nullable=False)
+    size_norm = Column(String, nullable=True, index=True)  # normalize_turkish_text(size), arama için
+    year = Column(String, nullable=True)  # Year as string (e.g., "2024")
+    # Slotta marka / mevsim yoksa lastiğin kendi markası / mevsimi yazılır
+    brand_id = Column(Integer, ForeignKey("brands.id", ondelete="SET NULL"), nullable=True)
+    mevsim = Column(Enum(MevsimEnum), nullable=True)
+
+    tire = relationship("Tire", back_populates="items")
+
+    __table_args__ = (
+        Index("ix_tire_items_tire_id_position", "tire_id", "position", unique=True),
+        # Marka filtresi: brand_id -> tire_id (tablo satırına gitmeden)
+        Index("ix_tire_items_brand_id_tire_id", "brand_id", "tire_id"),
+        enum_check("tire_items", "mevsim", MevsimEnum),
+    )
+
+    @validates("size")
+    def _set_size_norm(self, key, size):
+        self.size_norm = normalize_turkish_text(size)
+        return size
 
 
 class TireHistory(Base):
@@ -131,6 +212,7 @@ class TireHistory(Base):
     id = Column(Integer, primary_key=True, index=True)
     musteri_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
     musteri_adi = Column(String, nullable=False)
+    musteri_adi_norm = Column(String, nullable=True, index=True)  # normalize_name(musteri_adi), arama için
     plaka = Column(String, nullable=False)
     telefon = Column(String, nullable=True)
     islem_turu = Column(Enum(IslemTuruEnum, native_enum=False, length=50), nullable=False)
@@ -157,3 +239,11 @@ class TireHistory(Base):
     # Relationships
     customer = relationship("Customer")
 
+    __table_args__ = (
+        # Keyset pagination: ORDER BY islem_tarihi DESC, id DESC
+        Index("ix_tire_history_islem_tarihi_id", "islem_tarihi", "id"),
+        enum_check("tire_history", "islem_turu", IslemTuruEnum),
+        enum_check("tire_history", "eski_lastik_mevsim", MevsimEnum),
+        enum_check("tire_history", "yeni_lastik_mevsim", MevsimEnum),
+    )
+
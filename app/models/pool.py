@@ -0,0 +1,125 @@
+"""
+Connection pool with live metrics (checked-out connections, overflow, wait times, pre-ping failures).
+
+Havuz ayarları ortam değişkenlerinden gelir (bkz. app.models.database). Bu modül yalnızca
+ölçümü ekler: QueuePool / AsyncAdaptedQueuePool alt sınıfları bağlantı alma süresini
+(_do_get) ve zaman aşımlarını sayar; engine üzerindeki handle_error event'i pre-ping
+hatalarını sayar. Değerler GET /api/metrics/pool ile okunur.
+"""
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# p95 için son N bekleme süresi tutulur
+WAIT_SAMPLE_SIZE = 1000
+
+
+class PoolMetrics:
+    """Thread-safe counters for one engine's pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.pre_ping_failures = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._waits.append(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_pre_ping_failure(self):
+        with self._lock:
+            self.pre_ping_failures += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "wait_ms": {
+                    "avg": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                    "p95": round(p95 * 1000, 3),
+                    "max": round(self.max_wait * 1000, 3),
+                },
+                "timeouts": self.timeouts,
+                "pre_ping_failures": self.pre_ping_failures,
+            }
+
+
+class _TimedPoolMixin:
+    """Times connection checkout (_do_get) into self.metrics"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() havuzu yeniden oluşturur; sayaçlar korunur
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def track_pre_ping_failures(engine):
+    """Count failed pool_pre_ping checks of `engine` (sync Engine) in its pool metrics"""
+    metrics = getattr(engine.pool, "metrics", None)
+    if metrics is None:
+        return
+
+    @event.listens_for(engine, "handle_error")
+    def _count_pre_ping_failure(context):
+        if context.is_pre_ping:
+            metrics.record_pre_ping_failure()
+
+
+def pool_stats(engine) -> dict:
+    """Current state + counters of `engine`'s pool"""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # QueuePool.overflow() başlangıçta -pool_size'dır; açılmış fazladan bağlantı sayısı
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+            "recycle_s": pool._recycle,
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
@@ -0,0 +1,169 @@
+"""
+Materialized per-rack active tire counter (racks.active_tire_count).
+
+Her flush'ta eklenen / silinen / değişen Tire nesnelerinden raf başına fark (delta)
+hesaplanır ve aynı transaction içinde göreli bir UPDATE ile uygulanır:
+
+    active_tire_count = active_tire_count + :delta
+    durum = DOLU if active_tire_count + :delta > 0 else BOS
+
+Böylece Rack.durum her zaman sayaçtan türetilir ve eşzamanlı işlemler birbirinin
+değerini ezmez. ORM dışı toplu UPDATE/DELETE'ler bu event'leri tetiklemez; bu yollar
+silmeden önce release_active_tires() çağırır. Sapma olursa
+reconcile_rack_counters() ile düzeltilir (reconcile_rack_counters.py).
+"""
+from collections import defaultdict
+
+from sqlalchemy import case, cast, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from .models import Rack, RackDurumEnum, Tire, TireDurumEnum
+
+_DELTAS_KEY = "rack_counter_deltas"
+_PENDING_RACKS_KEY = "rack_counter_updated_ids"
+
+
+def _is_active(durum) -> bool:
+    # durum atanmamışsa kolon varsayılanı (DEPODA) geçerlidir
+    return durum is None or durum == TireDurumEnum.DEPODA
+
+
+def _old_value(state, key):
+    """
+    Value of `key` before the current flush (committed value if unchanged).
+
+    Tire.raf_id / Tire.durum active_history=True ile eşlenir: expire edilmiş değer
+    değiştirildiğinde eski değer history.deleted'a yüklenir.
+    """
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.attrs[key].value
+
+
+def _rack_status_expr(count_expr):
+    # Native PG enum kolonuna yazılabilmesi için CASE sonucu kolon tipine cast edilir
+    return cast(
+        case((count_expr > 0, RackDurumEnum.DOLU.name), else_=RackDurumEnum.BOS.name),
+        Rack.__table__.c.durum.type
+    )
+
+
+def _collect_deltas(session) -> dict:
+    deltas = defaultdict(int)
+    for obj in session.new:
+        if isinstance(obj, Tire) and obj.raf_id and _is_active(obj.durum):
+            deltas[obj.raf_id] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Tire):
+            state = inspect(obj)
+            old_rack_id = _old_value(state, "raf_id")
+            if old_rack_id and _is_active(_old_value(state, "durum")):
+                deltas[old_rack_id] -= 1
+    for obj in session.dirty:
+        if not isinstance(obj, Tire) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        old_rack_id = _old_value(state, "raf_id")
+        old_active = bool(old_rack_id) and _is_active(_old_value(state, "durum"))
+        new_active = bool(obj.raf_id) and _is_active(obj.durum)
+        if (old_rack_id, old_active) == (obj.raf_id, new_active):
+            continue
+        if old_active:
+            deltas[old_rack_id] -= 1
+        if new_active:
+            deltas[obj.raf_id] += 1
+    return {rack_id: delta for rack_id, delta in deltas.items() if delta}
+
+
+def apply_rack_deltas(connection, deltas: dict):
+    """Add `deltas` ({rack_id: +n/-n}) to racks.active_tire_count and re-derive durum"""
+    for rack_id, delta in deltas.items():
+        new_count = Rack.active_tire_count + delta
+        connection.execute(
+            update(Rack.__table__)
+            .where(Rack.__table__.c.id == rack_id)
+            .values(active_tire_count=new_count, durum=_rack_status_expr(new_count))
+        )
+
+
+def release_active_tires(connection, *criteria) -> int:
+    """
+    Subtract the active tires matching `criteria` from their racks' counters.
+
+    Must run before the matching tires are bulk-deleted. Single statement:
+    UPDATE racks SET ... FROM (SELECT raf_id, count(*) ... GROUP BY raf_id) WHERE racks.id = raf_id
+    Returns the number of racks updated.
+    """
+    released = (
+        select(Tire.raf_id.label("raf_id"), func.count(Tire.id).label("released"))
+        .where(Tire.raf_id.isnot(None), Tire.durum == TireDurumEnum.DEPODA, *criteria)
+        .group_by(Tire.raf_id)
+        .subquery("released")
+    )
+    racks = Rack.__table__
+    new_count = racks.c.active_tire_count - released.c.released
+    result = connection.execute(
+        update(racks)
+        .where(racks.c.id == released.c.raf_id)
+        .values(active_tire_count=new_count, durum=_rack_status_expr(new_count))
+    )
+    return result.rowcount
+
+
+@event.listens_for(Session, "before_flush")
+def _compute_rack_deltas(session, flush_context, instances):
+    # Farklar flush'tan önce hesaplanır: silinecek satırların eski değerleri hâlâ okunabilir
+    session.info[_DELTAS_KEY] = _collect_deltas(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_rack_deltas(session, flush_context):
+    # Sayaç güncellemesi tire satırlarıyla aynı transaction içinde çalışır
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas:
+        return
+    apply_rack_deltas(session.connection(), deltas)
+    session.info.setdefault(_PENDING_RACKS_KEY, set()).update(deltas)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_updated_racks(session, flush_context):
+    # Bellekteki Rack nesneleri bir sonraki erişimde güncel sayaç/durumu yüklesin
+    rack_ids = session.info.pop(_PENDING_RACKS_KEY, None)
+    if not rack_ids:
+        return
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Rack) and obj.id in rack_ids:
+            session.expire(obj, ["active_tire_count", "durum"])
+
+
+def reconcile_rack_counters(db: Session) -> list:
+    """
+    Recompute every rack's active_tire_count / durum from the tires table.
+
+    Returns the racks that had drifted as [{"id", "kod", "old_count", "new_count"}].
+    """
+    actual = (
+        select(func.count(Tire.id))
+        .where(Tire.raf_id == Rack.id, Tire.durum == TireDurumEnum.DEPODA)
+        .correlate(Rack)
+        .scalar_subquery()
+    )
+    drifted = [
+        {"id": row.id, "kod": row.kod, "old_count": row.active_tire_count, "new_count": row.actual}
+        for row in db.query(Rack.id, Rack.kod, Rack.active_tire_count, actual.label("actual")).all()
+        if row.active_tire_count != row.actual
+    ]
+    # Tek UPDATE: durum da sayımdan türetilir (sayaç doğru olsa bile durumdaki sapmayı düzeltir)
+    db.execute(
+        update(Rack.__table__).values(
+            active_tire_count=actual,
+            durum=_rack_status_expr(actual)
+        )
+    )
+    db.commit()
+    db.expire_all()
+    return drifted
@@ -0,0 +1,164 @@
+"""
+Optional read replica (DATABASE_READ_URL) for the GET routes and HTML pages.
+
+GET istekleri (get_read_db / get_async_read_db) replikaya gider; şu durumlarda birincil
+(DATABASE_URL) kullanılır:
+- sticky: aynı tarayıcı oturumu son DB_READ_STICKY_SECONDS içinde bir yazma yaptı
+  (read-your-writes; zaman damgası session cookie'sinde, bkz. mark_write). Aynı süre bu
+  process'teki son commit için de uygulanır: data_versions / önbellekler birincildeki
+  commit ile sürüm değiştirir, yeni sürüm henüz yansımamış replika verisiyle dolmamalı.
+- lag: ölçülen replika gecikmesi DB_READ_MAX_LAG_SECONDS'u aşıyor veya ölçülemiyor.
+  Gecikme en fazla DB_READ_LAG_CHECK_INTERVAL saniyede bir ölçülür.
+
+Gecikme sorgusu PostgreSQL'de WAL replay zaman damgasıdır; DB_READ_LAG_QUERY ile
+değiştirilebilir (ör. heartbeat tablosu). SQLite (test için ikinci dosya) replikasyon
+yapmaz; sorgu verilmezse gecikme 0 kabul edilir.
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event, text
+
+from .data_version import data_versions
+
+LAST_WRITE_KEY = "db_last_write_at"
+
+DB_READ_STICKY_SECONDS = float(os.getenv("DB_READ_STICKY_SECONDS", "5"))
+DB_READ_MAX_LAG_SECONDS = float(os.getenv("DB_READ_MAX_LAG_SECONDS", "2"))
+DB_READ_LAG_CHECK_INTERVAL = float(os.getenv("DB_READ_LAG_CHECK_INTERVAL", "1"))
+DB_READ_LAG_QUERY = os.getenv("DB_READ_LAG_QUERY")
+
+# Replika en son alınan WAL'ı uygulamışsa gecikme 0; aksi halde son uygulanan işlemin yaşı.
+# (Birincil boştayken pg_last_xact_replay_timestamp() eskir, yalnız başına kullanılamaz.)
+POSTGRES_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# Yönlendirme kararları (GET /api/metrics/read-replica)
+REPLICA = "replica"
+PRIMARY_STICKY = "primary_sticky"
+PRIMARY_LAG = "primary_lag"
+
+
+def measure_lag(connection) -> float:
+    """Replication lag of the replica behind `connection`, in seconds"""
+    if DB_READ_LAG_QUERY:
+        return float(connection.execute(text(DB_READ_LAG_QUERY)).scalar() or 0.0)
+    if connection.dialect.name == "postgresql":
+        return float(connection.execute(text(POSTGRES_LAG_QUERY)).scalar() or 0.0)
+    return 0.0
+
+
+def configure_read_only(engine):
+    """Reject writes on SQLite replica connections (PostgreSQL standbys reject them already)"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _query_only(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+
+def mark_write(session: dict):
+    """Record a successful write in the browser session (read-your-writes for its next reads)"""
+    session[LAST_WRITE_KEY] = time.time()
+
+
+class ReplicaRouter:
+    """Decides per request whether reads may use the replica; keeps the last lag measurement"""
+
+    def __init__(self, max_lag: float, sticky_seconds: float, check_interval: float):
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self.lag: Optional[float] = None
+        self.lag_checks = 0
+        self.lag_check_failures = 0
+        self.decisions = {REPLICA: 0, PRIMARY_STICKY: 0, PRIMARY_LAG: 0}
+
+    def _sticky(self, session: Optional[dict]) -> bool:
+        if time.monotonic() - data_versions.last_write_at < self.sticky_seconds:
+            return True
+        last_write = (session or {}).get(LAST_WRITE_KEY)
+        return isinstance(last_write, (int, float)) and time.time() - last_write < self.sticky_seconds
+
+    def _claim_check(self) -> bool:
+        # Aynı anda gelen isteklerden yalnızca biri ölçüm yapar; diğerleri son değeri kullanır
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            return True
+
+    def _record_lag(self, lag: Optional[float]):
+        with self._lock:
+            self.lag_checks += 1
+            if lag is None:
+                self.lag_check_failures += 1
+            self.lag = lag
+
+    def _decide(self, session: Optional[dict], lag_ok) -> str:
+        if self._sticky(session):
+            decision = PRIMARY_STICKY
+        elif lag_ok():
+            decision = REPLICA
+        else:
+            decision = PRIMARY_LAG
+        with self._lock:
+            self.decisions[decision] += 1
+        return decision
+
+    def _lag_ok(self) -> bool:
+        # Ölçülemeyen gecikme (replika erişilemiyor) birincile düşer
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def route(self, engine, session: Optional[dict]) -> str:
+        """Routing decision for a sync request; `engine` is the replica Engine"""
+        def lag_ok():
+            if self._claim_check():
+                try:
+                    with engine.connect() as conn:
+                        self._record_lag(measure_lag(conn))
+                except Exception:
+                    self._record_lag(None)
+            return self._lag_ok()
+        return self._decide(session, lag_ok)
+
+    async def aroute(self, async_engine, session: Optional[dict]) -> str:
+        """Routing decision for an async request; `async_engine` is the replica AsyncEngine"""
+        if not self._sticky(session) and self._claim_check():
+            try:
+                async with async_engine.connect() as conn:
+                    self._record_lag(await conn.run_sync(measure_lag))
+            except Exception:
+                self._record_lag(None)
+        return self._decide(session, self._lag_ok)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "lag_s": None if self.lag is None else round(self.lag, 3),
+                "max_lag_s": self.max_lag,
+                "sticky_s": self.sticky_seconds,
+                "lag_checks": self.lag_checks,
+                "lag_check_failures": self.lag_check_failures,
+                "decisions": dict(self.decisions),
+            }
+
+
+replica_router = ReplicaRouter(
+    max_lag=DB_READ_MAX_LAG_SECONDS,
+    sticky_seconds=DB_READ_STICKY_SECONDS,
+    check_interval=DB_READ_LAG_CHECK_INTERVAL,
+)
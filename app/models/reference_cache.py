@@ -0,0 +1,125 @@
+"""
+Process-local cache for the small lookup tables (brands, tire sizes).
+
+/lastik-ara, /yeni-lastik ve her lastik kaydı bu tabloları okur; içerik nadiren değişir.
+Önbellek bir sürüm sayacına bağlıdır: brand_routes / tire_size_routes commit sonrası
+bump() çağırır, bir sonraki okuma tabloları yeniden yükler. Lastik kaydıyla aynı
+transaction'da oluşturulan markalar (add_pending_brand) commit'e kadar yalnızca o
+session'da görünür; commit'te bump() yapılır, rollback'te unutulur.
+
+Sayaç process'e özeldir; birden fazla worker çalışıyorsa diğer worker'lar değişikliği
+en geç REFERENCE_CACHE_TTL saniye sonra görür. ETag'ler içerikten hesaplandığı için
+worker'lar arasında tutarlıdır.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .models import Brand, TireSize
+
+
+_PENDING_BRANDS_KEY = "reference_cache_pending_brands"
+
+
+class ReferenceSnapshot(NamedTuple):
+    version: int
+    loaded_at: float
+    brands: List[str]
+    brand_ids: Dict[str, int]
+    tire_sizes: List[str]
+    brands_etag: str
+    tire_sizes_etag: str
+
+
+def _etag(kind: str, values: List[str]) -> str:
+    digest = hashlib.sha1("\x1f".join(values).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{kind}-{digest}"'
+
+
+class ReferenceDataCache:
+    """Versioned snapshot of brands / tire sizes, reloaded after bump() or TTL expiry"""
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot: Optional[ReferenceSnapshot] = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self):
+        """Invalidate the snapshot; call after committing a brand / tire size change"""
+        with self._lock:
+            self._version += 1
+
+    def snapshot(self, db: Session) -> ReferenceSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version \
+                and time.monotonic() - snapshot.loaded_at < self.ttl:
+            return snapshot
+        # Sorgular kilit dışında: sayfalar run_sync ile event loop thread'inde çalışır, DB IO
+        # sırasında başka bir istek aynı thread'de devreye girer; IO boyunca tutulan bir
+        # threading.Lock tüm worker'ı kilitler. Aynı anda yüklenirse iki istek de sorgular,
+        # daha yeni sürümlü sonuç kalır.
+        version = self._version
+        brand_rows = db.query(Brand.id, Brand.marka_adi).order_by(Brand.marka_adi).all()
+        tire_sizes = [row.ebat for row in db.query(TireSize.ebat).order_by(TireSize.ebat).all()]
+        brands = [row.marka_adi for row in brand_rows]
+        snapshot = ReferenceSnapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            brands=brands,
+            brand_ids={row.marka_adi: row.id for row in brand_rows},
+            tire_sizes=tire_sizes,
+            brands_etag=_etag("brands", brands),
+            tire_sizes_etag=_etag("tire-sizes", tire_sizes)
+        )
+        with self._lock:
+            current = self._snapshot
+            if current is None or current.version <= version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def brands(self, db: Session) -> List[str]:
+        return self.snapshot(db).brands
+
+    def tire_sizes(self, db: Session) -> List[str]:
+        return self.snapshot(db).tire_sizes
+
+    def add_pending_brand(self, db: Session, brand: Brand):
+        """Make a flushed, not yet committed brand visible to brand_id() in this session"""
+        db.info.setdefault(_PENDING_BRANDS_KEY, {})[brand.marka_adi] = brand.id
+
+    def brand_id(self, db: Session, marka_adi: str) -> Optional[int]:
+        pending = db.info.get(_PENDING_BRANDS_KEY)
+        if pending and marka_adi in pending:
+            return pending[marka_adi]
+        brand_id = self.snapshot(db).brand_ids.get(marka_adi)
+        if brand_id is None:
+            # Önbellekte yok: başka bir worker eklemiş olabilir, DB'ye bak
+            row = db.query(Brand.id).filter(Brand.marka_adi == marka_adi).first()
+            if row is not None:
+                self.bump()
+                brand_id = row.id
+        return brand_id
+
+
+reference_cache = ReferenceDataCache(ttl=float(os.getenv("REFERENCE_CACHE_TTL", "300")))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_brands(session):
+    if session.info.pop(_PENDING_BRANDS_KEY, None):
+        reference_cache.bump()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_brands(session):
+    session.info.pop(_PENDING_BRANDS_KEY, None)
@@ -0,0 +1,131 @@
+"""
+Normalize edilmiş (*_norm) kolonlar üzerinde alt-dize (substring) arama indeksleri.
+
+- PostgreSQL: pg_trgm eklentisi + GIN (gin_trgm_ops) indeksi, LIKE '%...%' doğrudan indeksi kullanır.
+- SQLite (fallback): FTS5 trigram tokenizer ile external-content sanal tablo + senkron trigger'lar.
+"""
+from sqlalchemy import column, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models.models import Customer, TireHistory, TireItem
+from app.utils.text_utils import normalize_name, normalize_turkish_text
+
+# (tablo, normalize kolon) -> SQLite FTS5 tablosu
+SEARCH_INDEXES = [
+    ("customers", "ad_soyad_norm"),
+    ("tire_history", "musteri_adi_norm"),
+]
+
+# Yalnızca PostgreSQL'de trigram indeksi: ebatlar kısa ve az çeşitli, SQLite'ta FTS listesi
+# (ör. "r19" binlerce satır) lastik başına tire_items araması + LIKE'tan yavaş kalıyor
+PG_TRGM_INDEXES = [
+    ("tire_items", "size_norm"),
+    ("customers", "plaka_norm"),
+    ("customers", "telefon_norm"),
+]
+
+# FTS5 trigram indeksi en az 3 karakterlik aramalarda devreye girer
+MIN_TRIGRAM_LENGTH = 3
+
+
+def _fts_table_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def _ensure_pg_trgm(conn, table_name: str, column_name: str):
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS ix_{table_name}_{column_name}_trgm
+        ON {table_name} USING gin ({column_name} gin_trgm_ops)
+    """))
+
+
+def _ensure_sqlite_fts(conn, table_name: str, column_name: str):
+    fts_table = _fts_table_name(table_name)
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": fts_table}
+    ).first()
+    if exists:
+        return
+
+    conn.execute(text(f"""
+        CREATE VIRTUAL TABLE {fts_table} USING fts5(
+            {column_name}, content='{table_name}', content_rowid='id', tokenize='trigram'
+        )
+    """))
+    # External-content tabloyu ana tabloyla senkron tut
+    conn.execute(text(f"""
+        CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table_name} BEGIN
+            INSERT INTO {fts_table}(rowid, {column_name}) VALUES (new.id, new.{column_name});
+        END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table_name} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_name}) VALUES ('delete', old.id, old.{column_name});
+        END
+    """))
+    conn.execute(text(f"""
+        CREATE TRIGGER {fts_table}_au AFTER UPDATE OF {column_name} ON {table_name} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_name}) VALUES ('delete', old.id, old.{column_name});
+            INSERT INTO {fts_table}(rowid, {column_name}) VALUES (new.id, new.{column_name});
+        END
+    """))
+    # Mevcut satırları indeksle
+    conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+
+
+def ensure_search_indexes(engine):
+    """Create substring search indexes for all normalized columns (idempotent)"""
+    with engine.begin() as conn:
+        for table_name, column_name in SEARCH_INDEXES:
+            if engine.dialect.name == "postgresql":
+                _ensure_pg_trgm(conn, table_name, column_name)
+            elif engine.dialect.name == "sqlite":
+                _ensure_sqlite_fts(conn, table_name, column_name)
+        if engine.dialect.name == "postgresql":
+            for table_name, column_name in PG_TRGM_INDEXES:
+                _ensure_pg_trgm(conn, table_name, column_name)
+
+
+def normalized_contains(db: Session, norm_column, id_column, table_name: str, search: str):
+    """
+    Build an indexed "normalized column contains search" filter.
+
+    `search` ham kullanıcı girdisidir; burada kolonla (ve müşteri indeksiyle) aynı
+    normalize_name ile normalize edilir.
+    """
+    normalized_search = normalize_name(search)
+    if not normalized_search:
+        return None
+
+    if db.get_bind().dialect.name == "sqlite" and len(normalized_search) >= MIN_TRIGRAM_LENGTH:
+        fts = table(_fts_table_name(table_name), column("rowid"), column(norm_column.key))
+        return id_column.in_(
+            select(fts.c.rowid).where(fts.c[norm_column.key].contains(normalized_search))
+        )
+
+    # PostgreSQL'de LIKE '%...%' pg_trgm GIN indeksini kullanır
+    return norm_column.contains(normalized_search)
+
+
+def customer_name_filter(db: Session, search: str):
+    """Indexed, Turkish-insensitive substring filter on Customer.ad_soyad"""
+    return normalized_contains(db, Customer.ad_soyad_norm, Customer.id, "customers", search)
+
+
+def history_customer_name_filter(db: Session, search: str):
+    """Indexed, Turkish-insensitive substring filter on TireHistory.musteri_adi"""
+    return normalized_contains(db, TireHistory.musteri_adi_norm, TireHistory.id, "tire_history", search)
+
+
+def tire_size_filter(search: str):
+    """
+    Case-insensitive substring filter on TireItem.size (pg_trgm index on PostgreSQL).
+
+    Lastik başına EXISTS içinde kullanılır (bkz. tire_items.has_item).
+    """
+    normalized_search = normalize_turkish_text((search or "").strip())
+    if not normalized_search:
+        return None
+    return TireItem.size_norm.contains(normalized_search)
@@ -0,0 +1,107 @@
+"""
+Concurrency-safe allocator for Tire.seri_no.
+
+- PostgreSQL: `tire_seri_no_seq` sequence (nextval hiçbir zaman aynı değeri iki kez vermez).
+  SERI_NO_BLOCK_SIZE > 1 ise her worker process tek seferde o kadar numara ayırır ve
+  bunları bellekten dağıtır (daha az DB round-trip; worker'lar arası sıra garanti değildir).
+  Geri alınan (rollback) işlemlerde ayrılan numara kullanılmaz, yani seri_no'da boşluk oluşabilir.
+- SQLite (fallback): `seri_no_counter` tablosu, çağıranın session bağlantısında ve
+  transaction'ında artırılır. Yazma session'ı (get_write_db) kilidi BEGIN IMMEDIATE ile
+  zaten tutar; ayrı bir bağlantı aynı kilidi beklerdi (busy_timeout'a kadar kilitlenme).
+  Numara lastik kaydıyla birlikte commit / rollback olur; blok ayırma uygulanmaz.
+"""
+import os
+import threading
+from collections import deque
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SERI_NO_SEQUENCE = "tire_seri_no_seq"
+SERI_NO_COUNTER_TABLE = "seri_no_counter"
+SERI_NO_COUNTER_NAME = "tires"
+
+
+def ensure_seri_no_sequence(engine):
+    """Create the sequence / counter row and move it past the current max(seri_no) (idempotent)"""
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {SERI_NO_SEQUENCE}"))
+            # Sadece sekans mevcut en büyük seri_no'nun gerisindeyse ileri al
+            conn.execute(text(f"""
+                SELECT setval('{SERI_NO_SEQUENCE}', m.max_seri_no + 1, false)
+                FROM (SELECT COALESCE(MAX(seri_no), 0) AS max_seri_no FROM tires) m, {SERI_NO_SEQUENCE} s
+                WHERE (CASE WHEN s.is_called THEN s.last_value + 1 ELSE s.last_value END) <= m.max_seri_no
+            """))
+        else:
+            _ensure_counter(conn)
+
+
+def _ensure_counter(conn):
+    """SQLite counter table + row, moved past the current max(seri_no)"""
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {SERI_NO_COUNTER_TABLE} (
+            name VARCHAR PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """))
+    # value = son dağıtılan numara
+    conn.execute(text(f"""
+        INSERT INTO {SERI_NO_COUNTER_TABLE} (name, value)
+        SELECT :name, COALESCE(MAX(seri_no), 0) FROM tires WHERE true
+        ON CONFLICT (name) DO UPDATE SET value = max(value, excluded.value)
+    """), {"name": SERI_NO_COUNTER_NAME})
+
+
+class SeriNoAllocator:
+    """Hands out seri_no values, optionally from a per-process reserved block"""
+
+    def __init__(self, block_size: int = 1):
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        self._reserved = deque()
+        self._pid = os.getpid()
+        self._ensured = set()
+
+    def next(self, db: Session) -> int:
+        engine = db.get_bind()
+        if engine.dialect.name != "postgresql":
+            return self._next_in_session(db)
+        # Kilit nextval IO'su boyunca tutulur: yalnız sync route'lardan (threadpool) çağrılmalı,
+        # run_sync ile event loop thread'inde çalışan sayfalardan çağrılırsa worker kilitlenir
+        with self._lock:
+            if self._pid != os.getpid():
+                # Fork edilmiş worker ebeveynin ayırdığı bloğu kullanmamalı
+                self._reserved.clear()
+                self._ensured.clear()
+                self._pid = os.getpid()
+            if not self._reserved:
+                self._reserved.extend(self._reserve(engine, self.block_size))
+            return self._reserved.popleft()
+
+    def _reserve(self, engine, count: int) -> List[int]:
+        if engine.url not in self._ensured:
+            ensure_seri_no_sequence(engine)
+            self._ensured.add(engine.url)
+
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(f"SELECT nextval('{SERI_NO_SEQUENCE}') FROM generate_series(1, :count)"),
+                {"count": count}
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def _next_in_session(self, db: Session) -> int:
+        # SQLite: session'ın kendi bağlantısı / transaction'ı (yazma kilidi zaten onda)
+        conn = db.connection()
+        if conn.engine.url not in self._ensured:
+            _ensure_counter(conn)
+            self._ensured.add(conn.engine.url)
+        return conn.execute(
+            text(f"UPDATE {SERI_NO_COUNTER_TABLE} SET value = value + 1 WHERE name = :name RETURNING value"),
+            {"name": SERI_NO_COUNTER_NAME}
+        ).scalar_one()
+
+
+seri_no_allocator = SeriNoAllocator(block_size=int(os.getenv("SERI_NO_BLOCK_SIZE", "1")))
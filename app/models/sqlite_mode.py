@@ -0,0 +1,68 @@
+"""
+Tuned SQLite mode for the fallback database (DATABASE_URL unset / sqlite://).
+
+Her bağlantı açılışında PRAGMA'lar uygulanır (ortam değişkenleriyle değiştirilebilir):
+- journal_mode=WAL: okuyucular yazıcıyı, yazıcı okuyucuları bloklamaz
+- synchronous=NORMAL: WAL ile güvenli; her commit'te fsync yok
+- mmap_size / cache_size: okuma için bellek eşlemesi ve sayfa önbelleği
+- busy_timeout: kilit varsa hemen "database is locked" yerine bekler
+- foreign_keys=ON: FK kısıtları (SQLite'ta varsayılan kapalı)
+
+Transaction'lar pysqlite'ın örtük BEGIN'i yerine "begin" event'i ile açılır. Okumalar
+BEGIN (deferred) kullanır; `sqlite_begin_immediate` çalıştırma seçeneği olan bağlantılar
+(get_write_db session'ları) BEGIN IMMEDIATE ile yazma kilidini baştan alır. Böylece
+okuma ile başlayıp yazmaya geçen bir transaction, WAL'da düzeltilemeyen SQLITE_BUSY
+(snapshot) hatası almaz. Kilit busy_timeout içinde alınamazsa BEGIN IMMEDIATE artan
+beklemelerle SQLITE_WRITE_RETRIES kez daha denenir.
+"""
+import os
+import time
+
+from sqlalchemy import event, exc
+
+WRITE_OPTION = "sqlite_begin_immediate"
+
+SQLITE_PRAGMAS = (
+    ("journal_mode", os.getenv("SQLITE_JOURNAL_MODE", "WAL")),
+    ("synchronous", os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")),
+    ("mmap_size", int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))),
+    ("cache_size", int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))),  # negatif = KiB (64 MB)
+    ("busy_timeout", int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))),
+    ("foreign_keys", os.getenv("SQLITE_FOREIGN_KEYS", "ON")),
+)
+SQLITE_WRITE_RETRIES = int(os.getenv("SQLITE_WRITE_RETRIES", "3"))
+SQLITE_WRITE_RETRY_BACKOFF = float(os.getenv("SQLITE_WRITE_RETRY_BACKOFF", "0.05"))  # saniye, her denemede 2x
+
+
+def _is_locked(error: exc.OperationalError) -> bool:
+    message = str(error.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+def configure_sqlite(engine):
+    """Register the pragma / transaction-begin events on `engine` (sync Engine); no-op for other backends"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        # pysqlite'ın kendi BEGIN'ini kapat; transaction'ı aşağıdaki "begin" event'i açar
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        if not conn.get_execution_options().get(WRITE_OPTION):
+            conn.exec_driver_sql("BEGIN")
+            return
+        for attempt in range(SQLITE_WRITE_RETRIES + 1):
+            try:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                return
+            except exc.OperationalError as e:
+                if not _is_locked(e) or attempt == SQLITE_WRITE_RETRIES:
+                    raise
+                time.sleep(SQLITE_WRITE_RETRY_BACKOFF * (2 ** attempt))
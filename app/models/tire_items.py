@@ -0,0 +1,125 @@
+"""
+tire_items: one row per stored tire (slot 1-6) of a Tire record.
+
+Lastik kayıtları hâlâ tire1..tire6_* kolonlarına da yazılır (dual write; eski istemciler ve
+geri dönüş için). before_flush event'i, eklenen veya slot kolonları değişen her Tire için
+tire_items satırlarını aynı flush'ta eşitler. Okumalar (listeler, arama, API, geçmiş)
+tire_items'tan yapılır:
+
+- position = slot numarası; boş slotlar (size yok) satır üretmez
+- slotta marka / mevsim yoksa lastiğin kendi markası (marka_id) / mevsimi yazılır
+- hiç slotu olmayan eski kayıtlarda `ebat` tek satır olur (position 1)
+
+ORM dışı toplu UPDATE'ler bu event'i tetiklemez (slot kolonlarını toplu güncelleyen yol yok).
+Mevcut kayıtlar migrate_add_tire_items.py ile doldurulur.
+"""
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import and_, event, exists, func, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from .models import Tire, TireItem
+from .reference_cache import reference_cache
+
+TIRE_SLOTS = range(1, 7)
+
+# position -> (size, production_date, brand, mevsim) attribute names
+SLOT_FIELDS = {
+    i: (f"tire{i}_size", f"tire{i}_production_date", f"tire{i}_brand", f"tire{i}_mevsim")
+    for i in TIRE_SLOTS
+}
+
+# Bu kolonlardan biri değişirse tire_items yeniden hesaplanır
+_SOURCE_ATTRS = ("ebat", "marka_id", "mevsim", *(key for fields in SLOT_FIELDS.values() for key in fields))
+
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def item_values(tire, brand_id_of: Callable[[str], Optional[int]]) -> Dict[int, dict]:
+    """
+    position -> {size, year, brand_id, mevsim} for `tire`'s slot columns.
+
+    `tire` is a Tire or any row with the same attribute names; `brand_id_of` maps a
+    brand name to its id (None if unknown).
+    """
+    items = {}
+    for position, (size_key, date_key, brand_key, mevsim_key) in SLOT_FIELDS.items():
+        size = getattr(tire, size_key)
+        if _blank(size):
+            continue
+        brand = getattr(tire, brand_key)
+        items[position] = {
+            "size": size.strip(),
+            "year": None if _blank(getattr(tire, date_key)) else getattr(tire, date_key),
+            "brand_id": tire.marka_id if _blank(brand) else (brand_id_of(brand.strip()) or tire.marka_id),
+            "mevsim": getattr(tire, mevsim_key) or tire.mevsim,
+        }
+    if not items and not _blank(tire.ebat):
+        items[1] = {"size": tire.ebat.strip(), "year": None, "brand_id": tire.marka_id, "mevsim": tire.mevsim}
+    return items
+
+
+def sync_tire_items(session: Session, tire: Tire):
+    """Make tire.items match the tire's slot columns (updates rows in place by position)"""
+    desired = item_values(tire, lambda name: reference_cache.brand_id(session, name))
+    existing = {item.position: item for item in tire.items}
+    for position, item in existing.items():
+        if position not in desired:
+            tire.items.remove(item)
+    for position, values in desired.items():
+        item = existing.get(position)
+        if item is None:
+            tire.items.append(TireItem(position=position, **values))
+            continue
+        # Aynı (tire_id, position) satırı güncellenir: sil + ekle benzersiz indekse takılır
+        for key, value in values.items():
+            if getattr(item, key) != value:
+                setattr(item, key, value)
+
+
+def _needs_sync(session, obj) -> bool:
+    if obj in session.new:
+        return True
+    state = inspect(obj)
+    return any(state.attrs[key].history.has_changes() for key in _SOURCE_ATTRS)
+
+
+def tires_missing_items():
+    """WHERE clause: tires with a size (slot or legacy ebat) but no tire_items rows yet"""
+    # item_values ile aynı "boş değil" testi (NULL / yalnızca boşluk satır üretmez)
+    has_size = or_(
+        func.trim(Tire.ebat) != "",
+        *[func.trim(getattr(Tire, fields[0])) != "" for fields in SLOT_FIELDS.values()]
+    )
+    return and_(has_size, ~exists().where(TireItem.tire_id == Tire.id))
+
+
+def has_item(tire_model, *criteria):
+    """
+    EXISTS clause: `tire_model` (Tire or an alias of it) has a tire_items row matching `criteria`.
+
+    IN (alt sorgu) yerine korele EXISTS: planlayıcı sayfa sıralamasındaki indeksi gezip
+    lastik başına (tire_id, ...) indeksine bakar, LIMIT'e ulaşınca durur.
+    """
+    return exists().where(TireItem.tire_id == tire_model.id, *criteria)
+
+
+def has_tires_missing_items(connection) -> bool:
+    """True if migrate_add_tire_items.py still has rows to backfill"""
+    return connection.execute(select(Tire.id).where(tires_missing_items()).limit(1)).first() is not None
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_tire_items(session, flush_context, instances):
+    tires = [
+        obj for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Tire) and obj not in session.deleted and _needs_sync(session, obj)
+    ]
+    if not tires:
+        return
+    # Marka / mevcut satır sorguları flush'ı yeniden tetiklemesin
+    with session.no_autoflush:
+        for tire in tires:
+            sync_tire_items(session, tire)
@@ -0,0 +1,203 @@
+"""
+Column-projection read path for tire listings (/lastik-ara, /lastik-etiketleri, GET /api/tires).
+
+Tam Tire ORM nesnesi (≈40 kolon + 3 joinedload ilişkisi, identity map kaydı) oluşturmak
+yerine listelerde kullanılan kolonlar tek bir SELECT ile hafif Row nesneleri olarak okunur;
+marka / müşteri / raf bilgisi aynı sorgudaki outer join'lerden gelir. Lastik başına
+ebat / yıl / marka / mevsim (tire_items) sayfadaki tüm lastikler için ikinci bir sorguyla
+okunur (load_tire_items). Şablon ve API sözlükleri her satır için tek geçişte üretilir
+(bkz. benchmark_tire_listing.py). Enum kolonları katı (strict) çözülür: saklanan değerler
+migrate_normalize_enum_values.py + CHECK kısıtlarıyla tutarlıdır, bilinmeyen bir değer
+sessizce varsayılana düşmek yerine hata verir.
+"""
+import json
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.utils.enum_codec import DIS_DURUMU, MEVSIM, TIRE_DURUM
+from app.utils.enums import TireDurumEnum
+from .models import Brand, Customer, Rack, Tire, TireItem
+from .tire_items import SLOT_FIELDS
+
+# TireRead'deki tire{i}_size / tire{i}_production_date alanları
+_API_SLOT_KEYS = {position: (fields[0], fields[1]) for position, fields in SLOT_FIELDS.items()}
+
+TIRE_LISTING_COLUMNS = (
+    Tire.id,
+    Tire.seri_no,
+    Tire.musteri_id,
+    Tire.ebat,
+    Tire.mevsim,
+    Tire.dis_durumu,
+    Tire.not_.label("not_"),
+    Tire.raf_id,
+    Tire.giris_tarihi,
+    Tire.cikis_tarihi,
+    Tire.durum,
+    Brand.marka_adi.label("brand_name"),
+    Customer.ad_soyad.label("customer_name"),
+    Customer.plaka.label("customer_plate"),
+    Customer.telefon.label("customer_phone"),
+    Rack.kod.label("rack_code"),
+)
+
+TIRE_ITEM_COLUMNS = (
+    TireItem.tire_id,
+    TireItem.position,
+    TireItem.size,
+    TireItem.year,
+    TireItem.mevsim,
+    Brand.marka_adi.label("brand_name"),
+)
+
+
+def tire_listing_query(db: Session):
+    """Query of TIRE_LISTING_COLUMNS rows; filter / order it like a Tire query"""
+    return db.query(*TIRE_LISTING_COLUMNS).select_from(Tire).outerjoin(
+        Brand, Brand.id == Tire.marka_id
+    ).outerjoin(
+        Customer, Customer.id == Tire.musteri_id
+    ).outerjoin(
+        Rack, Rack.id == Tire.raf_id
+    )
+
+
+def load_tire_items(db: Session, tire_ids: Iterable[int]) -> Dict[int, list]:
+    """tire_id -> TIRE_ITEM_COLUMNS rows in position order, for all `tire_ids` in one query"""
+    tire_ids = set(tire_ids)
+    items = {}
+    if not tire_ids:
+        return items
+    rows = db.query(*TIRE_ITEM_COLUMNS).outerjoin(
+        Brand, Brand.id == TireItem.brand_id
+    ).filter(
+        TireItem.tire_id.in_(tire_ids)
+    ).order_by(TireItem.tire_id, TireItem.position).all()
+    for row in rows:
+        items.setdefault(row.tire_id, []).append(row)
+    return items
+
+
+def tire_slots(items: Sequence, brand_name: str, mevsim_display: str, ebat) -> List[Tuple[str, str, str, str]]:
+    """
+    Per-tire (size, production_date, brand, mevsim) tuples from a tire's item rows.
+
+    Brand / mevsim fall back to the tire's own values. Tires without items (not yet
+    backfilled) fall back to the legacy `ebat` field.
+    """
+    brand_name = brand_name or ""
+    slots = [
+        (
+            item.size, item.year or None, item.brand_name or brand_name,
+            MEVSIM.display(item.mevsim, default=mevsim_display, strict=True)
+        )
+        for item in items
+    ]
+    if not slots and ebat:
+        slots.append((ebat.strip(), None, brand_name, mevsim_display))
+    return slots
+
+
+def _split_note(note):
+    # Format: brand_note + "\n\n" + general_note
+    if not note:
+        return "", ""
+    parts = note.split("\n\n", 1)
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+def lastik_ara_item(row, items: Sequence = ()) -> dict:
+    """/lastik-ara template dict; `items` are the tire's load_tire_items rows"""
+    mevsim_display = MEVSIM.display(row.mevsim, default="", strict=True)
+    slots = tire_slots(items, row.brand_name, mevsim_display, row.ebat)
+    brand_note, general_note = _split_note(row.not_)
+    tire_brands = [slot[2] for slot in slots]
+    tire_mevsims = [slot[3] for slot in slots]
+    return {
+        "id": row.id,
+        "seri_no": row.seri_no or None,
+        "customer_id": row.musteri_id,
+        "customer_name": row.customer_name or "",
+        "customer_plate": row.customer_plate or "",
+        "ebat": row.ebat,
+        "tire_sizes": [slot[0] for slot in slots],
+        "tire_production_dates": [slot[1] for slot in slots],
+        "tire_brands": tire_brands,
+        "tire_mevsims": tire_mevsims,
+        "brand": row.brand_name or (tire_brands[0] if tire_brands else ""),
+        "mevsim": mevsim_display or (tire_mevsims[0] if tire_mevsims else ""),
+        "rack_code": row.rack_code or "",
+        "giris_tarihi": row.giris_tarihi,
+        "cikis_tarihi": row.cikis_tarihi,
+        "durum": TIRE_DURUM.display(row.durum, default="Depoda", strict=True),
+        "brand_note": brand_note,
+        "general_note": general_note,
+    }
+
+
+def label_item(row, items: Sequence = ()) -> dict:
+    """/lastik-etiketleri template dict; `items` are the tire's load_tire_items rows"""
+    mevsim_display = MEVSIM.display(row.mevsim, default="", strict=True)
+    slots = tire_slots(items, row.brand_name, mevsim_display, row.ebat)
+    tire_sizes = [slot[0] for slot in slots]
+    return {
+        "id": row.id,
+        "seri_no": row.seri_no or None,
+        "customer_name": row.customer_name or "",
+        "customer_phone": row.customer_phone or "",
+        "customer_plate": row.customer_plate or "",
+        "ebat": row.ebat,
+        "tire_sizes": tire_sizes,
+        "tire_sizes_json": json.dumps(tire_sizes),
+        "tire_brands": [slot[2] for slot in slots],
+        "tire_mevsims": [slot[3] for slot in slots],
+        "brand": row.brand_name or "",
+        "mevsim": mevsim_display,
+        "rack_code": row.rack_code or "",
+        "dis_durumu": DIS_DURUMU.display(row.dis_durumu, default="", strict=True),
+        "giris_tarihi": row.giris_tarihi,
+        "durum": TIRE_DURUM.display(row.durum, default="Depoda", strict=True),
+    }
+
+
+def api_item(row, items: Sequence = ()) -> dict:
+    """TireRead-shaped dict for GET /api/tires (same fields as format_tire_response)"""
+    mevsim_display = MEVSIM.display(row.mevsim, strict=True)
+    slots = tire_slots(items, row.brand_name, mevsim_display, row.ebat)
+    tire_brands = [slot[2] for slot in slots]
+    tire_mevsims = [slot[3] for slot in slots]
+    item = {
+        "id": row.id,
+        "seri_no": row.seri_no or 0,
+        "musteri_id": row.musteri_id,
+        "brand": (tire_brands[0] if tire_brands else None) or row.brand_name or "",
+        "ebat": row.ebat,
+        "mevsim": (tire_mevsims[0] if tire_mevsims else None) or mevsim_display,
+        "dis_durumu": DIS_DURUMU.display(row.dis_durumu, strict=True),
+        "not_": row.not_,
+        "raf_id": row.raf_id,
+        "rack_code": row.rack_code or "",
+        "giris_tarihi": row.giris_tarihi,
+        "cikis_tarihi": row.cikis_tarihi,
+        "durum": TIRE_DURUM.to_api(row.durum, default=TireDurumEnum.DEPODA, strict=True),
+        "customer_name": row.customer_name or "",
+        "customer_plate": row.customer_plate or "",
+        "tire_brands": tire_brands or None,
+        "tire_mevsims": tire_mevsims or None,
+    }
+    item.update(slot_fields(items))
+    return item
+
+
+def slot_fields(items: Sequence) -> dict:
+    """TireRead tire{i}_size / tire{i}_production_date values from a tire's item rows"""
+    fields = {}
+    for size_key, date_key in _API_SLOT_KEYS.values():
+        fields[size_key] = None
+        fields[date_key] = None
+    for tire_item in items:
+        size_key, date_key = _API_SLOT_KEYS[tire_item.position]
+        fields[size_key] = tire_item.size
+        fields[date_key] = tire_item.year
+    return fields
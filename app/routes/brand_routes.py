@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from app.models.database import get_db
-from app.models.models import Brand, Tire
+from app.models.database import get_read_db, get_write_db
+from app.models.models import Brand, Tire, TireItem
+from app.models.reference_cache import reference_cache
+from app.models.tire_items import has_item
 
 router = APIRouter(prefix="/api/brands", tags=["brands"])
 
@@ -12,14 +15,18 @@ class BrandCreate(BaseModel):
 
 
 @router.get("/")
-def get_brands(db: Session = Depends(get_db)):
-    """Get all available tire brands from database"""
-    brands = db.query(Brand).order_by(Brand.marka_adi).all()
-    return {"brands": [brand.marka_adi for brand in brands]}
+def get_brands(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """Get all available tire brands (cached; ETag / If-None-Match aware)"""
+    snapshot = reference_cache.snapshot(db)
+    headers = {"ETag": snapshot.brands_etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == snapshot.brands_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return {"brands": snapshot.brands}
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_brand(brand: BrandCreate, db: Session = Depends(get_db)):
+def create_brand(brand: BrandCreate, db: Session = Depends(get_write_db)):
     """Create a new brand"""
     # Check if brand already exists
     existing_brand = db.query(Brand).filter(Brand.marka_adi == brand.marka_adi.strip()).first()
@@ -33,12 +40,13 @@ def create_brand(brand: BrandCreate, db: Session = Depends(get_db)):
     db.add(new_brand)
     db.commit()
     db.refresh(new_brand)
+    reference_cache.bump()
     
     return {"id": new_brand.id, "marka_adi": new_brand.marka_adi}
 
 
 @router.delete("/{brand_name}", status_code=status.HTTP_200_OK)
-def delete_brand(brand_name: str, db: Session = Depends(get_db)):
+def delete_brand(brand_name: str, db: Session = Depends(get_write_db)):
     """Delete a brand by its name if not used by any tire"""
     sanitized_name = brand_name.strip()
     brand = db.query(Brand).filter(Brand.marka_adi == sanitized_name).first()
@@ -49,7 +57,10 @@ def delete_brand(brand_name: str, db: Session = Depends(get_db)):
         )
 
     # Prevent deleting brands that are already in use (FK constraint safety)
-    is_used = db.query(Tire).filter(Tire.marka_id == brand.id).first()
+    # Slot markaları tire_items.brand_id'de; silinirse tireN_brand ile tire_items ayrışır
+    is_used = db.query(Tire.id).filter(
+        or_(Tire.marka_id == brand.id, has_item(Tire, TireItem.brand_id == brand.id))
+    ).first()
     if is_used:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -58,6 +69,7 @@ def delete_brand(brand_name: str, db: Session = Depends(get_db)):
 
     db.delete(brand)
     db.commit()
+    reference_cache.bump()
 
     return {"detail": "Marka silindi", "marka_adi": sanitized_name}
 
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
-from app.models.database import get_db
+from sqlalchemy import func, select
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+from app.models.database import get_db, get_read_db, get_write_db
 from app.models.models import Customer, TireHistory
 from app.schemas.customer_schema import CustomerCreate, CustomerRead
+from app.utils.text_utils import normalize_name
+from app.utils.customer_index import customer_index, normalize_phone, normalize_plate, rank_customer_ids
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_page, count_total
 
 router = APIRouter(prefix="/api/customers", tags=["customers"])
 
 
 @router.post("/", response_model=CustomerRead, status_code=status.HTTP_201_CREATED)
-def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
+def create_customer(customer: CustomerCreate, db: Session = Depends(get_write_db)):
     """Create a new customer"""
     existing = db.query(Customer).filter(
         func.lower(Customer.ad_soyad) == func.lower(customer.ad_soyad)
@@ -22,24 +26,75 @@ def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
         )
     db_customer = Customer(
         ad_soyad=customer.ad_soyad,
+        ad_soyad_norm=normalize_name(customer.ad_soyad),
         telefon=customer.telefon,
-        plaka=customer.plaka
+        telefon_norm=normalize_phone(customer.telefon),
+        plaka=customer.plaka,
+        plaka_norm=normalize_plate(customer.plaka)
     )
     db.add(db_customer)
     db.commit()
     db.refresh(db_customer)
+    customer_index.add_or_update(db_customer)
     return db_customer
 
 
 @router.get("/", response_model=List[CustomerRead])
-def get_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all customers"""
-    customers = db.query(Customer).offset(skip).limit(limit).all()
+def get_customers(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Legacy OFFSET paging; use cursor instead"),
+    limit: int = Query(100, ge=1, le=1000),
+    total: Optional[Literal["exact", "estimate"]] = Query(None, description="Return X-Total-Count"),
+    db: Session = Depends(get_read_db)
+):
+    """Get all customers (keyset paginated on id)"""
+    after_key = decode_cursor(cursor, length=1)
+    if cursor and after_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    query = db.query(Customer)
+    total_count = count_total(query, Customer.id, total)
+    if total_count is not None:
+        response.headers["X-Total-Count"] = str(total_count)
+    customers, has_more = keyset_page(query, [Customer.id], after_key, limit, offset=0 if cursor else skip)
+    if has_more:
+        response.headers["X-Next-Cursor"] = encode_cursor((customers[-1].id,))
     return customers
 
 
+@router.get("/search", response_model=List[CustomerRead])
+def search_customers(
+    q: str = Query(..., min_length=1, max_length=100, description="Name, plate or phone fragment"),
+    limit: int = Query(10, ge=1, le=25),
+    db: Session = Depends(get_read_db)
+):
+    """Ranked customer autocomplete (exact > prefix > word prefix > substring) over name, plate and phone"""
+    ranked_ids = rank_customer_ids(db, q, limit)
+    if not ranked_ids:
+        return []
+    customers_by_id = {
+        c.id: c for c in db.query(Customer).filter(Customer.id.in_(ranked_ids)).all()
+    }
+    return [customers_by_id[cid] for cid in ranked_ids if cid in customers_by_id]
+
+
+@router.get("/search-index")
+def get_search_index_stats():
+    """In-memory customer search index statistics"""
+    return customer_index.stats()
+
+
+@router.post("/search-index/rebuild")
+def rebuild_search_index(db: Session = Depends(get_db)):
+    """Rebuild the in-memory customer search index from the database"""
+    return customer_index.rebuild(db)
+
+
 @router.get("/{customer_id}", response_model=CustomerRead)
-def get_customer(customer_id: int, db: Session = Depends(get_db)):
+def get_customer(customer_id: int, db: Session = Depends(get_read_db)):
     """Get a specific customer by ID"""
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
@@ -54,7 +109,7 @@ def get_customer(customer_id: int, db: Session = Depends(get_db)):
 def update_customer(
     customer_id: int,
     customer: CustomerCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Update a customer"""
     db_customer = db.query(Customer).filter(Customer.id == customer_id).first()
@@ -75,98 +130,99 @@ def update_customer(
         )
     
     db_customer.ad_soyad = customer.ad_soyad
+    db_customer.ad_soyad_norm = normalize_name(customer.ad_soyad)
     db_customer.telefon = customer.telefon
+    db_customer.telefon_norm = normalize_phone(customer.telefon)
     db_customer.plaka = customer.plaka
+    db_customer.plaka_norm = normalize_plate(customer.plaka)
     
     db.commit()
     db.refresh(db_customer)
+    customer_index.add_or_update(db_customer)
     return db_customer
 
 
-@router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_customer(customer_id: int, db: Session = Depends(get_db)):
-    """Delete a customer (manually delete related tires to avoid enum issues)"""
+class BulkCustomerDelete(BaseModel):
+    """Schema for bulk deleting customers"""
+    customer_ids: List[int] = Field(..., min_length=1)
+
+
+def _delete_customers(db: Session, customer_ids: List[int]) -> List[int]:
+    """
+    Delete customers with their tires and history in one transaction.
+
+    Set-based: rack counters/statuses for every affected rack are recomputed by a
+    single grouped UPDATE, then tires, history and customers are removed with one
+    bulk DELETE each (no Tire objects are loaded). Returns the deleted customer ids.
+    """
+    from app.models.models import Tire, TireItem
+    from app.models.rack_counter import release_active_tires
+
+    found_ids = [
+        row.id for row in db.query(Customer.id).filter(Customer.id.in_(customer_ids)).all()
+    ]
+    if not found_ids:
+        return []
+
     try:
-        db_customer = db.query(Customer).filter(Customer.id == customer_id).first()
-        if not db_customer:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Müşteri bulunamadı"
-            )
-        
-        # Get related tires before deletion to update rack statuses
-        from app.models.models import Tire, Rack
-        from app.utils.enums import RackDurumEnum
-        from sqlalchemy import func, cast, String
-        
-        # Get rack IDs from tires before deletion (avoid enum reading issues)
-        # Get rack IDs directly without reading enum to avoid conversion errors
-        try:
-            # Get rack IDs directly without reading enum
-            rack_ids_result = db.query(Tire.raf_id).filter(Tire.musteri_id == customer_id).distinct().all()
-            affected_rack_ids = [row[0] for row in rack_ids_result if row[0] is not None]
-        except Exception as e:
-            print(f"Error getting rack IDs: {e}")
-            affected_rack_ids = []
-        
-        # Delete tires manually first (avoid cascade delete enum issues)
-        # Delete tires directly without loading them (to avoid enum reading)
-        try:
-            # Use bulk delete to avoid loading Tire objects
-            deleted_count = db.query(Tire).filter(Tire.musteri_id == customer_id).delete(synchronize_session=False)
-            print(f"Deleted {deleted_count} tires for customer {customer_id}")
-        except Exception as e:
-            print(f"Error deleting tires: {e}")
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Lastikler silinirken bir hata oluştu: {str(e)}"
-            )
-        
-        # Delete tire history records referencing this customer to avoid FK violations
-        try:
-            history_deleted = db.query(TireHistory).filter(TireHistory.musteri_id == customer_id).delete(synchronize_session=False)
-            print(f"Deleted {history_deleted} history records for customer {customer_id}")
-        except Exception as e:
-            print(f"Error deleting tire history: {e}")
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Müşteri geçmişi silinirken bir hata oluştu: {str(e)}"
-            )
-        
-        # Now delete customer
-        db.delete(db_customer)
-        db.commit()
-        
-        # Update rack statuses if needed (check if racks are now empty)
-        # Use string comparison to avoid enum conversion issues
-        for rack_id in affected_rack_ids:
-            try:
-                rack = db.query(Rack).filter(Rack.id == rack_id).first()
-                if rack:
-                    # Count remaining tires in this rack with status "DEPODA"
-                    # Use cast to string to avoid enum conversion issues
-                    remaining_tires_count = db.query(func.count(Tire.id)).filter(
-                        Tire.raf_id == rack_id,
-                        cast(Tire.durum, String) == "DEPODA"
-                    ).scalar()
-                    
-                    if remaining_tires_count == 0:
-                        rack.durum = RackDurumEnum.BOS
-                        db.add(rack)
-            except Exception as e:
-                print(f"Error updating rack {rack_id}: {e}")
-                continue  # Continue with next rack
-        
+        # Raf sayaçları: toplu silme ORM event'lerini tetiklemediği için lastikler silinmeden önce düşülür
+        release_active_tires(db.connection(), Tire.musteri_id.in_(found_ids))
+        # FK ON DELETE CASCADE'e bırakılmaz: SQLite'ta foreign_keys kapalı olabilir
+        db.query(TireItem).filter(
+            TireItem.tire_id.in_(select(Tire.id).where(Tire.musteri_id.in_(found_ids)))
+        ).delete(synchronize_session=False)
+        deleted_tires = db.query(Tire).filter(
+            Tire.musteri_id.in_(found_ids)
+        ).delete(synchronize_session=False)
+        # Geçmiş kayıtları müşteriye FK ile bağlı
+        deleted_history = db.query(TireHistory).filter(
+            TireHistory.musteri_id.in_(found_ids)
+        ).delete(synchronize_session=False)
+        db.query(Customer).filter(
+            Customer.id.in_(found_ids)
+        ).delete(synchronize_session=False)
         db.commit()
-        return None
-    except HTTPException:
+    except Exception:
+        db.rollback()
         raise
+
+    print(f"Deleted {len(found_ids)} customers, {deleted_tires} tires, {deleted_history} history records")
+    for customer_id in found_ids:
+        customer_index.remove(customer_id)
+    return found_ids
+
+
+@router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+def delete_customers_bulk(data: BulkCustomerDelete, db: Session = Depends(get_write_db)):
+    """Delete multiple customers (and their tires / history) in one transaction"""
+    try:
+        deleted = _delete_customers(db, list(set(data.customer_ids)))
     except Exception as e:
-        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Müşteri silinirken bir hata oluştu: {str(e)}"
+            detail=f"Müşteriler silinirken bir hata oluştu: {str(e)}"
         )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Silinecek müşteri bulunamadı."
+        )
+    return None
 
+
+@router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_customer(customer_id: int, db: Session = Depends(get_write_db)):
+    """Delete a customer with their tires and history (single transaction)"""
+    try:
+        deleted = _delete_customers(db, [customer_id])
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Müşteri silinirken bir hata oluştu: {str(e)}"
+        )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Müşteri bulunamadı"
+        )
+    return None
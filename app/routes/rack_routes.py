@@ -1,23 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import func
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
-from app.models.database import get_db
+from app.models.database import get_read_db, get_write_db
 from app.models.models import Rack
 from app.schemas.rack_schema import RackCreate, RackRead
 from app.utils.enums import RackDurumEnum
+from app.utils.rack_codes import rack_sort_keys
+from app.models.rack_counter import reconcile_rack_counters
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_page, count_total
 
 router = APIRouter(prefix="/api/racks", tags=["racks"])
 
 
+# Tek istekte oluşturulabilecek en fazla raf (bütün bir depo bölümü)
+MAX_BULK_RACKS = 10000
+# Çok satırlı INSERT başına satır (SQLite bind parametre limitinin altında kalmak için)
+BULK_INSERT_BATCH_SIZE = 1000
+
+
 class BulkRackCreate(BaseModel):
     """Schema for bulk creating racks"""
     raf_adi: str = Field(..., description="Rack name prefix (e.g., 'A')")
-    sayi: int = Field(..., ge=1, le=100, description="Number of racks to create")
+    sayi: int = Field(..., ge=1, le=MAX_BULK_RACKS, description="Number of racks to create")
+
+
+def _insert_racks_skip_existing(db: Session, rows: List[dict]) -> List[dict]:
+    """Multi-row INSERT ... ON CONFLICT (kod) DO NOTHING RETURNING; returns only the inserted racks"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    table = Rack.__table__
+    inserted = []
+    for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        stmt = insert(table).values(rows[start:start + BULK_INSERT_BATCH_SIZE]).on_conflict_do_nothing(
+            index_elements=[table.c.kod]
+        ).returning(table.c.id, table.c.kod, table.c.durum, table.c["not"], table.c.active_tire_count, table.c.sort_number)
+        inserted.extend(dict(row._mapping) for row in db.execute(stmt))
+    # RETURNING sırası garanti değil
+    inserted.sort(key=lambda rack: rack["sort_number"])
+    return inserted
 
 
 @router.post("/bulk", response_model=List[RackRead], status_code=status.HTTP_201_CREATED)
-def create_racks_bulk(bulk_data: BulkRackCreate, db: Session = Depends(get_db)):
+def create_racks_bulk(bulk_data: BulkRackCreate, db: Session = Depends(get_write_db)):
     """Create multiple racks at once (e.g., A-1, A-2, A-3... A-8)
     
     If racks with the same prefix already exist (e.g., A-1-A-4), 
@@ -25,70 +53,35 @@ def create_racks_bulk(bulk_data: BulkRackCreate, db: Session = Depends(get_db)):
     If requested number is less than existing racks, show warning.
     """
     try:
-        # Check both old format (A1) and new format (A-1)
-        # New format check: RAF_ADI + "-"
-        pattern = f"{bulk_data.raf_adi}-"
-        existing_racks_new = db.query(Rack).filter(Rack.kod.like(f"{pattern}%")).all()
-        
-        # Old format check: RAF_ADI (without hyphen)
-        existing_racks_old = db.query(Rack).filter(Rack.kod.like(f"{bulk_data.raf_adi}%")).all()
-        
-        existing_numbers = []
-        
-        # Extract from new format: "A-4" -> 4
-        for rack in existing_racks_new:
-            try:
-                code_suffix = rack.kod[len(pattern):]
-                if code_suffix.isdigit():
-                    existing_numbers.append(int(code_suffix))
-            except (ValueError, IndexError):
-                continue
-        
-        # Extract from old format (legacy support): "A4" -> 4
-        for rack in existing_racks_old:
-            if "-" in rack.kod: # Skip new format as it's already processed
-                continue
-            try:
-                code_suffix = rack.kod[len(bulk_data.raf_adi):]
-                if code_suffix.isdigit():
-                    existing_numbers.append(int(code_suffix))
-            except (ValueError, IndexError):
-                continue
-        
-        # Find the maximum existing number
-        max_existing = max(existing_numbers) if existing_numbers else 0
-        
-        # Create only missing racks (always using new format with hyphen)
-        created_racks = []
-        start_num = max_existing + 1
+        # Highest existing number for this prefix, both old (A4) and new (A-4) formats,
+        # from the precomputed sort keys (single indexed lookup)
+        max_existing = db.query(func.max(Rack.sort_number)).filter(
+            Rack.sort_prefix == bulk_data.raf_adi
+        ).scalar() or 0
         
-        for i in range(start_num, bulk_data.sayi + 1):
-            rack_code = f"{bulk_data.raf_adi}-{i}"
-            
-            # Double-check if rack code already exists
-            existing_rack = db.query(Rack).filter(Rack.kod == rack_code).first()
-            if existing_rack:
-                continue
-            
-            db_rack = Rack(
-                kod=rack_code,
-                durum=RackDurumEnum.BOS,
-                not_=None
-            )
-            db.add(db_rack)
-            created_racks.append(db_rack)
-        
-        if not created_racks and bulk_data.sayi <= max_existing:
-             raise HTTPException(
+        if bulk_data.sayi <= max_existing:
+            raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"'{bulk_data.raf_adi}' için {bulk_data.sayi} adet raf zaten mevcut. En yüksek numara: {max_existing}"
             )
         
-        db.commit()
-        
-        for rack in created_racks:
-            db.refresh(rack)
+        # Create only missing racks (always using new format with hyphen)
+        rows = []
+        for i in range(max_existing + 1, bulk_data.sayi + 1):
+            rack_code = f"{bulk_data.raf_adi}-{i}"
+            sort_prefix, sort_number = rack_sort_keys(rack_code)
+            rows.append({
+                "kod": rack_code,
+                "sort_prefix": sort_prefix,
+                "sort_number": sort_number,
+                "durum": RackDurumEnum.BOS,
+                "active_tire_count": 0,
+                "not": None
+            })
         
+        # Eşzamanlı bir istek aynı kodu eklediyse o satır sessizce atlanır
+        created_racks = _insert_racks_skip_existing(db, rows)
+        db.commit()
         return created_racks
     
     except HTTPException:
@@ -107,42 +100,56 @@ class BulkRackDelete(BaseModel):
 
 
 @router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
-def delete_racks_bulk(data: BulkRackDelete, db: Session = Depends(get_db)):
-    """Delete multiple racks at once - only empty and never-used racks can be deleted"""
-    from app.models.models import Tire
+def delete_racks_bulk(data: BulkRackDelete, db: Session = Depends(get_write_db)):
+    """Delete multiple racks at once - only empty racks can be deleted
+
+    Set-based: one grouped occupancy query, one detach UPDATE and one DELETE,
+    regardless of how many racks are removed.
+    """
+    from app.models.models import Tire, TireDurumEnum as ModelTireDurumEnum
     
     try:
-        racks = db.query(Rack).filter(Rack.id.in_(data.rack_ids)).all()
+        rack_ids = list(set(data.rack_ids))
+        
+        # 1) Occupancy: requested racks with their ACTIVE (DEPODA) tire counts, in one grouped query.
+        # Sayaç yerine lastik tablosundan sayılır; silme geri alınamaz olduğu için kesin kaynak kullanılır.
+        occupancy = db.query(
+            Rack.id,
+            Rack.kod,
+            func.count(Tire.id).label("active_count")
+        ).outerjoin(
+            Tire, (Tire.raf_id == Rack.id) & (Tire.durum == ModelTireDurumEnum.DEPODA)
+        ).filter(
+            Rack.id.in_(rack_ids)
+        ).group_by(Rack.id, Rack.kod).all()
         
-        if not racks:
+        if not occupancy:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Silinecek raf bulunamadı."
             )
-            
-        from app.models.models import Tire, TireDurumEnum as ModelTireDurumEnum
         
-        for rack in racks:
-            # Check if there are any ACTIVE tires in this rack (status "Depoda")
-            active_tires = db.query(Tire).filter(
-                Tire.raf_id == rack.id,
-                Tire.durum == ModelTireDurumEnum.DEPODA
-            ).first()
-            
-            if active_tires:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"'{rack.kod}' rafı dolu olduğu için silinemez. Önce içindeki lastikleri çıkarın."
-                )
-            
-            # Update historical tire records to remove the rack reference
-            # This is safe because raf_id is now nullable
-            db.query(Tire).filter(Tire.raf_id == rack.id).update({Tire.raf_id: None})
+        # Report every blocking rack at once
+        blocking = sorted(row.kod for row in occupancy if row.active_count > 0)
+        if blocking:
+            raf_list = ", ".join(f"'{kod}'" for kod in blocking)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{raf_list} rafı dolu olduğu için silinemez. Önce içindeki lastikleri çıkarın."
+            )
+        
+        found_ids = [row.id for row in occupancy]
+        
+        # 2) Detach historical (non-DEPODA) tire records from these racks (raf_id is nullable).
+        # Arada rafa yeni lastik eklenirse o satır ayrılmaz ve FK kısıtı silmeyi engeller.
+        db.query(Tire).filter(
+            Tire.raf_id.in_(found_ids),
+            Tire.durum != ModelTireDurumEnum.DEPODA
+        ).update({Tire.raf_id: None}, synchronize_session=False)
+        
+        # 3) Delete the racks
+        db.query(Rack).filter(Rack.id.in_(found_ids)).delete(synchronize_session=False)
         
-        # All checks passed and refs cleared, delete them
-        for rack in racks:
-            db.delete(rack)
-            
         db.commit()
         return None
         
@@ -156,10 +163,17 @@ def delete_racks_bulk(data: BulkRackDelete, db: Session = Depends(get_db)):
         )
 
 
+@router.post("/reconcile-counters")
+def reconcile_counters(db: Session = Depends(get_write_db)):
+    """Recompute active_tire_count / durum for all racks and report drifted ones"""
+    drifted = reconcile_rack_counters(db)
+    return {"drifted": drifted, "fixed": len(drifted)}
+
+
 @router.delete("/{rack_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_rack(rack_id: int, db: Session = Depends(get_db)):
+def delete_rack(rack_id: int, db: Session = Depends(get_write_db)):
     """Delete a rack - only currently empty racks can be deleted"""
-    from app.models.models import Tire, TireDurumEnum as ModelTireDurumEnum
+    from app.models.models import Tire
     
     db_rack = db.query(Rack).filter(Rack.id == rack_id).first()
     if not db_rack:
@@ -168,13 +182,8 @@ def delete_rack(rack_id: int, db: Session = Depends(get_db)):
             detail=f"Raf bulunamadı (ID: {rack_id})"
         )
     
-    # Check if there are any ACTIVE tires in this rack (status "Depoda")
-    active_tires = db.query(Tire).filter(
-        Tire.raf_id == rack_id,
-        Tire.durum == ModelTireDurumEnum.DEPODA
-    ).first()
-    
-    if active_tires:
+    # Check if there are any ACTIVE tires in this rack (materialized counter)
+    if db_rack.active_tire_count > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"'{db_rack.kod}' rafı dolu olduğu için silinemez. Önce içindeki lastikleri çıkarın."
@@ -195,7 +204,7 @@ def delete_rack(rack_id: int, db: Session = Depends(get_db)):
     return None
 
 
-def create_rack(rack: RackCreate, db: Session = Depends(get_db)):
+def create_rack(rack: RackCreate, db: Session = Depends(get_write_db)):
     """Create a new rack"""
     # Check if rack code already exists
     existing_rack = db.query(Rack).filter(Rack.kod == rack.kod).first()
@@ -218,14 +227,33 @@ def create_rack(rack: RackCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[RackRead])
-def get_racks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all racks"""
-    racks = db.query(Rack).order_by(Rack.kod).offset(skip).limit(limit).all()
+def get_racks(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Legacy OFFSET paging; use cursor instead"),
+    limit: int = Query(100, ge=1, le=1000),
+    total: Optional[Literal["exact", "estimate"]] = Query(None, description="Return X-Total-Count"),
+    db: Session = Depends(get_read_db)
+):
+    """Get all racks (keyset paginated on kod, id)"""
+    after_key = decode_cursor(cursor)
+    if cursor and after_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    query = db.query(Rack)
+    total_count = count_total(query, Rack.id, total)
+    if total_count is not None:
+        response.headers["X-Total-Count"] = str(total_count)
+    racks, has_more = keyset_page(query, [Rack.kod, Rack.id], after_key, limit, offset=0 if cursor else skip)
+    if has_more:
+        response.headers["X-Next-Cursor"] = encode_cursor((racks[-1].kod, racks[-1].id))
     return racks
 
 
 @router.get("/{rack_id}", response_model=RackRead)
-def get_rack(rack_id: int, db: Session = Depends(get_db)):
+def get_rack(rack_id: int, db: Session = Depends(get_read_db)):
     """Get a specific rack by ID"""
     rack = db.query(Rack).filter(Rack.id == rack_id).first()
     if not rack:
@@ -240,7 +268,7 @@ def get_rack(rack_id: int, db: Session = Depends(get_db)):
 def update_rack(
     rack_id: int,
     rack: RackCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Update a rack"""
     db_rack = db.query(Rack).filter(Rack.id == rack_id).first()
@@ -260,7 +288,7 @@ def update_rack(
             )
     
     db_rack.kod = rack.kod
-    db_rack.durum = rack.durum
+    # durum is derived from active_tire_count and cannot be set manually
     db_rack.not_ = rack.not_
     
     db.commit()
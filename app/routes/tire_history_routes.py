@@ -1,39 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
-from app.models.database import get_db
+from app.models.database import get_read_db
 from app.models.models import TireHistory, Customer, Tire, Brand
 from app.models.models import IslemTuruEnum as ModelIslemTuruEnum
 from app.utils.enums import IslemTuruEnum
+from app.models.search_index import history_customer_name_filter
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_page, count_total
+from app.utils.enum_codec import MEVSIM, ISLEM_TURU
 import json
-import unicodedata
-
-
-def normalize_turkish_text(text: str) -> str:
-    """
-    Türkçe karakterleri normalize eder ve lowercase'e çevirir.
-    Büyük/küçük harf duyarsız ve Türkçe karakter desteği için kullanılır.
-    """
-    if not text:
-        return ""
-    # Önce lowercase'e çevir
-    text = text.lower()
-    # Türkçe karakterleri normalize et (büyük ve küçük harfleri kapsar)
-    text = text.replace('ı', 'i')
-    text = text.replace('ş', 's')
-    text = text.replace('ğ', 'g')
-    text = text.replace('ü', 'u')
-    text = text.replace('ö', 'o')
-    text = text.replace('ç', 'c')
-    # Büyük harfli Türkçe karakterleri de normalize et (lowercase sonrası gerekli değil ama güvenlik için)
-    text = text.replace('İ', 'i')
-    text = text.replace('Ş', 's')
-    text = text.replace('Ğ', 'g')
-    text = text.replace('Ü', 'u')
-    text = text.replace('Ö', 'o')
-    text = text.replace('Ç', 'c')
-    return text
 
 router = APIRouter(prefix="/api/tire-history", tags=["tire-history"])
 
@@ -45,26 +21,27 @@ def get_tire_history(
     phone: Optional[str] = Query(None),
     date_from: Optional[str] = Query(None),
     date_to: Optional[str] = Query(None),
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Legacy OFFSET paging; use cursor instead"),
+    limit: int = Query(100, ge=1, le=1000),
+    total: Optional[Literal["exact", "estimate"]] = Query(None, description="Return total (exact or estimate)"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get tire history with filters"""
+    """Get tire history with filters (keyset paginated on islem_tarihi DESC, id DESC)"""
+    after_key = decode_cursor(cursor)
+    if cursor and after_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
     query = db.query(TireHistory)
     
     if customer_name:
-        # Türkçe karakter ve büyük/küçük harf duyarsız arama için normalize et
-        normalized_search = normalize_turkish_text(customer_name)
-        # Tüm geçmiş kayıtlarını al ve normalize ederek karşılaştır
-        all_history = db.query(TireHistory).all()
-        matching_history_ids = [
-            h.id for h in all_history 
-            if normalized_search in normalize_turkish_text(h.musteri_adi)
-        ]
-        if matching_history_ids:
-            query = query.filter(TireHistory.id.in_(matching_history_ids))
-        else:
-            query = query.filter(TireHistory.id == -1)  # No results
+        # Türkçe karakter ve büyük/küçük harf duyarsız arama (musteri_adi_norm indeksi üzerinden)
+        name_filter = history_customer_name_filter(db, customer_name)
+        if name_filter is not None:
+            query = query.filter(name_filter)
     
     if plate:
         query = query.filter(TireHistory.plaka.ilike(f"%{plate}%"))
@@ -86,7 +63,15 @@ def get_tire_history(
         except ValueError:
             pass
     
-    history_items = query.order_by(TireHistory.islem_tarihi.desc()).offset(skip).limit(limit).all()
+    # total: filtrelenmiş kayıt sayısı (sayfa boyutu değil)
+    total_count = count_total(query, TireHistory.id, total)
+    history_items, has_more = keyset_page(
+        query, [TireHistory.islem_tarihi, TireHistory.id], after_key, limit,
+        descending=True, offset=0 if cursor else skip
+    )
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor((history_items[-1].islem_tarihi, history_items[-1].id))
     
     result = []
     for item in history_items:
@@ -107,8 +92,8 @@ def get_tire_history(
                 pass
         
         # Get mevsim values
-        eski_mevsim = item.eski_lastik_mevsim.value if item.eski_lastik_mevsim and hasattr(item.eski_lastik_mevsim, 'value') else (str(item.eski_lastik_mevsim) if item.eski_lastik_mevsim else None)
-        yeni_mevsim = item.yeni_lastik_mevsim.value if item.yeni_lastik_mevsim and hasattr(item.yeni_lastik_mevsim, 'value') else (str(item.yeni_lastik_mevsim) if item.yeni_lastik_mevsim else None)
+        eski_mevsim = MEVSIM.display(item.eski_lastik_mevsim)
+        yeni_mevsim = MEVSIM.display(item.yeni_lastik_mevsim)
         
         # Get serial numbers
         eski_seri_no = item.eski_seri_no if hasattr(item, 'eski_seri_no') and item.eski_seri_no else None
@@ -119,7 +104,7 @@ def get_tire_history(
             "musteri_adi": item.musteri_adi,
             "plaka": item.plaka,
             "telefon": item.telefon,
-            "islem_turu": item.islem_turu.value if hasattr(item.islem_turu, 'value') else str(item.islem_turu),
+            "islem_turu": ISLEM_TURU.display(item.islem_turu),
             "islem_tarihi": item.islem_tarihi,
             "eski_lastik_ebat": eski_ebat_list,
             "eski_lastik_marka": item.eski_lastik_marka,
@@ -134,5 +119,5 @@ def get_tire_history(
             "not": item.not_
         })
     
-    return {"items": result, "total": len(result)}
+    return {"items": result, "total": total_count, "next_cursor": next_cursor}
 
@@ -1,41 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
-from app.models.database import get_db
-from app.models.models import Tire, Brand, Customer, Rack, TireHistory
+from app.models.database import get_read_db, get_write_db
+from app.models.models import Tire, TireItem, Brand, Customer, Rack, TireHistory
 from app.models.models import TireDurumEnum as ModelTireDurumEnum
-from app.models.models import MevsimEnum as ModelMevsimEnum
 from app.models.models import IslemTuruEnum as ModelIslemTuruEnum
 from app.schemas.tire_schema import TireCreate, TireRead
-from app.utils.enums import TireDurumEnum, MevsimEnum, DisDurumuEnum, BRAND_LIST, RackDurumEnum, IslemTuruEnum
+from app.utils.enums import TireDurumEnum, MevsimEnum, DisDurumuEnum, BRAND_LIST, IslemTuruEnum
+from app.models.seri_no import seri_no_allocator
+from app.models.reference_cache import reference_cache
+from app.utils.enum_codec import TIRE_DURUM, MEVSIM
+from app.models.tire_listing import tire_listing_query, load_tire_items, tire_slots, slot_fields, api_item
+from app.models.tire_items import has_item
+from app.utils.text_utils import normalize_name
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_page, count_total
 import json
 
 router = APIRouter(prefix="/api/tires", tags=["tires"])
 
 
 def get_next_seri_no(db: Session) -> int:
-    """Get the next available serial number"""
-    max_seri_no = db.query(func.max(Tire.seri_no)).scalar()
-    if max_seri_no is None:
-        return 1
-    return max_seri_no + 1
-
-
-def get_or_create_brand(db: Session, brand_name: str) -> Brand:
-    """Get existing brand or create if it doesn't exist"""
-    brand = db.query(Brand).filter(Brand.marka_adi == brand_name).first()
-    if not brand:
-        brand = Brand(marka_adi=brand_name)
-        db.add(brand)
-        db.commit()
-        db.refresh(brand)
-    return brand
+    """Get the next available serial number (sequence / counter backed, safe under concurrency)"""
+    return seri_no_allocator.next(db)
+
+
+def get_or_create_brand_id(db: Session, brand_name: str) -> int:
+    """
+    Get existing brand id (from the reference cache) or create the brand if it doesn't exist.
+
+    Yeni marka yalnızca flush edilir; lastik kaydıyla birlikte commit edilir (kayıt
+    başarısız olursa marka da eklenmez), önbellek commit'te yenilenir.
+    """
+    brand_id = reference_cache.brand_id(db, brand_name)
+    if brand_id is not None:
+        return brand_id
+    brand = Brand(marka_adi=brand_name)
+    db.add(brand)
+    db.flush()
+    reference_cache.add_pending_brand(db, brand)
+    return brand.id
+
+
+def ensure_slot_brands(db: Session, tire: TireCreate):
+    """Create missing per-tire brands (tire1..tire6_brand) so tire_items.brand_id can point to them"""
+    for i in range(1, 7):
+        name = getattr(tire, f"tire{i}_brand", None)
+        if getattr(tire, f"tire{i}_size", None) and name and name.strip():
+            get_or_create_brand_id(db, name.strip())
 
 
 @router.post("/", response_model=TireRead, status_code=status.HTTP_201_CREATED)
-def create_tire(tire: TireCreate, db: Session = Depends(get_db)):
+def create_tire(tire: TireCreate, db: Session = Depends(get_write_db)):
     """Create a new tire"""
     # Validate customer exists
     customer = db.query(Customer).filter(Customer.id == tire.musteri_id).first()
@@ -54,32 +70,14 @@ def create_tire(tire: TireCreate, db: Session = Depends(get_db)):
         )
     
     # Get or create brand (used as fallback/default)
-    brand = get_or_create_brand(db, tire.brand)
+    brand_id = get_or_create_brand_id(db, tire.brand)
+    ensure_slot_brands(db, tire)
     
     # Set entry date if not provided
     entry_date = tire.giris_tarihi if tire.giris_tarihi else datetime.now()
     
-    # Convert durum enum from schema enum to model enum
-    # Schema uses TireDurumEnum from utils.enums (values: "Depoda", "Çıkmış")
-    # Model uses TireDurumEnum from models.models (values: "DEPODA", "CIKTI")
-    # ModelTireDurumEnum is already imported at the top
-    if isinstance(tire.durum, str):
-        if tire.durum.strip() == "Depoda" or tire.durum.strip() == "DEPODA":
-            durum_value = ModelTireDurumEnum.DEPODA
-        elif tire.durum.strip() == "Çıkmış" or tire.durum.strip() == "CIKTI":
-            durum_value = ModelTireDurumEnum.CIKTI
-        else:
-            durum_value = ModelTireDurumEnum.DEPODA  # Default
-    else:
-        # It's an enum instance from schema
-        # Check its value and convert to model enum
-        durum_str = tire.durum.value if hasattr(tire.durum, 'value') else str(tire.durum)
-        if durum_str == "Depoda" or durum_str == "DEPODA":
-            durum_value = ModelTireDurumEnum.DEPODA
-        elif durum_str == "Çıkmış" or durum_str == "CIKTI":
-            durum_value = ModelTireDurumEnum.CIKTI
-        else:
-            durum_value = ModelTireDurumEnum.DEPODA  # Default
+    # Schema enum (utils: "Depoda") -> model enum (DB: "DEPODA")
+    durum_value = TIRE_DURUM.decode(tire.durum) or ModelTireDurumEnum.DEPODA
     
     try:
         # Get next serial number
@@ -97,7 +95,7 @@ def create_tire(tire: TireCreate, db: Session = Depends(get_db)):
         db_tire = Tire(
             seri_no=seri_no,
             musteri_id=tire.musteri_id,
-            marka_id=brand.id,
+            marka_id=brand_id,
             ebat=tire.ebat or '',
             mevsim=tire.mevsim,
             dis_durumu=tire.dis_durumu,
@@ -134,11 +132,7 @@ def create_tire(tire: TireCreate, db: Session = Depends(get_db)):
         )
         db.add(db_tire)
         
-        # Update rack status to "Dolu" (Full)
-        rack.durum = RackDurumEnum.DOLU
-        db.add(rack)
-        
-        # Commit both changes together (atomic transaction)
+        # Rack active_tire_count / durum are updated in the same flush (app/models/rack_counter.py)
         db.commit()
         db.refresh(db_tire)
         
@@ -166,37 +160,48 @@ def create_tire(tire: TireCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[TireRead])
 def get_tires(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Legacy OFFSET paging; use cursor instead"),
     limit: int = Query(100, ge=1, le=1000),
+    total: Optional[Literal["exact", "estimate"]] = Query(None, description="Return X-Total-Count"),
     brand: Optional[str] = Query(None, description="Filter by brand name"),
-    status: Optional[TireDurumEnum] = Query(None, description="Filter by status"),
+    durum: Optional[TireDurumEnum] = Query(None, alias="status", description="Filter by status"),
     plate: Optional[str] = Query(None, description="Filter by customer license plate"),
     rack_code: Optional[str] = Query(None, description="Filter by rack code"),
     entry_date_from: Optional[datetime] = Query(None, description="Filter by entry date from"),
     entry_date_to: Optional[datetime] = Query(None, description="Filter by entry date to"),
     exit_date_from: Optional[datetime] = Query(None, description="Filter by exit date from"),
     exit_date_to: Optional[datetime] = Query(None, description="Filter by exit date to"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get all tires with optional filtering"""
-    query = db.query(Tire)
+    """Get all tires with optional filtering (keyset paginated on giris_tarihi DESC, id DESC)"""
+    after_key = decode_cursor(cursor)
+    if cursor and after_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    filters = []
     
     # Apply filters
     if brand:
-        brand_obj = db.query(Brand).filter(Brand.marka_adi == brand).first()
-        if brand_obj:
-            query = query.filter(Tire.marka_id == brand_obj.id)
+        brand_id = reference_cache.brand_id(db, brand)
+        if brand_id is not None:
+            # Herhangi bir lastiğinin markası (ix_tire_items_brand_id_tire_id)
+            filters.append(has_item(Tire, TireItem.brand_id == brand_id))
         else:
             # Brand doesn't exist, return empty list
             return []
     
-    if status:
-        query = query.filter(Tire.durum == status)
+    if durum:
+        filters.append(Tire.durum == TIRE_DURUM.decode(durum))
     
     if plate:
         customer = db.query(Customer).filter(Customer.plaka == plate).first()
         if customer:
-            query = query.filter(Tire.musteri_id == customer.id)
+            filters.append(Tire.musteri_id == customer.id)
         else:
             # Customer with this plate doesn't exist
             return []
@@ -204,40 +209,42 @@ def get_tires(
     if rack_code:
         rack = db.query(Rack).filter(Rack.kod == rack_code).first()
         if rack:
-            query = query.filter(Tire.raf_id == rack.id)
+            filters.append(Tire.raf_id == rack.id)
         else:
             # Rack with this code doesn't exist
             return []
     
     if entry_date_from:
-        query = query.filter(Tire.giris_tarihi >= entry_date_from)
+        filters.append(Tire.giris_tarihi >= entry_date_from)
     
     if entry_date_to:
-        query = query.filter(Tire.giris_tarihi <= entry_date_to)
+        filters.append(Tire.giris_tarihi <= entry_date_to)
     
     if exit_date_from:
-        query = query.filter(Tire.cikis_tarihi >= exit_date_from)
+        filters.append(Tire.cikis_tarihi >= exit_date_from)
     
     if exit_date_to:
-        query = query.filter(Tire.cikis_tarihi <= exit_date_to)
+        filters.append(Tire.cikis_tarihi <= exit_date_to)
     
-    # Order by entry_date descending
-    query = query.order_by(Tire.giris_tarihi.desc())
+    total_count = count_total(db.query(Tire).filter(*filters), Tire.id, total)
+    if total_count is not None:
+        response.headers["X-Total-Count"] = str(total_count)
     
-    # Apply pagination and eager load relationships
-    from sqlalchemy.orm import joinedload
-    tires = query.options(
-        joinedload(Tire.brand),
-        joinedload(Tire.customer),
-        joinedload(Tire.rack)
-    ).offset(skip).limit(limit).all()
+    # Column projection (brand / customer / rack via outer joins), no ORM hydration.
+    # Order by entry_date descending (id breaks ties so the cursor is stable)
+    rows, has_more = keyset_page(
+        tire_listing_query(db).filter(*filters), [Tire.giris_tarihi, Tire.id], after_key, limit,
+        descending=True, offset=0 if cursor else skip
+    )
+    if has_more:
+        response.headers["X-Next-Cursor"] = encode_cursor((rows[-1].giris_tarihi, rows[-1].id))
     
-    # Format response with relationships
-    return [format_tire_response(tire, db) for tire in tires]
+    items = load_tire_items(db, [row.id for row in rows])
+    return [api_item(row, items.get(row.id, ())) for row in rows]
 
 
 @router.get("/{tire_id}", response_model=TireRead)
-def get_tire(tire_id: int, db: Session = Depends(get_db)):
+def get_tire(tire_id: int, db: Session = Depends(get_read_db)):
     """Get a specific tire by ID"""
     try:
         from sqlalchemy.orm import joinedload
@@ -266,7 +273,7 @@ def get_tire(tire_id: int, db: Session = Depends(get_db)):
 def update_tire(
     tire_id: int,
     tire: TireCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Update a tire"""
     try:
@@ -294,15 +301,12 @@ def update_tire(
             )
         
         # Get or create brand
-        brand = get_or_create_brand(db, tire.brand)
-        
-        # Store old rack ID to update its status if changed
-        old_rack_id = db_tire.raf_id
-        old_rack = db.query(Rack).filter(Rack.id == old_rack_id).first()
+        brand_id = get_or_create_brand_id(db, tire.brand)
+        ensure_slot_brands(db, tire)
         
         # Update tire fields
         db_tire.musteri_id = tire.musteri_id
-        db_tire.marka_id = brand.id
+        db_tire.marka_id = brand_id
         db_tire.ebat = tire.ebat or ''
         db_tire.mevsim = tire.mevsim
         db_tire.dis_durumu = tire.dis_durumu
@@ -346,79 +350,16 @@ def update_tire(
         db_tire.tire6_brand = per_tire_brand(6)
         db_tire.tire6_mevsim = per_tire_mevsim(6)
         
-        # Ensure durum is enum, not string
-        # Convert from utils enum to model enum (they should match now, but be safe)
-        if isinstance(tire.durum, str):
-            if tire.durum.strip() == "Çıkmış":
-                db_tire.durum = ModelTireDurumEnum.CIKTI
-            elif tire.durum.strip() == "Depoda":
-                db_tire.durum = ModelTireDurumEnum.DEPODA
-            else:
-                # Try to find enum by value
-                found = None
-                for enum_val in ModelTireDurumEnum:
-                    if enum_val.value == tire.durum.strip():
-                        found = enum_val
-                        break
-                if found:
-                    db_tire.durum = found
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Invalid tire status: '{tire.durum}'. Must be 'Depoda' or 'Çıkmış'"
-                    )
-        elif isinstance(tire.durum, TireDurumEnum):
-            # Convert from utils enum to model enum
-            if tire.durum == TireDurumEnum.CIKTI:
-                db_tire.durum = ModelTireDurumEnum.CIKTI
-            elif tire.durum == TireDurumEnum.DEPODA:
-                db_tire.durum = ModelTireDurumEnum.DEPODA
-            else:
-                db_tire.durum = ModelTireDurumEnum(tire.durum.value)
-        elif isinstance(tire.durum, ModelTireDurumEnum):
-            # Already model enum, use directly
-            db_tire.durum = tire.durum
-        else:
-            # Try to convert
-            try:
-                if hasattr(tire.durum, 'value'):
-                    # It's an enum-like object
-                    db_tire.durum = ModelTireDurumEnum(tire.durum.value)
-                else:
-                    db_tire.durum = ModelTireDurumEnum(str(tire.durum))
-            except (ValueError, AttributeError) as e:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid tire status format: {type(tire.durum)}, value: {tire.durum}, error: {str(e)}"
-                )
-        
-        # Final check: ensure durum is model enum instance
-        if not isinstance(db_tire.durum, ModelTireDurumEnum):
+        # Schema enum (utils) -> model enum
+        durum_value = TIRE_DURUM.decode(tire.durum)
+        if durum_value is None:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to convert tire status to enum. Got: {type(db_tire.durum)}, value: {db_tire.durum}"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid tire status: '{tire.durum}'. Must be 'Depoda' or 'Çıkmış'"
             )
+        db_tire.durum = durum_value
         
-        # Update rack statuses based on tire status
-        # If tire is "Çıkmış" (Exited), set rack to "Boş" (Empty)
-        # Use model enum for comparison
-       
-        elif db_tire.durum == ModelTireDurumEnum.DEPODA:
-            # If tire is "Depoda" (In Depot), set rack to "Dolu" (Full)
-            rack.durum = RackDurumEnum.DOLU
-            db.add(rack)
-            # If rack changed, set old rack to empty if no other tires
-            if old_rack_id != tire.raf_id and old_rack:
-                from sqlalchemy import func
-                other_tires_count = db.query(func.count(Tire.id)).filter(
-                    Tire.raf_id == old_rack_id,
-                    Tire.id != tire_id,
-                    Tire.durum == ModelTireDurumEnum.DEPODA
-                ).scalar()
-                if other_tires_count == 0:
-                    old_rack.durum = RackDurumEnum.BOS
-                    db.add(old_rack)
-        
+        # Old/new rack counters and statuses follow the tire's rack/status change on flush
         db.commit()
         db.refresh(db_tire)
         
@@ -442,7 +383,7 @@ def update_tire(
 
 
 @router.delete("/{tire_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_tire(tire_id: int, db: Session = Depends(get_db)):
+def delete_tire(tire_id: int, db: Session = Depends(get_write_db)):
     """Delete a tire"""
     db_tire = db.query(Tire).filter(Tire.id == tire_id).first()
     if not db_tire:
@@ -451,30 +392,14 @@ def delete_tire(tire_id: int, db: Session = Depends(get_db)):
             detail=f"Tire with ID {tire_id} not found"
         )
     
-    rack_id = db_tire.raf_id
-    
+    # Rack counter is decremented in the same flush if the tire was in depot
     db.delete(db_tire)
-    
-    # Check if there are other tires in this rack
-    from sqlalchemy import func
-    other_tires_count = db.query(func.count(Tire.id)).filter(
-        Tire.raf_id == rack_id,
-        Tire.durum == TireDurumEnum.DEPODA
-    ).scalar()
-    
-    # If no other tires in rack, set rack status to "Boş"
-    if other_tires_count == 0:
-        rack = db.query(Rack).filter(Rack.id == rack_id).first()
-        if rack:
-            rack.durum = RackDurumEnum.BOS
-            db.add(rack)
-    
     db.commit()
     return None
 
 
-def format_tire_response(tire: Tire, db: Session) -> TireRead:
-    """Format tire response with relationships"""
+def format_tire_response(tire: Tire, db: Session, items: Optional[list] = None) -> TireRead:
+    """Format tire response with relationships; `items` are the tire's load_tire_items rows (loaded if None)"""
     try:
         # Load relationships using SQLAlchemy relationships (more efficient)
         brand_name = tire.brand.marka_adi if tire.brand else ""
@@ -482,74 +407,15 @@ def format_tire_response(tire: Tire, db: Session) -> TireRead:
         customer_plate = tire.customer.plaka if tire.customer else ""
         rack_code = tire.rack.kod if tire.rack else ""
         
-        # Ensure durum is enum instance - convert from ModelTireDurumEnum to TireDurumEnum (utils)
-        from app.utils.enums import TireDurumEnum as UtilsTireDurumEnum
-        
-        durum_value = tire.durum
-        if isinstance(tire.durum, ModelTireDurumEnum):
-            # Convert from ModelTireDurumEnum to UtilsTireDurumEnum
-            if tire.durum == ModelTireDurumEnum.DEPODA:
-                durum_value = UtilsTireDurumEnum.DEPODA
-            elif tire.durum == ModelTireDurumEnum.CIKTI:
-                durum_value = UtilsTireDurumEnum.CIKTI
-            else:
-                durum_value = UtilsTireDurumEnum.DEPODA  # Default
-        elif isinstance(tire.durum, str):
-            # Convert string to enum
-            if tire.durum == "DEPODA" or tire.durum == "Depoda":
-                durum_value = UtilsTireDurumEnum.DEPODA
-            elif tire.durum == "CIKTI" or tire.durum == "Çıkmış":
-                durum_value = UtilsTireDurumEnum.CIKTI
-            else:
-                # Try to find by value
-                for enum_val in UtilsTireDurumEnum:
-                    if enum_val.value == tire.durum:
-                        durum_value = enum_val
-                        break
-                else:
-                    durum_value = UtilsTireDurumEnum.DEPODA  # Default
-        elif hasattr(tire.durum, 'value'):
-            # It's an enum-like object
-            try:
-                durum_str = tire.durum.value if hasattr(tire.durum, 'value') else str(tire.durum)
-                if durum_str == "DEPODA" or durum_str == "Depoda":
-                    durum_value = UtilsTireDurumEnum.DEPODA
-                elif durum_str == "CIKTI" or durum_str == "Çıkmış":
-                    durum_value = UtilsTireDurumEnum.CIKTI
-                else:
-                    durum_value = UtilsTireDurumEnum(durum_str)
-            except (ValueError, AttributeError):
-                durum_value = UtilsTireDurumEnum.DEPODA  # Default
-        else:
-            durum_value = UtilsTireDurumEnum.DEPODA  # Default
-        
-        # Collect per-tire data
-        tire_sizes = []
-        tire_production_dates = []
-        tire_brands = []
-        tire_mevsims = []
-        for i in range(1, 7):
-            size = getattr(tire, f"tire{i}_size", None)
-            prod_date = getattr(tire, f"tire{i}_production_date", None)
-            brand_val = getattr(tire, f"tire{i}_brand", None) or brand_name
-            mevsim_val = getattr(tire, f"tire{i}_mevsim", None) or tire.mevsim
-            if size:
-                tire_sizes.append(size)
-                tire_production_dates.append(prod_date if prod_date else None)
-                tire_brands.append(brand_val)
-                # Convert mevsim to display string
-                if isinstance(mevsim_val, ModelMevsimEnum):
-                    tire_mevsims.append(mevsim_val.value)
-                elif hasattr(mevsim_val, 'value'):
-                    tire_mevsims.append(mevsim_val.value)
-                else:
-                    tire_mevsims.append(mevsim_val)
-        # Legacy fallback
-        if not tire_sizes and tire.ebat:
-            tire_sizes.append(tire.ebat)
-            tire_production_dates.append(None)
-            tire_brands.append(brand_name)
-            tire_mevsims.append(tire.mevsim.value if isinstance(tire.mevsim, ModelMevsimEnum) else tire.mevsim)
+        # Model enum (DB) -> utils enum (API)
+        durum_value = TIRE_DURUM.to_api(tire.durum, default=TireDurumEnum.DEPODA, strict=True)
+        
+        # Collect per-tire data (tire_items; legacy ebat if the tire has none)
+        if items is None:
+            items = load_tire_items(db, [tire.id]).get(tire.id, ())
+        slots = tire_slots(items, brand_name, MEVSIM.display(tire.mevsim, strict=True), tire.ebat)
+        tire_brands = [slot[2] for slot in slots]
+        tire_mevsims = [slot[3] for slot in slots]
 
         # Default top-level brand/mevsim to first per-tire values if available
         top_brand = brand_name
@@ -576,18 +442,7 @@ def format_tire_response(tire: Tire, db: Session) -> TireRead:
             customer_name=customer_name,
             customer_plate=customer_plate,
             # Multiple tire support
-            tire1_size=tire.tire1_size,
-            tire1_production_date=tire.tire1_production_date,
-            tire2_size=tire.tire2_size,
-            tire2_production_date=tire.tire2_production_date,
-            tire3_size=tire.tire3_size,
-            tire3_production_date=tire.tire3_production_date,
-            tire4_size=tire.tire4_size,
-            tire4_production_date=tire.tire4_production_date,
-            tire5_size=tire.tire5_size,
-            tire5_production_date=tire.tire5_production_date,
-            tire6_size=tire.tire6_size,
-            tire6_production_date=tire.tire6_production_date,
+            **slot_fields(items),
             tire_brands=tire_brands if tire_brands else None,
             tire_mevsims=tire_mevsims if tire_mevsims else None
         )
@@ -609,25 +464,25 @@ def create_tire_history_entry(
 ):
     """Create a tire history entry"""
 
+    items = load_tire_items(db, [old_tire.id] + ([new_tire.id] if new_tire else []))
+
+    def tire_sizes(tire: Tire) -> list:
+        # Per-tire rows; brand / mevsim fall back to the tire's own values
+        brand_name = tire.brand.marka_adi if tire.brand else None
+        return [
+            {
+                "size": item.size,
+                "year": item.year,
+                "brand": item.brand_name or brand_name,
+                "mevsim": MEVSIM.display(item.mevsim or tire.mevsim)
+            }
+            for item in items.get(tire.id, ())
+        ]
+
     # -------------------------
     # OLD TIRE DATA
     # -------------------------
-    old_tire_sizes = []
-    for i in range(1, 7):
-        size = getattr(old_tire, f"tire{i}_size", None)
-        prod_date = getattr(old_tire, f"tire{i}_production_date", None)
-        brand_val = getattr(old_tire, f"tire{i}_brand", None) or (
-            old_tire.brand.marka_adi if old_tire.brand else None
-        )
-        mevsim_val = getattr(old_tire, f"tire{i}_mevsim", None) or old_tire.mevsim
-
-        if size:
-            old_tire_sizes.append({
-                "size": size,
-                "year": prod_date,
-                "brand": brand_val,
-                "mevsim": mevsim_val.value if hasattr(mevsim_val, "value") else mevsim_val
-            })
+    old_tire_sizes = tire_sizes(old_tire)
 
     old_brand_name = old_tire.brand.marka_adi if old_tire.brand else ""
     eski_giris_tarihi = old_tire.giris_tarihi
@@ -637,30 +492,9 @@ def create_tire_history_entry(
     # -------------------------
     # NEW TIRE DATA (OPSİYONEL)
     # -------------------------
-    new_tire_sizes = []
-    new_tire_brands = []
-    new_tire_mevsims = []
-
-    if new_tire:
-        for i in range(1, 7):
-            size = getattr(new_tire, f"tire{i}_size", None)
-            prod_date = getattr(new_tire, f"tire{i}_production_date", None)
-            brand_val = getattr(new_tire, f"tire{i}_brand", None) or (
-                new_tire.brand.marka_adi if new_tire.brand else None
-            )
-            mevsim_val = getattr(new_tire, f"tire{i}_mevsim", None) or new_tire.mevsim
-
-            if size:
-                new_tire_sizes.append({
-                    "size": size,
-                    "year": prod_date,
-                    "brand": brand_val,
-                    "mevsim": mevsim_val.value if hasattr(mevsim_val, "value") else mevsim_val
-                })
-                new_tire_brands.append(brand_val)
-                new_tire_mevsims.append(
-                    mevsim_val.value if hasattr(mevsim_val, "value") else mevsim_val
-                )
+    new_tire_sizes = tire_sizes(new_tire) if new_tire else []
+    new_tire_brands = [entry["brand"] for entry in new_tire_sizes]
+    new_tire_mevsims = [entry["mevsim"] for entry in new_tire_sizes]
 
     yeni_seri_no = new_tire.seri_no if new_tire else None
     yeni_lastik_mevsim = new_tire_mevsims[0] if new_tire_mevsims else None
@@ -682,6 +516,7 @@ def create_tire_history_entry(
     history_entry = TireHistory(
         musteri_id=customer.id,
         musteri_adi=customer.ad_soyad,
+        musteri_adi_norm=normalize_name(customer.ad_soyad),
         plaka=customer.plaka,
         telefon=customer.telefon,
         islem_turu=islem_turu,
@@ -709,7 +544,7 @@ def create_tire_history_entry(
 def change_tire(
     tire_id: int,
     tire: TireCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Change tire - mark old as changed and create new entry"""
     try:
@@ -743,7 +578,8 @@ def change_tire(
             )
         
         # Get or create brand
-        brand = get_or_create_brand(db, tire.brand)
+        brand_id = get_or_create_brand_id(db, tire.brand)
+        ensure_slot_brands(db, tire)
         
         # Mark old tire as changed
         old_tire.durum = ModelTireDurumEnum.DEGISTIRILDI
@@ -768,7 +604,7 @@ def change_tire(
         new_tire = Tire(
             seri_no=seri_no,
             musteri_id=tire.musteri_id,
-            marka_id=brand.id,
+            marka_id=brand_id,
             ebat=tire.ebat or '',
             mevsim=tire.mevsim,
             dis_durumu=tire.dis_durumu,
@@ -804,8 +640,7 @@ def change_tire(
         )
         db.add(new_tire)
         
-        # Rack stays full (doesn't change status)
-        # No need to update rack status
+        # Rack counters: old tire leaves its rack (DEGISTIRILDI), new tire enters tire.raf_id
         
         # Commit new_tire first so it gets an ID and seri_no is saved
         db.commit()
@@ -852,7 +687,7 @@ def change_tire(
 def exit_tire(
     tire_id: int,
     not_: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     # 1️⃣ Lastiği al
     tire = db.query(Tire).options(
@@ -885,17 +720,7 @@ def exit_tire(
         not_=not_
     )
 
-    # 4️⃣ Raf boş mu kontrol et
-    other_tires = db.query(func.count(Tire.id)).filter(
-        Tire.raf_id == tire.raf_id,
-        Tire.durum == ModelTireDurumEnum.DEPODA,
-        Tire.id != tire.id
-    ).scalar()
-
-    if other_tires == 0 and tire.rack:
-        tire.rack.durum = RackDurumEnum.BOS
-        db.add(tire.rack)
-
+    # 4️⃣ Raf sayacı / durumu aynı flush'ta güncellenir (rack_counter)
     db.commit()
     return {"message": "Depodan çıkış yapıldı"}
 
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from app.models.database import get_db
+from app.models.database import get_read_db, get_write_db
 from app.models.models import TireSize
+from app.models.reference_cache import reference_cache
 
 router = APIRouter(prefix="/api/tire-sizes", tags=["tire-sizes"])
 
@@ -12,14 +13,18 @@ class TireSizeCreate(BaseModel):
 
 
 @router.get("/")
-def get_tire_sizes(db: Session = Depends(get_db)):
-    """Get all available tire sizes from database"""
-    tire_sizes = db.query(TireSize).order_by(TireSize.ebat).all()
-    return {"tire_sizes": [size.ebat for size in tire_sizes]}
+def get_tire_sizes(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """Get all available tire sizes (cached; ETag / If-None-Match aware)"""
+    snapshot = reference_cache.snapshot(db)
+    headers = {"ETag": snapshot.tire_sizes_etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == snapshot.tire_sizes_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return {"tire_sizes": snapshot.tire_sizes}
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_tire_size(tire_size: TireSizeCreate, db: Session = Depends(get_db)):
+def create_tire_size(tire_size: TireSizeCreate, db: Session = Depends(get_write_db)):
     """Create a new tire size"""
     # Check if tire size already exists
     existing_size = db.query(TireSize).filter(TireSize.ebat == tire_size.ebat.strip()).first()
@@ -33,12 +38,13 @@ def create_tire_size(tire_size: TireSizeCreate, db: Session = Depends(get_db)):
     db.add(new_size)
     db.commit()
     db.refresh(new_size)
+    reference_cache.bump()
     
     return {"id": new_size.id, "ebat": new_size.ebat}
 
 
 @router.delete("/", status_code=status.HTTP_200_OK)
-def delete_tire_size(ebat: str, db: Session = Depends(get_db)):
+def delete_tire_size(ebat: str, db: Session = Depends(get_write_db)):
     """Delete a tire size by its value (query param to allow slashes like 225/50 R17)"""
     sanitized_size = ebat.strip()
     tire_size = db.query(TireSize).filter(TireSize.ebat == sanitized_size).first()
@@ -50,6 +56,7 @@ def delete_tire_size(ebat: str, db: Session = Depends(get_db)):
 
     db.delete(tire_size)
     db.commit()
+    reference_cache.bump()
 
     return {"detail": "Ebat silindi", "ebat": sanitized_size}
 
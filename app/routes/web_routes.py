@@ -1,49 +1,34 @@
 from fastapi import APIRouter, Request, Depends, Query
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi import Form
 from fastapi.responses import RedirectResponse
-from jinja2 import Environment, FileSystemLoader
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
-from app.models.database import get_db
-from app.models.models import Tire, Customer, Rack, Brand, TireSize, TireHistory
-from app.models.models import TireDurumEnum as ModelTireDurumEnum, DisDurumuEnum as ModelDisDurumuEnum, MevsimEnum as ModelMevsimEnum
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import get_async_db, get_async_read_db
+from app.models.models import Tire, TireItem, Customer, Rack, TireHistory
+from app.models.models import TireDurumEnum as ModelTireDurumEnum
 from app.utils.enums import BRAND_LIST, TIRE_SIZES, TireDurumEnum, DisDurumuEnum
-from sqlalchemy.orm import joinedload
-from sqlalchemy import func
+from app.models.search_index import history_customer_name_filter, tire_size_filter
+from app.utils.customer_index import customer_name_clause
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.models.reference_cache import reference_cache
+from app.models.data_version import data_versions
+from app.models.tire_listing import tire_listing_query, load_tire_items, lastik_ara_item, label_item, tire_slots
+from app.models.tire_items import has_item
+from app.utils.templating import create_template_environment
+from app.utils.result_cache import ResultCache
+from app.utils.enum_codec import MEVSIM, DIS_DURUMU, RACK_DURUM, ISLEM_TURU
+from sqlalchemy.orm import joinedload, aliased
+from sqlalchemy import func, exists, tuple_, case, select
+from urllib.parse import urlencode
 import os
 import unicodedata
 import re
 
 
 
-
-def normalize_turkish_text(text: str) -> str:
-    """
-    Türkçe karakterleri normalize eder ve lowercase'e çevirir.
-    Büyük/küçük harf duyarsız ve Türkçe karakter desteği için kullanılır.
-    """
-    if not text:
-        return ""
-    # Önce lowercase'e çevir
-    text = text.lower()
-    # Türkçe karakterleri normalize et (büyük ve küçük harfleri kapsar)
-    text = text.replace('ı', 'i')
-    text = text.replace('ş', 's')
-    text = text.replace('ğ', 'g')
-    text = text.replace('ü', 'u')
-    text = text.replace('ö', 'o')
-    text = text.replace('ç', 'c')
-    # Büyük harfli Türkçe karakterleri de normalize et (lowercase sonrası gerekli değil ama güvenlik için)
-    text = text.replace('İ', 'i')
-    text = text.replace('Ş', 's')
-    text = text.replace('Ğ', 'g')
-    text = text.replace('Ü', 'u')
-    text = text.replace('Ö', 'o')
-    text = text.replace('Ç', 'c')
-    return text
-
 router = APIRouter()
 
 LOGIN_USERNAME = "nusretler"
@@ -84,37 +69,226 @@ async def logout(request: Request):
 
 # Setup Jinja2 templates
 template_dir = os.path.join(os.path.dirname(__file__), "..", "templates")
-env = Environment(loader=FileSystemLoader(template_dir))
+env = create_template_environment(template_dir)
 templates = env
 
 
+# /lastik-ara sayfa boyutu (keyset pagination)
+LASTIK_ARA_PAGE_SIZE = int(os.getenv("LASTIK_ARA_PAGE_SIZE", "50"))
+LASTIK_ARA_MAX_PAGE_SIZE = 500
+# /musteriler sayfa boyutu
+MUSTERILER_PAGE_SIZE = int(os.getenv("MUSTERILER_PAGE_SIZE", "100"))
+MUSTERILER_MAX_PAGE_SIZE = 1000
 
+# /lastik-ara sonuç önbelleği (biçimlendirilmiş tire_list); bu tablolara yazma önbelleği geçersiz kılar.
+# Sürümler worker'lar arasında paylaşılır (data_versions tablosu, sayfa ETag'i ile aynı yoklama);
+# TTL yalnızca ORM session'ı dışından yapılan yazmalar için üst sınırdır
+LASTIK_ARA_CACHE_TABLES = ("tires", "customers", "racks", "brands")
+LASTIK_ARA_CACHE_BYPASS_HEADER = "X-Cache-Bypass"
+lastik_ara_cache = ResultCache(
+    max_entries=int(os.getenv("LASTIK_ARA_CACHE_ENTRIES", "256")),
+    max_bytes=int(float(os.getenv("LASTIK_ARA_CACHE_MAX_MB", "32")) * 1024 * 1024),
+    ttl_seconds=float(os.getenv("LASTIK_ARA_CACHE_TTL", "60"))
+)
 
 
-@router.get("/lastik-ara", response_class=HTMLResponse)
-async def lastik_ara(
-    request: Request,
-    customer_name: Optional[str] = Query(None),
-    plate: Optional[str] = Query(None),
-    ebat: Optional[str] = Query(None),
-    brand: Optional[str] = Query(None),
-    dis_durumu: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
-    seri_no: Optional[str] = Query(None),
-    entry_date_from: Optional[str] = Query(None),
-    exit_date_from: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-    """Main page - Search and filter tires"""
+async def _page_etag(db: AsyncSession, request: Request, *tables: str) -> str:
+    """ETag for an HTML page: versions of the tables it reads + its normalized query params"""
+    # Diğer worker'ların yazmaları: data_versions tablosu en fazla DATA_VERSION_POLL_SECONDS'ta bir okunur
+    if data_versions.refresh_due():
+        await db.run_sync(data_versions.refresh)
+    params = sorted(request.query_params.multi_items())
+    return data_versions.etag(request.url.path, tables, params)
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the client's cached copy (If-None-Match) is still current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def _with_etag(response: HTMLResponse, etag: str) -> HTMLResponse:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _parse_day_range(value: Optional[str], label: str):
+    """Parse a date filter (ISO or YYYY-MM-DD) into (start_of_day, end_of_day); None if invalid"""
+    if not value or not value.strip():
+        return None
     try:
-        # Build query - use text() to avoid enum conversion issues
-        from sqlalchemy import text
-        query = db.query(Tire).options(
-            joinedload(Tire.brand),
-            joinedload(Tire.customer),
-            joinedload(Tire.rack)
+        # Handle both ISO format and YYYY-MM-DD format
+        date_str = value.strip()
+        if 'T' in date_str or '+' in date_str or 'Z' in date_str:
+            parsed = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        else:
+            parsed = datetime.strptime(date_str, '%Y-%m-%d')
+        return (
+            parsed.replace(hour=0, minute=0, second=0, microsecond=0),
+            parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
         )
-        
+    except (ValueError, AttributeError) as e:
+        print(f"DEBUG: Error parsing {label} '{value}': {e}")
+        return None
+
+
+def _resolve_tire_search(
+    db: Session,
+    status_filter_value=None,
+    customer_name: Optional[str] = None,
+    plate: Optional[str] = None,
+    ebat: Optional[str] = None,
+    brand: Optional[str] = None,
+    dis_durumu: Optional[str] = None,
+    seri_no: Optional[str] = None,
+    entry_date_from: Optional[str] = None,
+    exit_date_from: Optional[str] = None
+) -> dict:
+    """
+    Resolve lastik-ara filters once (customer/brand lookups, date parsing) so the same
+    criteria can be applied to several queries without repeating the lookups.
+    """
+    criteria = {
+        "status": status_filter_value,
+        "customer_clause": None,
+        "musteri_id": None,
+        "ebat": ebat.strip() if ebat and ebat.strip() else None,
+        "size_clause": None,
+        "marka_id": None,
+        "dis_durumu": None,
+        "seri_no": None,
+        "entry_range": _parse_day_range(entry_date_from, "entry_date_from"),
+        "exit_range": _parse_day_range(exit_date_from, "exit_date_from"),
+        "no_results": False
+    }
+
+    if customer_name:
+        # Türkçe karakter ve büyük/küçük harf duyarsız arama (bellek içi müşteri indeksi üzerinden)
+        criteria["customer_clause"] = customer_name_clause(db, customer_name, Tire.musteri_id)
+
+    if plate:
+        # İlk eşleşen müşteri; ayrı sorgu yerine sayfa sorgusunun içinde alt sorgu (eşleşme yoksa NULL -> sonuç yok)
+        criteria["musteri_id"] = select(Customer.id).where(
+            Customer.plaka.ilike(f"%{plate}%")
+        ).limit(1).scalar_subquery()
+
+    if criteria["ebat"]:
+        # tire_items.size_norm üzerinde alt-dize araması (PostgreSQL'de pg_trgm)
+        criteria["size_clause"] = tire_size_filter(criteria["ebat"])
+
+    if brand:
+        brand_id = reference_cache.brand_id(db, brand)
+        if brand_id is not None:
+            criteria["marka_id"] = brand_id
+        else:
+            criteria["no_results"] = True
+
+    if dis_durumu:
+        dis_durum_value = DIS_DURUMU.decode(dis_durumu)
+        if dis_durum_value is not None:
+            criteria["dis_durumu"] = dis_durum_value
+
+    if seri_no and seri_no.strip():
+        try:
+            criteria["seri_no"] = int(seri_no.strip())
+        except (ValueError, TypeError):
+            # If seri_no is not a valid integer, skip this filter
+            pass
+
+    return criteria
+
+
+def _tire_search_clauses(model, criteria: dict, include_customer: bool = True) -> list:
+    """Build WHERE clauses for `model` (Tire or an alias of it) from resolved criteria"""
+    if criteria["no_results"]:
+        return [model.id == -1]
+
+    clauses = [model.musteri_id.isnot(None)]
+    if criteria["status"] is not None:
+        clauses.append(model.durum == criteria["status"])
+    if include_customer:
+        if criteria["customer_clause"] is not None:
+            clauses.append(criteria["customer_clause"])
+        if criteria["musteri_id"] is not None:
+            clauses.append(model.musteri_id == criteria["musteri_id"])
+    if criteria["size_clause"] is not None:
+        # Herhangi bir lastiğinin ebatı eşleşen kayıtlar (eski kayıtların `ebat`ı da tire_items'ta)
+        clauses.append(has_item(model, criteria["size_clause"]))
+    if criteria["marka_id"] is not None:
+        # Herhangi bir lastiğinin markası (ix_tire_items_brand_id_tire_id)
+        clauses.append(has_item(model, TireItem.brand_id == criteria["marka_id"]))
+    if criteria["dis_durumu"] is not None:
+        clauses.append(model.dis_durumu == criteria["dis_durumu"])
+    if criteria["entry_range"]:
+        start, end = criteria["entry_range"]
+        clauses.extend([model.giris_tarihi >= start, model.giris_tarihi <= end])
+    if criteria["exit_range"]:
+        start, end = criteria["exit_range"]
+        clauses.extend([model.cikis_tarihi.isnot(None), model.cikis_tarihi >= start, model.cikis_tarihi <= end])
+    if criteria["seri_no"] is not None:
+        clauses.append(model.seri_no == criteria["seri_no"])
+    return clauses
+
+
+def _lastik_ara_page(db: Session, criteria: dict, page_size: int, after_key=None, before_key=None):
+    """
+    Fetch one keyset page of tire listing rows ordered by (giris_tarihi DESC, id DESC).
+
+    Only the latest matching tire of each customer is returned (NOT EXISTS on a newer
+    matching tire of the same customer), so deduplication happens in the database and
+    pages stay exactly `page_size` long. Returns (rows, has_next, has_prev).
+    """
+    newer = aliased(Tire)
+    sort_key = tuple_(Tire.giris_tarihi, Tire.id)
+    # Müşteri filtreleri dış sorguda zaten uygulanıyor; newer aynı müşteriye ait
+    latest_only = ~exists().where(
+        newer.musteri_id == Tire.musteri_id,
+        tuple_(newer.giris_tarihi, newer.id) > sort_key,
+        *_tire_search_clauses(newer, criteria, include_customer=False)
+    )
+    query = tire_listing_query(db).filter(*_tire_search_clauses(Tire, criteria), latest_only)
+
+    if before_key:
+        # Önceki sayfa: ters yönde oku, sonra çevir
+        rows = query.filter(sort_key > tuple_(*before_key)).order_by(
+            Tire.giris_tarihi.asc(), Tire.id.asc()
+        ).limit(page_size + 1).all()
+        has_prev = len(rows) > page_size
+        rows = list(reversed(rows[:page_size]))
+        return rows, True, has_prev
+
+    if after_key:
+        query = query.filter(sort_key < tuple_(*after_key))
+    # limit + 1 satır: fazladan satır varsa sonraki sayfa var (COUNT gerekmez)
+    rows = query.order_by(Tire.giris_tarihi.desc(), Tire.id.desc()).limit(page_size + 1).all()
+    return rows[:page_size], len(rows) > page_size, after_key is not None
+
+
+
+
+
+def _render_lastik_ara(
+    db: Session,
+    request: Request,
+    etag: str,
+    customer_name: Optional[str],
+    plate: Optional[str],
+    ebat: Optional[str],
+    brand: Optional[str],
+    dis_durumu: Optional[str],
+    status: Optional[str],
+    seri_no: Optional[str],
+    entry_date_from: Optional[str],
+    exit_date_from: Optional[str],
+    page_size: Optional[int],
+    after: Optional[str],
+    before: Optional[str]
+) -> Response:
+    """/lastik-ara page body; runs in AsyncSession.run_sync with a sync Session"""
+    try:
         # Determine status filter logic
         # Default: only show DEPODA tires if status is not specified
         # If status is "Tümü", show all tires
@@ -142,417 +316,61 @@ async def lastik_ara(
             # Show only DEPODA tires
             status_filter_value = ModelTireDurumEnum.DEPODA
         
-        # Apply status filter if needed
-        if apply_status_filter and status_filter_value is not None:
-            query = query.filter(Tire.durum == status_filter_value)
-        
-        # Apply filters
-        if customer_name:
-            # Türkçe karakter ve büyük/küçük harf duyarsız arama için normalize et
-            normalized_search = normalize_turkish_text(customer_name.strip())
-            # Tüm müşterileri al ve normalize ederek karşılaştır
-            all_customers = db.query(Customer).all()
-            matching_customers = []
-            for c in all_customers:
-                normalized_db_name = normalize_turkish_text(c.ad_soyad or "")
-                if normalized_search in normalized_db_name:
-                    matching_customers.append(c)
-            
-            if matching_customers:
-                customer_ids = [c.id for c in matching_customers]
-                query = query.filter(Tire.musteri_id.in_(customer_ids))
-            else:
-                query = query.filter(Tire.id == -1)  # No results
+        # Keyset pagination on (giris_tarihi DESC, id DESC)
+        page_size = max(1, min(page_size or LASTIK_ARA_PAGE_SIZE, LASTIK_ARA_MAX_PAGE_SIZE))
+        after_key = decode_cursor(after) if after else None
+        before_key = decode_cursor(before) if before and not after_key else None
+        has_next = False
+        has_prev = False
+        page_keys = []
         
-        if plate:
-            customer = db.query(Customer).filter(Customer.plaka.ilike(f"%{plate}%")).first()
-            if customer:
-                query = query.filter(Tire.musteri_id == customer.id)
-            else:
-                query = query.filter(Tire.id == -1)  # No results
+        # Sonuç önbelleği: normalize edilmiş filtre + sayfa anahtarı, ilgili tabloların sürümüyle
+        cache_key = (
+            status_filter_value.name if apply_status_filter and status_filter_value is not None else None,
+            *((value or "").strip() for value in (
+                customer_name, plate, ebat, brand, dis_durumu, seri_no, entry_date_from, exit_date_from
+            )),
+            page_size,
+            after_key,
+            before_key
+        )
+        # _page_etag data_versions'ı az önce yoklamıştı: ETag ve önbellek aynı sürümleri görür
+        cache_version = tuple(data_versions.version(table) for table in LASTIK_ARA_CACHE_TABLES)
+        bypass_cache = request.headers.get(LASTIK_ARA_CACHE_BYPASS_HEADER, "").lower() in ("1", "true", "yes")
+        cached = None
+        if bypass_cache:
+            lastik_ara_cache.record_bypass()
+        elif lastik_ara_cache.enabled:
+            cached = lastik_ara_cache.get(cache_key, cache_version)
         
-        if ebat:
-            # Filter by any tire size (tire1_size through tire6_size or legacy ebat field)
-            from sqlalchemy import or_
-            query = query.filter(
-                or_(
-                    Tire.ebat.ilike(f"%{ebat}%"),
-                    Tire.tire1_size.ilike(f"%{ebat}%"),
-                    Tire.tire2_size.ilike(f"%{ebat}%"),
-                    Tire.tire3_size.ilike(f"%{ebat}%"),
-                    Tire.tire4_size.ilike(f"%{ebat}%"),
-                    Tire.tire5_size.ilike(f"%{ebat}%"),
-                    Tire.tire6_size.ilike(f"%{ebat}%")
-                )
+        if cached is not None:
+            tire_list, has_next, has_prev, page_keys = cached
+            cache_status = "HIT"
+        else:
+            cache_status = "BYPASS" if bypass_cache else "MISS"
+            criteria = _resolve_tire_search(
+                db,
+                status_filter_value=status_filter_value if apply_status_filter else None,
+                customer_name=customer_name,
+                plate=plate,
+                ebat=ebat,
+                brand=brand,
+                dis_durumu=dis_durumu,
+                seri_no=seri_no,
+                entry_date_from=entry_date_from,
+                exit_date_from=exit_date_from
             )
         
-        if brand:
-            brand_obj = db.query(Brand).filter(Brand.marka_adi == brand).first()
-            if brand_obj:
-                query = query.filter(Tire.marka_id == brand_obj.id)
-            else:
-                query = query.filter(Tire.id == -1)  # No results
-        
-        if dis_durumu:
-            try:
-                # Try to convert string to enum
-                # ModelDisDurumuEnum values are: "İyi", "Orta", "Kötü"
-                dis_durum_str = dis_durumu.strip()
-                # Try to find matching enum value
-                dis_durum_enum = None
-                for enum_val in ModelDisDurumuEnum:
-                    if enum_val.value == dis_durum_str:
-                        dis_durum_enum = enum_val
-                        break
-                
-                if dis_durum_enum:
-                    query = query.filter(Tire.dis_durumu == dis_durum_enum)
-            except (ValueError, AttributeError, TypeError) as e:
-                # Log error but don't fail - just skip this filter
-                print(f"Error filtering by dis_durumu: {e}")
-                pass
-        
-        # Status filter is already applied above, no need to apply again here
-        
-        # Filter by entry date (giris_tarihi)
-        # If a single date is selected, filter for that specific day (start and end of day)
-        if entry_date_from and entry_date_from.strip():
-            try:
-                # Handle both ISO format and YYYY-MM-DD format
-                date_str = entry_date_from.strip()
-                if 'T' in date_str or '+' in date_str or 'Z' in date_str:
-                    date_from = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                else:
-                    # YYYY-MM-DD format
-                    date_from = datetime.strptime(date_str, '%Y-%m-%d')
-                
-                # Set to start of day (00:00:00)
-                date_from_start = date_from.replace(hour=0, minute=0, second=0, microsecond=0)
-                # Set to end of day (23:59:59.999999)
-                date_from_end = date_from.replace(hour=23, minute=59, second=59, microsecond=999999)
-                
-                # Filter for entries on this specific day
-                query = query.filter(
-                    Tire.giris_tarihi >= date_from_start,
-                    Tire.giris_tarihi <= date_from_end
-                )
-                print(f"DEBUG: Filtering by entry_date_from: {date_from_start} to {date_from_end}")
-            except (ValueError, AttributeError) as e:
-                print(f"DEBUG: Error parsing entry_date_from '{entry_date_from}': {e}")
-                pass
-        
-        # Filter by exit date (cikis_tarihi)
-        # If a single date is selected, filter for that specific day (start and end of day)
-        # Note: Only filter if cikis_tarihi is not NULL
-        if exit_date_from and exit_date_from.strip():
-            try:
-                # Handle both ISO format and YYYY-MM-DD format
-                date_str = exit_date_from.strip()
-                if 'T' in date_str or '+' in date_str or 'Z' in date_str:
-                    date_exit = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                else:
-                    # YYYY-MM-DD format
-                    date_exit = datetime.strptime(date_str, '%Y-%m-%d')
-                
-                # Set to start of day (00:00:00)
-                date_exit_start = date_exit.replace(hour=0, minute=0, second=0, microsecond=0)
-                # Set to end of day (23:59:59.999999)
-                date_exit_end = date_exit.replace(hour=23, minute=59, second=59, microsecond=999999)
-                
-                # Filter for exits on this specific day (only where cikis_tarihi is not NULL)
-                from sqlalchemy import and_
-                query = query.filter(
-                    and_(
-                        Tire.cikis_tarihi.isnot(None),  # Ensure cikis_tarihi is not NULL
-                        Tire.cikis_tarihi >= date_exit_start,
-                        Tire.cikis_tarihi <= date_exit_end
-                    )
-                )
-                print(f"DEBUG: Filtering by exit_date_from: {date_exit_start} to {date_exit_end}")
-            except (ValueError, AttributeError) as e:
-                print(f"DEBUG: Error parsing exit_date_from '{exit_date_from}': {e}")
-                pass
+            # Tek sorgu: sayfa satırları marka / müşteri / raf kolonlarıyla birlikte okunur.
+            # Enum kolonları normalize ve CHECK kısıtlı (migrate_normalize_enum_values.py);
+            # okunamayan bir değer sessizce başka bir sorguya düşmez, hata olarak görünür.
+            tires, has_next, has_prev = _lastik_ara_page(db, criteria, page_size, after_key, before_key)
+            page_keys = [(row.giris_tarihi, row.id) for row in tires]
         
-        # Filter by serial number
-        if seri_no and seri_no.strip():
-            try:
-                seri_no_int = int(seri_no.strip())
-                query = query.filter(Tire.seri_no == seri_no_int)
-            except (ValueError, TypeError):
-                # If seri_no is not a valid integer, skip this filter
-                pass
-        
-        # Production date filters (year as string)
-        # Order by entry date descending
-        query = query.order_by(Tire.giris_tarihi.desc())
-        
-        # Get results - wrap in try-except to handle enum conversion errors
-        try:
-            tires = query.all()
-            print(f"Successfully got {len(tires)} tires from query")
-        except (LookupError, ValueError, AttributeError) as enum_error:
-            # If enum conversion fails, try to get tires without enum conversion
-            print(f"Enum conversion error: {enum_error}, trying alternative approach")
-            # Use raw SQL to get durum as text
-            from sqlalchemy import text
-            try:
-                # Get tire IDs first
-                tire_ids_query = db.query(Tire.id)
-                # Only apply status filter if needed (not "Tümü")
-                if apply_status_filter and status_filter_value is not None:
-                    tire_ids_query = tire_ids_query.filter(Tire.durum == status_filter_value)
-                # If apply_status_filter is False, don't filter by status (show all)
-                # Apply other filters...
-                if customer_name:
-                    # Türkçe karakter ve büyük/küçük harf duyarsız arama için normalize et
-                    normalized_search = normalize_turkish_text(customer_name)
-                    # Tüm müşterileri al ve normalize ederek karşılaştır
-                    all_customers = db.query(Customer).all()
-                    matching_customers = [
-                        c for c in all_customers 
-                        if normalized_search in normalize_turkish_text(c.ad_soyad)
-                    ]
-                    if matching_customers:
-                        customer_ids = [c.id for c in matching_customers]
-                        tire_ids_query = tire_ids_query.filter(Tire.musteri_id.in_(customer_ids))
-                    else:
-                        tire_ids_query = tire_ids_query.filter(Tire.id == -1)  # No results
-                if plate:
-                    customer = db.query(Customer).filter(Customer.plaka.ilike(f"%{plate}%")).first()
-                    if customer:
-                        tire_ids_query = tire_ids_query.filter(Tire.musteri_id == customer.id)
-                    else:
-                        tire_ids_query = tire_ids_query.filter(Tire.id == -1)
-                if ebat:
-                    tire_ids_query = tire_ids_query.filter(Tire.ebat.ilike(f"%{ebat}%"))
-                if brand:
-                    brand_obj = db.query(Brand).filter(Brand.marka_adi == brand).first()
-                    if brand_obj:
-                        tire_ids_query = tire_ids_query.filter(Tire.marka_id == brand_obj.id)
-                    else:
-                        tire_ids_query = tire_ids_query.filter(Tire.id == -1)
-                if entry_date_from and entry_date_from.strip():
-                    try:
-                        date_str = entry_date_from.strip()
-                        if 'T' in date_str or '+' in date_str or 'Z' in date_str:
-                            date_from = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                        else:
-                            date_from = datetime.strptime(date_str, '%Y-%m-%d')
-                        date_from_start = date_from.replace(hour=0, minute=0, second=0, microsecond=0)
-                        date_from_end = date_from.replace(hour=23, minute=59, second=59, microsecond=999999)
-                        tire_ids_query = tire_ids_query.filter(
-                            Tire.giris_tarihi >= date_from_start,
-                            Tire.giris_tarihi <= date_from_end
-                        )
-                    except (ValueError, AttributeError):
-                        pass
-                if exit_date_from and exit_date_from.strip():
-                    try:
-                        date_str = exit_date_from.strip()
-                        if 'T' in date_str or '+' in date_str or 'Z' in date_str:
-                            date_exit = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                        else:
-                            date_exit = datetime.strptime(date_str, '%Y-%m-%d')
-                        date_exit_start = date_exit.replace(hour=0, minute=0, second=0, microsecond=0)
-                        date_exit_end = date_exit.replace(hour=23, minute=59, second=59, microsecond=999999)
-                        from sqlalchemy import and_
-                        tire_ids_query = tire_ids_query.filter(
-                            and_(
-                                Tire.cikis_tarihi.isnot(None),  # Ensure cikis_tarihi is not NULL
-                                Tire.cikis_tarihi >= date_exit_start,
-                                Tire.cikis_tarihi <= date_exit_end
-                            )
-                        )
-                    except (ValueError, AttributeError):
-                        pass
-                
-                tire_ids_query = tire_ids_query.order_by(Tire.giris_tarihi.desc())
-                tire_ids = [row.id for row in tire_ids_query.all()]
-                print(f"Alternative approach: Found {len(tire_ids)} tire IDs, apply_status_filter={apply_status_filter}")
-                
-                # Now get full Tire objects - handle empty list case
-                if tire_ids:
-                    tires = db.query(Tire).options(
-                        joinedload(Tire.brand),
-                        joinedload(Tire.customer),
-                        joinedload(Tire.rack)
-                    ).filter(Tire.id.in_(tire_ids)).all()
-                    print(f"Alternative approach: Successfully loaded {len(tires)} tires")
-                else:
-                    print("Alternative approach: No tire IDs found, returning empty list")
-                    tires = []
-            except Exception as e2:
-                print(f"Alternative approach also failed: {e2}")
-                tires = []
-        
-        # Format tire data for template
-        tire_list = []
-        for tire in tires:
-            # Safely convert tire.durum to display string
-            durum_display = "Depoda"  # Default
-            try:
-                # Use getattr with default to avoid attribute errors
-                durum_raw = getattr(tire, 'durum', None)
-                if durum_raw is None:
-                    durum_display = "Depoda"
-                elif isinstance(durum_raw, ModelTireDurumEnum):
-                    if durum_raw == ModelTireDurumEnum.DEPODA:
-                        durum_display = "Depoda"
-                    elif durum_raw == ModelTireDurumEnum.CIKTI:
-                        durum_display = "Çıkmış"
-                elif isinstance(durum_raw, str):
-                    durum_str = durum_raw.strip().upper()
-                    if durum_str == "DEPODA":
-                        durum_display = "Depoda"
-                    elif durum_str == "CIKTI":
-                        durum_display = "Çıkmış"
-                elif hasattr(durum_raw, 'value'):
-                    durum_value = durum_raw.value
-                    if isinstance(durum_value, str):
-                        durum_str = durum_value.strip().upper()
-                        if durum_str == "DEPODA":
-                            durum_display = "Depoda"
-                        elif durum_str == "CIKTI":
-                            durum_display = "Çıkmış"
-            except Exception as e:
-                print(f"Error converting tire.durum: {e}, type: {type(getattr(tire, 'durum', None))}, value: {getattr(tire, 'durum', None)}")
-                durum_display = "Depoda"
-            
-            # Parse not field to separate brand_note and general_note
-            # Format: brand_note + "\n\n" + general_note
-            not_value = tire.not_ if tire.not_ else ""
-            brand_note = ""
-            general_note = ""
-            if not_value:
-                parts = not_value.split("\n\n", 1)
-                brand_note = parts[0] if len(parts) > 0 else ""
-                general_note = parts[1] if len(parts) > 1 else ""
-            
-            # Collect all tire sizes and production dates (only those that exist)
-            tire_sizes_list = []
-            tire_production_dates_list = []
-            tire_brands_list = []
-            tire_mevsim_list = []
-            mevsim_display = ""
-            
-            # Check tire1 through tire6
-            for i in range(1, 7):
-                size_field = getattr(tire, f'tire{i}_size', None)
-                prod_date_field = getattr(tire, f'tire{i}_production_date', None)
-                brand_field = getattr(tire, f'tire{i}_brand', None)
-                mevsim_field = getattr(tire, f'tire{i}_mevsim', None) or getattr(tire, 'mevsim', None)
-                
-                if size_field:
-                    tire_sizes_list.append(size_field)
-                    tire_production_dates_list.append(prod_date_field if prod_date_field else None)
-                    tire_brands_list.append(brand_field if brand_field else (tire.brand.marka_adi if tire.brand else ""))
-                    if isinstance(mevsim_field, ModelMevsimEnum):
-                        tire_mevsim_list.append(mevsim_field.value)
-                    elif hasattr(mevsim_field, 'value'):
-                        tire_mevsim_list.append(mevsim_field.value)
-                    else:
-                        tire_mevsim_list.append(mevsim_field)
-            
-            # If no tire sizes found in tire1-tire6, use legacy ebat field
-            if not tire_sizes_list and tire.ebat:
-                tire_sizes_list.append(tire.ebat)
-                tire_production_dates_list.append(None)
-                tire_brands_list.append(tire.brand.marka_adi if tire.brand else "")
-                tire_mevsim_list.append(mevsim_display)
-            
-            # Get mevsim (season) value - convert enum to display string
-            mevsim_display = ""
-            try:
-                mevsim_raw = getattr(tire, 'mevsim', None)
-                if mevsim_raw:
-                    # Check if it's an enum instance (ModelMevsimEnum or any enum)
-                    if isinstance(mevsim_raw, ModelMevsimEnum):
-                        mevsim_display = mevsim_raw.value
-                    # Check if it has a 'value' attribute (enum objects)
-                    elif hasattr(mevsim_raw, 'value'):
-                        mevsim_display = mevsim_raw.value
-                    # If it's already a string, use it directly
-                    elif isinstance(mevsim_raw, str):
-                        mevsim_display = mevsim_raw
-                    else:
-                        # Handle enum string representation like "MevsimEnum.YAZ" or "MevsimEnum('Yaz')"
-                        mevsim_str = str(mevsim_raw)
-                        mevsim_str_upper = mevsim_str.upper()
-                        
-                        # Try to extract value from enum representation using regex
-                        import re
-                        # Match patterns like "MevsimEnum('Yaz')" or "MevsimEnum.YAZ" or "Yaz"
-                        match = re.search(r"['\"]([^'\"]+)['\"]", mevsim_str)
-                        if match:
-                            extracted_value = match.group(1)
-                            # Map to correct display value
-                            if extracted_value.upper() in ['YAZ', 'Yaz']:
-                                mevsim_display = "Yaz"
-                            elif extracted_value.upper() in ['KIS', 'KIŞ', 'Kış']:
-                                mevsim_display = "Kış"
-                            elif '4' in extracted_value.upper() or 'DORT' in extracted_value.upper():
-                                mevsim_display = "4 Mevsim"
-                            else:
-                                mevsim_display = extracted_value
-                        elif 'YAZ' in mevsim_str_upper:
-                            mevsim_display = "Yaz"
-                        elif 'KIS' in mevsim_str_upper or 'KIŞ' in mevsim_str_upper:
-                            mevsim_display = "Kış"
-                        elif 'DORT_MEVSIM' in mevsim_str_upper or '4 MEVSIM' in mevsim_str_upper or ('4' in mevsim_str_upper and 'MEVSIM' in mevsim_str_upper):
-                            mevsim_display = "4 Mevsim"
-                        else:
-                            # Last resort: use string representation but clean it up
-                            mevsim_display = mevsim_str
-            except Exception as e:
-                print(f"Error converting tire.mevsim: {e}, type: {type(getattr(tire, 'mevsim', None))}, value: {getattr(tire, 'mevsim', None)}")
-                mevsim_display = ""
-            
-            tire_dict = {
-                "id": tire.id,
-                "seri_no": tire.seri_no if hasattr(tire, 'seri_no') and tire.seri_no else None,
-                "customer_id": tire.musteri_id,  # Add customer_id for filtering
-                "customer_name": tire.customer.ad_soyad if tire.customer else "",
-                "customer_plate": tire.customer.plaka if tire.customer else "",
-                "ebat": tire.ebat,  # Keep for backward compatibility
-                "tire_sizes": tire_sizes_list,  # List of all tire sizes
-                "tire_production_dates": tire_production_dates_list,  # List of production dates
-                "tire_brands": tire_brands_list,
-                "tire_mevsims": tire_mevsim_list,
-                "brand": tire.brand.marka_adi if tire.brand else (tire_brands_list[0] if tire_brands_list else ""),
-                "mevsim": mevsim_display if mevsim_display else (tire_mevsim_list[0] if tire_mevsim_list else ""),
-                "rack_code": tire.rack.kod if tire.rack else "",
-                "giris_tarihi": tire.giris_tarihi,
-                "cikis_tarihi": tire.cikis_tarihi,
-                "durum": durum_display,
-                "brand_note": brand_note,
-                "general_note": general_note
-            }
-            tire_list.append(tire_dict)
-        
-        # Filter: Keep only the latest tire per customer (by giris_tarihi)
-        # This ensures that when a tire is changed, only the new tire is shown, not the old one
-        customer_latest_tire = {}  # {customer_id: tire_dict}
-        for tire_dict in tire_list:
-            customer_id = tire_dict.get("customer_id")
-            if customer_id:
-                # If we haven't seen this customer, or this tire is newer, keep it
-                if customer_id not in customer_latest_tire:
-                    customer_latest_tire[customer_id] = tire_dict
-                else:
-                    # Compare giris_tarihi - keep the one with the latest date
-                    existing_date = customer_latest_tire[customer_id].get("giris_tarihi")
-                    current_date = tire_dict.get("giris_tarihi")
-                    if existing_date and current_date:
-                        if current_date > existing_date:
-                            customer_latest_tire[customer_id] = tire_dict
-                    elif current_date:  # If existing doesn't have date but current does, use current
-                        customer_latest_tire[customer_id] = tire_dict
-        
-        # Replace tire_list with filtered version (only latest per customer)
-        tire_list = list(customer_latest_tire.values())
-        # Sort by giris_tarihi descending again (in case order changed)
-        # Use a very old date for None values to ensure they go to the end
-        tire_list.sort(key=lambda x: x.get("giris_tarihi") or datetime(1900, 1, 1), reverse=True)
+            # Format tire data for template (lastik bilgileri sayfa için tek sorguda)
+            items = load_tire_items(db, [row.id for row in tires])
+            tire_list = [lastik_ara_item(row, items.get(row.id, ())) for row in tires]
+            lastik_ara_cache.put(cache_key, cache_version, (tire_list, has_next, has_prev, page_keys))
         
         # Prepare query params for template
         # If status is None or empty, default to "Depoda" for display
@@ -577,23 +395,36 @@ async def lastik_ara(
             "entry_date_from": entry_date_from or "",
             "exit_date_from": exit_date_from or ""
         }
-    
-        # Get brands and tire sizes from database
-        brands = db.query(Brand).order_by(Brand.marka_adi).all()
-        brand_list = [brand.marka_adi for brand in brands]
         
-        tire_sizes = db.query(TireSize).order_by(TireSize.ebat).all()
-        tire_size_list = [size.ebat for size in tire_sizes]
+        # Sayfa bağlantıları: filtreler + imleç (sayfa boyutu yalnızca varsayılandan farklıysa)
+        page_params = {key: value for key, value in query_params.items() if value}
+        if page_size != LASTIK_ARA_PAGE_SIZE:
+            page_params["page_size"] = page_size
+        pagination = {
+            "page_size": page_size,
+            "next_url": None,
+            "prev_url": None
+        }
+        if has_next and page_keys:
+            pagination["next_url"] = "/lastik-ara?" + urlencode({**page_params, "after": encode_cursor(page_keys[-1])})
+        if has_prev and page_keys:
+            pagination["prev_url"] = "/lastik-ara?" + urlencode({**page_params, "before": encode_cursor(page_keys[0])})
+    
+        # Brands and tire sizes from the reference cache
+        reference = reference_cache.snapshot(db)
+        brand_list = reference.brands
+        tire_size_list = reference.tire_sizes
         
         template = templates.get_template("index.html")
-        return HTMLResponse(content=template.render(
+        return _with_etag(HTMLResponse(content=template.render(
             request=request,
             tires=tire_list,
             brands=brand_list,
             tire_sizes=tire_size_list,
             query_params=query_params,
+            pagination=pagination,
             current_path="/lastik-ara"
-        ))
+        ), headers={"X-Cache": cache_status}), etag)
     except Exception as e:
         # Log the error and return a proper error page
         import traceback
@@ -606,13 +437,40 @@ async def lastik_ara(
         )
 
 
-@router.get("/yeni-lastik", response_class=HTMLResponse)
-async def yeni_lastik(
+@router.get("/lastik-ara", response_class=HTMLResponse)
+async def lastik_ara(
     request: Request,
-    tire_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    customer_name: Optional[str] = Query(None),
+    plate: Optional[str] = Query(None),
+    ebat: Optional[str] = Query(None),
+    brand: Optional[str] = Query(None),
+    dis_durumu: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    seri_no: Optional[str] = Query(None),
+    entry_date_from: Optional[str] = Query(None),
+    exit_date_from: Optional[str] = Query(None),
+    page_size: Optional[int] = Query(None, ge=1),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """New tire entry page - can be pre-filled with existing tire data"""
+    """Main page - Search and filter tires (keyset paginated, latest tire per customer)"""
+    # Koşullu GET: veri değişmediyse DB'ye hiç gitmeden 304
+    etag = await _page_etag(db, request, "tires", "customers", "racks", "brands", "tire_sizes")
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    # Senkron sorgu + render kodu async sürücü üzerinden çalışır: DB beklenirken event loop
+    # diğer isteklere devam eder (bkz. app.models.database.get_async_read_db)
+    return await db.run_sync(
+        _render_lastik_ara, request, etag,
+        customer_name, plate, ebat, brand, dis_durumu, status, seri_no, entry_date_from,
+        exit_date_from, page_size, after, before
+    )
+
+
+def _render_yeni_lastik(db: Session, request: Request, tire_id: Optional[int]) -> Response:
+    """/yeni-lastik page body; runs in AsyncSession.run_sync with a sync Session"""
     # Get racks - if tire_id provided, include the current rack even if full
     from app.utils.enums import RackDurumEnum
     racks_query = db.query(Rack).filter(Rack.durum == RackDurumEnum.BOS)
@@ -632,14 +490,12 @@ async def yeni_lastik(
             )
     
     racks = racks_query.order_by(Rack.kod).all()
-    rack_list = [{"id": r.id, "kod": r.kod, "durum": r.durum.value if hasattr(r.durum, 'value') else str(r.durum)} for r in racks]
-    
-    # Get brands and tire sizes from database
-    brands = db.query(Brand).order_by(Brand.marka_adi).all()
-    brand_list = [brand.marka_adi for brand in brands]
+    rack_list = [{"id": r.id, "kod": r.kod, "durum": RACK_DURUM.display(r.durum)} for r in racks]
     
-    tire_sizes = db.query(TireSize).order_by(TireSize.ebat).all()
-    tire_size_list = [size.ebat for size in tire_sizes]
+    # Brands and tire sizes from the reference cache
+    reference = reference_cache.snapshot(db)
+    brand_list = reference.brands
+    tire_size_list = reference.tire_sizes
     
     # If tire_id provided, load existing tire data
     existing_tire_data = None
@@ -652,32 +508,17 @@ async def yeni_lastik(
             ).filter(Tire.id == tire_id).first()
             
             if tire:
-                # Collect tire sizes
-                tire_sizes_list = []
-                tire_production_dates_list = []
-                tire_brands_list = []
-                tire_mevsim_list = []
-                mevsim_display = ""
-                for i in range(1, 7):
-                    size = getattr(tire, f'tire{i}_size', None)
-                    prod_date = getattr(tire, f'tire{i}_production_date', None)
-                    brand_val = getattr(tire, f'tire{i}_brand', None) or (tire.brand.marka_adi if tire.brand else "")
-                    mevsim_val = getattr(tire, f'tire{i}_mevsim', None) or getattr(tire, 'mevsim', None)
-                    if size:
-                        tire_sizes_list.append(size)
-                        tire_production_dates_list.append(prod_date)
-                        tire_brands_list.append(brand_val)
-                        if hasattr(mevsim_val, 'value'):
-                            tire_mevsim_list.append(mevsim_val.value)
-                        else:
-                            tire_mevsim_list.append(mevsim_val)
-                
-                # If no tire sizes in tire1-tire6, use legacy ebat
-                if not tire_sizes_list and tire.ebat:
-                    tire_sizes_list.append(tire.ebat)
-                    tire_production_dates_list.append(None)
-                    tire_brands_list.append(tire.brand.marka_adi if tire.brand else "")
-                    tire_mevsim_list.append(tire.mevsim.value if hasattr(tire.mevsim, 'value') else str(tire.mevsim))
+                # Collect tire sizes (tire_items; legacy ebat if the tire has none)
+                slots = tire_slots(
+                    load_tire_items(db, [tire.id]).get(tire.id, ()),
+                    tire.brand.marka_adi if tire.brand else "",
+                    MEVSIM.display(tire.mevsim, default=""),
+                    tire.ebat
+                )
+                tire_sizes_list = [slot[0] for slot in slots]
+                tire_production_dates_list = [slot[1] for slot in slots]
+                tire_brands_list = [slot[2] for slot in slots]
+                tire_mevsim_list = [slot[3] for slot in slots]
                 
                 # Parse not field
                 not_value = tire.not_ if tire.not_ else ""
@@ -695,8 +536,8 @@ async def yeni_lastik(
                     "customer_phone": tire.customer.telefon if tire.customer else "",
                     "musteri_id": tire.musteri_id,
                     "brand": tire.brand.marka_adi if tire.brand else "",
-                    "mevsim": tire.mevsim.value if hasattr(tire.mevsim, 'value') else str(tire.mevsim),
-                    "dis_durumu": tire.dis_durumu.value if hasattr(tire.dis_durumu, 'value') else str(tire.dis_durumu),
+                    "mevsim": MEVSIM.display(tire.mevsim, default=""),
+                    "dis_durumu": DIS_DURUMU.display(tire.dis_durumu, default=""),
                     "raf_id": tire.raf_id,
                     "raf_kodu": tire.rack.kod if tire.rack else "",
                     "brand_note": brand_note,
@@ -721,116 +562,115 @@ async def yeni_lastik(
     ))
 
 
-@router.get("/musteriler", response_class=HTMLResponse)
-async def musteriler(
+@router.get("/yeni-lastik", response_class=HTMLResponse)
+async def yeni_lastik(
     request: Request,
-    customer_name: Optional[str] = Query(None),
-    plate: Optional[str] = Query(None),
-    customer_phone: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    tire_id: Optional[int] = Query(None),
+    # Kayıt formu: boş raf listesi yazmadan hemen önce okunur, replikaya gitmez
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Customers page with filtering"""
-    # Build query
-    query = db.query(Customer)
-    
+    """New tire entry page - can be pre-filled with existing tire data"""
+    return await db.run_sync(_render_yeni_lastik, request, tire_id)
+
+
+def _musteriler_page(db: Session, filters: list, page_size: int, after_key=None, before_key=None):
+    """
+    One keyset page of customers (ordered by ad_soyad, id) with their tire stats, in a single query.
+
+    Sayfadaki müşteriler önce seçilir; durum sayıları koşullu toplama (conditional
+    aggregation) ile, en güncel seri_no ise (musteri_id, giris_tarihi, id) indeksini
+    kullanan ilişkili alt sorgu ile yalnızca bu müşteriler için hesaplanır.
+    Returns (rows, has_next, has_prev).
+    """
+    sort_key = tuple_(Customer.ad_soyad, Customer.id)
+    page_query = db.query(Customer.id, Customer.ad_soyad, Customer.telefon, Customer.plaka).filter(*filters)
+    if before_key:
+        # Önceki sayfa: ters yönde oku, sonra çevir
+        page_query = page_query.filter(sort_key < tuple_(*before_key)).order_by(
+            Customer.ad_soyad.desc(), Customer.id.desc()
+        )
+    else:
+        if after_key:
+            page_query = page_query.filter(sort_key > tuple_(*after_key))
+        page_query = page_query.order_by(Customer.ad_soyad.asc(), Customer.id.asc())
+    page = page_query.limit(page_size + 1).subquery()
+
+    tire_stats = db.query(
+        Tire.musteri_id.label("musteri_id"),
+        func.count(Tire.id).label("total_count"),
+        func.sum(case((Tire.durum == ModelTireDurumEnum.DEPODA, 1), else_=0)).label("depoda_count"),
+        func.sum(case((Tire.durum == ModelTireDurumEnum.CIKTI, 1), else_=0)).label("cikmis_count")
+    ).filter(Tire.musteri_id.in_(select(page.c.id))).group_by(Tire.musteri_id).subquery()
+
+    latest_seri_no = db.query(Tire.seri_no).filter(
+        Tire.musteri_id == page.c.id
+    ).order_by(Tire.giris_tarihi.desc(), Tire.id.desc()).limit(1).correlate(page).scalar_subquery()
+
+    rows = db.query(
+        page.c.id,
+        page.c.ad_soyad,
+        page.c.telefon,
+        page.c.plaka,
+        latest_seri_no.label("seri_no"),
+        func.coalesce(tire_stats.c.depoda_count, 0).label("depoda_count"),
+        func.coalesce(tire_stats.c.cikmis_count, 0).label("cikmis_count"),
+        func.coalesce(tire_stats.c.total_count, 0).label("total_count")
+    ).outerjoin(tire_stats, tire_stats.c.musteri_id == page.c.id).order_by(
+        page.c.ad_soyad.desc() if before_key else page.c.ad_soyad.asc(),
+        page.c.id.desc() if before_key else page.c.id.asc()
+    ).all()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if before_key:
+        return list(reversed(rows)), True, has_more
+    return rows, has_more, after_key is not None
+
+
+def _render_musteriler(
+    db: Session,
+    request: Request,
+    etag: str,
+    customer_name: Optional[str],
+    plate: Optional[str],
+    customer_phone: Optional[str],
+    page_size: Optional[int],
+    after: Optional[str],
+    before: Optional[str]
+) -> Response:
+    """/musteriler page body; runs in AsyncSession.run_sync with a sync Session"""
     # Apply filters
+    filters = []
     if customer_name:
-        # Türkçe karakter ve büyük/küçük harf duyarsız arama için normalize et
-        normalized_search = normalize_turkish_text(customer_name.strip() if customer_name else "")
-        # Tüm müşterileri al ve normalize ederek karşılaştır
-        all_customers = db.query(Customer).all()
-        matching_customers = [
-            c for c in all_customers 
-            if normalized_search in normalize_turkish_text(c.ad_soyad or "")
-        ]
-        if matching_customers:
-            customer_ids = [c.id for c in matching_customers]
-            query = query.filter(Customer.id.in_(customer_ids))
-        else:
-            query = query.filter(Customer.id == -1)  # No results
+        # Türkçe karakter ve büyük/küçük harf duyarsız arama (bellek içi müşteri indeksi üzerinden)
+        name_clause = customer_name_clause(db, customer_name, Customer.id)
+        if name_clause is not None:
+            filters.append(name_clause)
     
     if plate:
-        query = query.filter(Customer.plaka.ilike(f"%{plate}%"))
+        filters.append(Customer.plaka.ilike(f"%{plate}%"))
     
     if customer_phone:
-        query = query.filter(Customer.telefon.ilike(f"%{customer_phone}%"))
-    
-    # Get all customers
-    customers = query.order_by(Customer.ad_soyad).all()
+        filters.append(Customer.telefon.ilike(f"%{customer_phone}%"))
     
-    # Get tire status counts for each customer
-    from app.models.models import Tire
-    from app.models.models import TireDurumEnum as ModelTireDurumEnum
+    page_size = max(1, min(page_size or MUSTERILER_PAGE_SIZE, MUSTERILER_MAX_PAGE_SIZE))
+    after_key = decode_cursor(after) if after else None
+    before_key = decode_cursor(before) if before and not after_key else None
+    rows, has_next, has_prev = _musteriler_page(db, filters, page_size, after_key, before_key)
     
-    customer_list = []
-    for c in customers:
-        # Get all tires for this customer (both DEPODA and CIKTI)
-        tires = []  # Initialize tires variable
-        depoda_count = 0
-        cikmis_count = 0
-        
-        try:
-            tires = db.query(Tire).filter(Tire.musteri_id == c.id).order_by(Tire.giris_tarihi.desc()).all()
-            
-            # Get latest tire's serial number
-            latest_seri_no = None
-            if tires:
-                latest_tire = tires[0]  # Most recent tire (ordered by giris_tarihi desc)
-                if hasattr(latest_tire, 'seri_no') and latest_tire.seri_no:
-                    latest_seri_no = latest_tire.seri_no
-            
-            # Safely count tires by status
-            for t in tires:
-                try:
-                    durum_raw = getattr(t, 'durum', None)
-                    if durum_raw is None:
-                        depoda_count += 1  # Default to depoda
-                    elif isinstance(durum_raw, ModelTireDurumEnum):
-                        if durum_raw == ModelTireDurumEnum.DEPODA:
-                            depoda_count += 1
-                        elif durum_raw == ModelTireDurumEnum.CIKTI:
-                            cikmis_count += 1
-                    elif isinstance(durum_raw, str):
-                        durum_str = durum_raw.strip().upper()
-                        if durum_str == "DEPODA":
-                            depoda_count += 1
-                        elif durum_str == "CIKTI":
-                            cikmis_count += 1
-                        else:
-                            depoda_count += 1  # Default
-                    elif hasattr(durum_raw, 'value'):
-                        durum_value = durum_raw.value
-                        if isinstance(durum_value, str):
-                            durum_str = durum_value.strip().upper()
-                            if durum_str == "DEPODA":
-                                depoda_count += 1
-                            elif durum_str == "CIKTI":
-                                cikmis_count += 1
-                            else:
-                                depoda_count += 1  # Default
-                        else:
-                            depoda_count += 1  # Default
-                    else:
-                        depoda_count += 1  # Default
-                except Exception as e:
-                    print(f"Error counting tire status for customer {c.id}: {e}")
-                    depoda_count += 1  # Default to depoda
-        except Exception as e:
-            print(f"Error getting tires for customer {c.id}: {e}")
-            depoda_count = 0
-            cikmis_count = 0
-            tires = []  # Ensure tires is set even on error
-        
-        customer_list.append({
-            "id": c.id,
-            "seri_no": latest_seri_no,  # Latest tire's serial number
-            "ad_soyad": c.ad_soyad,
-            "telefon": c.telefon,
-            "plaka": c.plaka,
-            "depoda_count": depoda_count,
-            "cikmis_count": cikmis_count,
-            "total_count": len(tires)
-        })
+    customer_list = [
+        {
+            "id": row.id,
+            "seri_no": row.seri_no,  # Latest tire's serial number
+            "ad_soyad": row.ad_soyad,
+            "telefon": row.telefon,
+            "plaka": row.plaka,
+            "depoda_count": row.depoda_count,
+            "cikmis_count": row.cikmis_count,
+            "total_count": row.total_count
+        }
+        for row in rows
+    ]
     
     # Prepare query params for template
     query_params = {
@@ -839,331 +679,177 @@ async def musteriler(
         "customer_phone": customer_phone or ""
     }
     
+    # Sayfa bağlantıları: filtreler + imleç
+    page_params = {key: value for key, value in query_params.items() if value}
+    if page_size != MUSTERILER_PAGE_SIZE:
+        page_params["page_size"] = page_size
+    pagination = {
+        "page_size": page_size,
+        "next_url": None,
+        "prev_url": None
+    }
+    if has_next and rows:
+        pagination["next_url"] = "/musteriler?" + urlencode({**page_params, "after": encode_cursor((rows[-1].ad_soyad, rows[-1].id))})
+    if has_prev and rows:
+        pagination["prev_url"] = "/musteriler?" + urlencode({**page_params, "before": encode_cursor((rows[0].ad_soyad, rows[0].id))})
+    
     template = templates.get_template("musteriler.html")
-    return HTMLResponse(content=template.render(
+    return _with_etag(HTMLResponse(content=template.render(
         request=request,
         customers=customer_list,
         query_params=query_params,
+        pagination=pagination,
         current_path="/musteriler"
-    ))
+    )), etag)
 
 
-@router.get("/raflar", response_class=HTMLResponse)
-async def raflar(request: Request, db: Session = Depends(get_db)):
-    """Racks page"""
-    from app.utils.enums import TireDurumEnum
-    import re
+@router.get("/musteriler", response_class=HTMLResponse)
+async def musteriler(
+    request: Request,
+    customer_name: Optional[str] = Query(None),
+    plate: Optional[str] = Query(None),
+    customer_phone: Optional[str] = Query(None),
+    page_size: Optional[int] = Query(None, ge=1),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Customers page with filtering (keyset paginated on ad_soyad, id)"""
+    etag = await _page_etag(db, request, "customers", "tires")
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    return await db.run_sync(
+        _render_musteriler, request, etag,
+        customer_name, plate, customer_phone, page_size, after, before
+    )
+
+
+def _render_raflar(db: Session, request: Request, etag: str) -> Response:
+    """/raflar page body; runs in AsyncSession.run_sync with a sync Session"""
+    # Tek sorgu: lastik sayısı racks.active_tire_count sayacından okunur; müşteri adları
+    # yalnızca depodaki lastikler üzerinden gruplanır. Sıralama sort_prefix / sort_number ile.
+    rack_customers = db.query(
+        Tire.raf_id.label("raf_id"),
+        func.count(func.distinct(Customer.ad_soyad)).label("customer_count"),
+        func.min(Customer.ad_soyad).label("first_customer")
+    ).join(
+        Customer, Customer.id == Tire.musteri_id
+    ).filter(
+        Tire.durum == ModelTireDurumEnum.DEPODA, Tire.raf_id.isnot(None)
+    ).group_by(Tire.raf_id).subquery()
     
-    # Get all racks ordered by code (natural sort)
-    racks = db.query(Rack).order_by(Rack.kod).all()
+    rows = db.query(
+        Rack.id,
+        Rack.kod,
+        Rack.durum,
+        Rack.not_,
+        Rack.sort_prefix,
+        Rack.active_tire_count.label("tire_count"),
+        func.coalesce(rack_customers.c.customer_count, 0).label("customer_count"),
+        rack_customers.c.first_customer
+    ).outerjoin(
+        rack_customers, rack_customers.c.raf_id == Rack.id
+    ).order_by(
+        Rack.sort_prefix, Rack.sort_number, Rack.kod
+    ).all()
     
-    # Group racks by prefix (e.g., A, B, C)
+    # Group racks by prefix (e.g., A, B, C) - rows are already in display order
     rack_groups = {}
-    for rack in racks:
-        # Extract prefix from rack code (e.g., "A-1" -> "A", "ARKA JENARATOR-2" -> "ARKA JENARATOR")
-        if '-' in rack.kod:
-            prefix = rack.kod.rsplit('-', 1)[0]
-        else:
-            # Legacy support for codes like A1 or BAHÇE2
-            match = re.match(r'^([^0-9]+)', rack.kod)
-            if match:
-                prefix = match.group(1).strip()
-            else:
-                prefix = rack.kod[0] if rack.kod else "OTHER"
-        
-        if prefix not in rack_groups:
-            rack_groups[prefix] = []
-        
-        # Get tires in this rack that are still in depot
-        tires_in_rack = db.query(Tire).filter(
-            Tire.raf_id == rack.id,
-            Tire.durum == ModelTireDurumEnum.DEPODA
-        ).options(joinedload(Tire.customer)).all()
-        
-        tire_count = len(tires_in_rack)
-        
-        # Get customer names from tires in this rack
-        customer_names = []
-        if tire_count > 0:
-            for tire in tires_in_rack:
-                if tire.customer:
-                    customer_name = tire.customer.ad_soyad
-                    if customer_name and customer_name not in customer_names:
-                        customer_names.append(customer_name)
-        
+    for row in rows:
         # If multiple customers, show first one with count
         customer_display = ""
-        if customer_names:
-            if len(customer_names) == 1:
-                customer_display = customer_names[0]
-            else:
-                customer_display = f"{customer_names[0]} (+{len(customer_names)-1})"
+        if row.customer_count == 1:
+            customer_display = row.first_customer
+        elif row.customer_count > 1:
+            customer_display = f"{row.first_customer} (+{row.customer_count - 1})"
         
-        rack_groups[prefix].append({
-            "id": rack.id,
-            "kod": rack.kod,
-            "durum": rack.durum.value if hasattr(rack.durum, 'value') else str(rack.durum),
-            "not_": rack.not_,
-            "tire_count": tire_count,
+        rack_groups.setdefault(row.sort_prefix, []).append({
+            "id": row.id,
+            "kod": row.kod,
+            "durum": RACK_DURUM.display(row.durum),
+            "not_": row.not_,
+            "tire_count": row.tire_count,
             "customer_name": customer_display
         })
     
-    # Sort racks within each group by number (natural sort)
-    for prefix in rack_groups:
-        rack_groups[prefix].sort(key=lambda x: (
-            # Extract number from code for sorting
-            int(re.search(r'\d+', x['kod']).group()) if re.search(r'\d+', x['kod']) else 0
-        ))
-    
-    # Convert to list of groups (sorted by prefix)
     rack_groups_list = [
         {
             "prefix": prefix,
-            "racks": rack_groups[prefix]
+            "racks": group_racks
         }
-        for prefix in sorted(rack_groups.keys())
+        for prefix, group_racks in rack_groups.items()
     ]
     
     # Calculate total rack count
-    total_racks = len(racks)
+    total_racks = len(rows)
     
     template = templates.get_template("raflar.html")
-    return HTMLResponse(content=template.render(
+    return _with_etag(HTMLResponse(content=template.render(
         request=request,
         rack_groups=rack_groups_list,
         total_racks=total_racks,
         racks=[],  # Keep for backward compatibility
         current_path="/raflar"
-    ))
+    )), etag)
 
 
-@router.get("/lastik-etiketleri", response_class=HTMLResponse)
-async def lastik_etiketleri(
+@router.get("/raflar", response_class=HTMLResponse)
+async def raflar(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """Racks page"""
+    etag = await _page_etag(db, request, "racks", "tires", "customers")
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    return await db.run_sync(_render_raflar, request, etag)
+
+
+def _render_lastik_etiketleri(
+    db: Session,
     request: Request,
-    customer_name: Optional[str] = Query(None),
-    plate: Optional[str] = Query(None),
-    date_from: Optional[str] = Query(None),
-    date_to: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-    """Lastik Etiketleri page - List recent tires for label creation"""
+    customer_name: Optional[str],
+    plate: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str]
+) -> Response:
+    """/lastik-etiketleri page body; runs in AsyncSession.run_sync with a sync Session"""
     try:
         # Get all tires ordered by entry date descending (most recent first)
-        # Use try-except to handle enum conversion errors
-        try:
-            query = db.query(Tire).options(
-                joinedload(Tire.brand),
-                joinedload(Tire.customer),
-                joinedload(Tire.rack)
-            )
-            
-            # Apply filters
-            # Join Customer only if we need to filter by customer fields
-            if customer_name or plate:
-                query = query.join(Customer)
-                if customer_name:
-                    # Türkçe karakter ve büyük/küçük harf duyarsız arama için normalize et
-                    normalized_search = normalize_turkish_text(customer_name.strip() if customer_name else "")
-                    # Tüm müşterileri al ve normalize ederek karşılaştır
-                    all_customers = db.query(Customer).all()
-                    matching_customer_ids = [
-                        c.id for c in all_customers 
-                        if normalized_search in normalize_turkish_text(c.ad_soyad or "")
-                    ]
-                    if matching_customer_ids:
-                        query = query.filter(Tire.musteri_id.in_(matching_customer_ids))
-                    else:
-                        query = query.filter(Tire.id == -1)  # No results
-                if plate:
-                    query = query.filter(
-                        Customer.plaka.ilike(f"%{plate}%")
-                    )
-            if date_from:
-                try:
-                    date_from_obj = datetime.fromisoformat(date_from)
-                    query = query.filter(Tire.giris_tarihi >= date_from_obj)
-                except ValueError:
-                    pass
-            if date_to:
-                try:
-                    date_to_obj = datetime.fromisoformat(date_to)
-                    query = query.filter(Tire.giris_tarihi <= date_to_obj)
-                except ValueError:
-                    pass
-            
-            query = query.order_by(Tire.giris_tarihi.desc())
-            
-            # Limit to last 100 tires for performance
-            tires = query.limit(100).all()
-        except (LookupError, ValueError, AttributeError) as enum_error:
-            # If enum conversion fails, get tire IDs first
-            print(f"Enum conversion error in lastik_etiketleri: {enum_error}, trying alternative approach")
+        # Kolon projeksiyonu: müşteri / marka / raf kolonları aynı sorgudaki outer join'lerden
+        query = tire_listing_query(db)
+
+        # Apply filters
+        if customer_name or plate:
+            if customer_name:
+                # Türkçe karakter ve büyük/küçük harf duyarsız arama (bellek içi müşteri indeksi üzerinden)
+                name_clause = customer_name_clause(db, customer_name, Tire.musteri_id)
+                if name_clause is not None:
+                    query = query.filter(name_clause)
+            if plate:
+                query = query.filter(
+                    Customer.plaka.ilike(f"%{plate}%")
+                )
+        if date_from:
             try:
-                tire_ids_query = db.query(Tire.id).order_by(Tire.giris_tarihi.desc()).limit(100)
-                tire_ids = [row.id for row in tire_ids_query.all()]
-                
-                if tire_ids:
-                    tires = db.query(Tire).options(
-                        joinedload(Tire.brand),
-                        joinedload(Tire.customer),
-                        joinedload(Tire.rack)
-                    ).filter(Tire.id.in_(tire_ids)).all()
-                else:
-                    tires = []
-            except Exception as e2:
-                print(f"Alternative approach also failed: {e2}")
-                tires = []
+                date_from_obj = datetime.fromisoformat(date_from)
+                query = query.filter(Tire.giris_tarihi >= date_from_obj)
+            except ValueError:
+                pass
+        if date_to:
+            try:
+                date_to_obj = datetime.fromisoformat(date_to)
+                query = query.filter(Tire.giris_tarihi <= date_to_obj)
+            except ValueError:
+                pass
+
+        query = query.order_by(Tire.giris_tarihi.desc())
+
+        # Limit to last 100 tires for performance
+        tires = query.limit(100).all()
         
         # Format tire data for template
-        tire_list = []
-        for tire in tires:
-            # Safely convert tire.durum to display string
-            durum_display = "Depoda"  # Default
-            try:
-                durum_raw = getattr(tire, 'durum', None)
-                if durum_raw is None:
-                    durum_display = "Depoda"
-                elif isinstance(durum_raw, ModelTireDurumEnum):
-                    if durum_raw == ModelTireDurumEnum.DEPODA:
-                        durum_display = "Depoda"
-                    elif durum_raw == ModelTireDurumEnum.CIKTI:
-                        durum_display = "Çıkmış"
-                elif isinstance(durum_raw, str):
-                    durum_str = durum_raw.strip().upper()
-                    if durum_str == "DEPODA":
-                        durum_display = "Depoda"
-                    elif durum_str == "CIKTI":
-                        durum_display = "Çıkmış"
-                elif hasattr(durum_raw, 'value'):
-                    durum_value = durum_raw.value
-                    if isinstance(durum_value, str):
-                        durum_str = durum_value.strip().upper()
-                        if durum_str == "DEPODA":
-                            durum_display = "Depoda"
-                        elif durum_str == "CIKTI":
-                            durum_display = "Çıkmış"
-            except Exception as e:
-                print(f"Error converting tire.durum in lastik_etiketleri: {e}")
-                durum_display = "Depoda"
-            
-            # Get mevsim (season) value - convert enum to display string
-            mevsim_display = ""
-            try:
-                mevsim_raw = getattr(tire, 'mevsim', None)
-                if mevsim_raw:
-                    # Check if it's an enum instance (ModelMevsimEnum or any enum)
-                    if isinstance(mevsim_raw, ModelMevsimEnum):
-                        mevsim_display = mevsim_raw.value
-                    # Check if it has a 'value' attribute (enum objects)
-                    elif hasattr(mevsim_raw, 'value'):
-                        mevsim_display = mevsim_raw.value
-                    # If it's already a string, use it directly
-                    elif isinstance(mevsim_raw, str):
-                        mevsim_display = mevsim_raw
-                    else:
-                        # Handle enum string representation like "MevsimEnum.YAZ" or "MevsimEnum('Yaz')"
-                        mevsim_str = str(mevsim_raw)
-                        mevsim_str_upper = mevsim_str.upper()
-                        
-                        # Try to extract value from enum representation using regex
-                        import re
-                        # Match patterns like "MevsimEnum('Yaz')" or "MevsimEnum.YAZ" or "Yaz"
-                        match = re.search(r"['\"]([^'\"]+)['\"]", mevsim_str)
-                        if match:
-                            extracted_value = match.group(1)
-                            # Map to correct display value
-                            if extracted_value.upper() in ['YAZ', 'Yaz']:
-                                mevsim_display = "Yaz"
-                            elif extracted_value.upper() in ['KIS', 'KIŞ', 'Kış']:
-                                mevsim_display = "Kış"
-                            elif '4' in extracted_value.upper() or 'DORT' in extracted_value.upper():
-                                mevsim_display = "4 Mevsim"
-                            else:
-                                mevsim_display = extracted_value
-                        elif 'YAZ' in mevsim_str_upper:
-                                mevsim_display = "Yaz"
-                        elif 'KIS' in mevsim_str_upper or 'KIŞ' in mevsim_str_upper:
-                                mevsim_display = "Kış"
-                        elif 'DORT_MEVSIM' in mevsim_str_upper or '4 MEVSIM' in mevsim_str_upper or ('4' in mevsim_str_upper and 'MEVSIM' in mevsim_str_upper):
-                                mevsim_display = "4 Mevsim"
-                        else:
-                                # Last resort: use string representation but clean it up
-                                mevsim_display = mevsim_str
-            except Exception as e:
-                print(f"Error converting tire.mevsim: {e}")
-                mevsim_display = ""
-
-            # Collect all tire sizes / brands / mevsims (per tire)
-            tire_sizes = []
-            tire_brands = []
-            tire_mevsims = []
-            
-            # First, check tire1 through tire6
-            for i in range(1, 7):
-                s = getattr(tire, f'tire{i}_size', None)
-                b = getattr(tire, f'tire{i}_brand', None)
-                m = getattr(tire, f'tire{i}_mevsim', None)
-                
-                # ONLY count rows where there's an actual SIZE
-                if s and str(s).strip():
-                    tire_sizes.append(str(s).strip())
-                    
-                    # Brand fallback: tire_i_brand -> default brand
-                    brand_val = str(b).strip() if b and str(b).strip() else (str(tire.brand.marka_adi).strip() if tire.brand else "")
-                    tire_brands.append(brand_val)
-                    
-                    # Mevsim fallback: tire_i_mevsim -> default mevsim
-                    mevsim_val = ""
-                    if m:
-                        mevsim_val = m.value if hasattr(m, 'value') else str(m)
-                    else:
-                        mevsim_val = mevsim_display # Use the already calculated general mevsim_display
-                    tire_mevsims.append(mevsim_val)
-            
-            # If still no tire rows found, use legacy fields as a single row
-            if not tire_sizes and tire.ebat:
-                tire_sizes.append(str(tire.ebat).strip())
-                tire_brands.append(str(tire.brand.marka_adi).strip() if tire.brand else "")
-                tire_mevsims.append(mevsim_display)
-            
-            # Get rack code
-            rack_code = tire.rack.kod if tire.rack else ""
-            
-            # Get dis durumu (tire condition)
-            dis_durumu_display = ""
-            try:
-                dis_durumu_raw = getattr(tire, 'dis_durumu', None)
-                if dis_durumu_raw:
-                    from app.models.models import DisDurumuEnum as ModelDisDurumuEnum
-                    if isinstance(dis_durumu_raw, ModelDisDurumuEnum):
-                        dis_durumu_display = dis_durumu_raw.value
-                    elif isinstance(dis_durumu_raw, str):
-                        dis_durumu_display = dis_durumu_raw
-                    elif hasattr(dis_durumu_raw, 'value'):
-                        dis_durumu_display = dis_durumu_raw.value
-            except Exception as e:
-                print(f"Error converting dis_durumu: {e}")
-                dis_durumu_display = ""
-
-            import json
-            tire_list.append({
-                "id": tire.id,
-                "seri_no": tire.seri_no if hasattr(tire, 'seri_no') and tire.seri_no else None,
-                "customer_name": tire.customer.ad_soyad if tire.customer else "",
-                "customer_phone": tire.customer.telefon if tire.customer else "",
-                "customer_plate": tire.customer.plaka if tire.customer else "",
-                "ebat": tire.ebat,
-                "tire_sizes": tire_sizes,  # List of all tire sizes
-                "tire_sizes_json": json.dumps(tire_sizes) if tire_sizes else "[]",  # JSON string for template
-                "tire_brands": tire_brands,
-                "tire_mevsims": tire_mevsims,
-                "brand": tire.brand.marka_adi if tire.brand else "",
-                "mevsim": mevsim_display,  # Mevsim bilgisi
-                "rack_code": rack_code,
-                "dis_durumu": dis_durumu_display,
-                "giris_tarihi": tire.giris_tarihi,
-                "durum": durum_display
-            })
+        items = load_tire_items(db, [row.id for row in tires])
+        tire_list = [label_item(row, items.get(row.id, ())) for row in tires]
         
         query_params = {
             "customer_name": customer_name or "",
@@ -1199,35 +885,39 @@ async def lastik_etiketleri(
         ))
 
 
-@router.get("/musteri-gecmisi", response_class=HTMLResponse)
-async def musteri_gecmisi(
+@router.get("/lastik-etiketleri", response_class=HTMLResponse)
+async def lastik_etiketleri(
     request: Request,
     customer_name: Optional[str] = Query(None),
     plate: Optional[str] = Query(None),
-    phone: Optional[str] = Query(None),
-    seri_no: Optional[str] = Query(None),
-    eski_giris_tarihi: Optional[str] = Query(None),
-    islem_tarihi: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Customer history page"""
+    """Lastik Etiketleri page - List recent tires for label creation"""
+    return await db.run_sync(_render_lastik_etiketleri, request, customer_name, plate, date_from, date_to)
+
+
+def _render_musteri_gecmisi(
+    db: Session,
+    request: Request,
+    customer_name: Optional[str],
+    plate: Optional[str],
+    phone: Optional[str],
+    seri_no: Optional[str],
+    eski_giris_tarihi: Optional[str],
+    islem_tarihi: Optional[str]
+) -> Response:
+    """/musteri-gecmisi page body; runs in AsyncSession.run_sync with a sync Session"""
     try:
         # Query directly from database
         query = db.query(TireHistory)
         
         if customer_name:
-            # Türkçe karakter ve büyük/küçük harf duyarsız arama için normalize et
-            normalized_search = normalize_turkish_text(customer_name.strip())
-            # Tüm TireHistory kayıtlarını al ve normalize ederek karşılaştır
-            all_history_items = db.query(TireHistory).all()
-            matching_history_ids = [
-                h.id for h in all_history_items 
-                if normalized_search in normalize_turkish_text(h.musteri_adi or "")
-            ]
-            if matching_history_ids:
-                query = query.filter(TireHistory.id.in_(matching_history_ids))
-            else:
-                query = query.filter(TireHistory.id == -1)  # No results
+            # Türkçe karakter ve büyük/küçük harf duyarsız arama (musteri_adi_norm indeksi üzerinden)
+            name_filter = history_customer_name_filter(db, customer_name)
+            if name_filter is not None:
+                query = query.filter(name_filter)
         if plate:
             query = query.filter(TireHistory.plaka.ilike(f"%{plate}%"))
         if phone:
@@ -1449,25 +1139,8 @@ async def musteri_gecmisi(
                     yeni_mevsim_list = []
             
             # Get mevsim values - handle case where columns don't exist yet
-            eski_mevsim = None
-            yeni_mevsim = None
-            try:
-                if hasattr(item, 'eski_lastik_mevsim') and item.eski_lastik_mevsim:
-                    if hasattr(item.eski_lastik_mevsim, 'value'):
-                        eski_mevsim = item.eski_lastik_mevsim.value
-                    else:
-                        eski_mevsim = str(item.eski_lastik_mevsim)
-            except (AttributeError, KeyError):
-                pass
-            
-            try:
-                if hasattr(item, 'yeni_lastik_mevsim') and item.yeni_lastik_mevsim:
-                    if hasattr(item.yeni_lastik_mevsim, 'value'):
-                        yeni_mevsim = item.yeni_lastik_mevsim.value
-                    else:
-                        yeni_mevsim = str(item.yeni_lastik_mevsim)
-            except (AttributeError, KeyError):
-                pass
+            eski_mevsim = MEVSIM.display(getattr(item, 'eski_lastik_mevsim', None))
+            yeni_mevsim = MEVSIM.display(getattr(item, 'yeni_lastik_mevsim', None))
             
             # Get serial numbers - handle case where columns don't exist yet
             eski_seri_no = None
@@ -1508,7 +1181,7 @@ async def musteri_gecmisi(
                 "musteri_adi": item.musteri_adi,
                 "plaka": item.plaka,
                 "telefon": item.telefon,
-                "islem_turu": item.islem_turu.value if hasattr(item.islem_turu, 'value') else str(item.islem_turu),
+                "islem_turu": ISLEM_TURU.display(item.islem_turu),
                 "islem_tarihi": item.islem_tarihi,
                 "eski_lastik_ebat": eski_ebat_list,
                 "eski_lastik_marka": item.eski_lastik_marka,
@@ -1554,3 +1227,21 @@ async def musteri_gecmisi(
             query_params={},
             current_path="/musteri-gecmisi"
         ))
+
+
+@router.get("/musteri-gecmisi", response_class=HTMLResponse)
+async def musteri_gecmisi(
+    request: Request,
+    customer_name: Optional[str] = Query(None),
+    plate: Optional[str] = Query(None),
+    phone: Optional[str] = Query(None),
+    seri_no: Optional[str] = Query(None),
+    eski_giris_tarihi: Optional[str] = Query(None),
+    islem_tarihi: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Customer history page"""
+    return await db.run_sync(
+        _render_musteri_gecmisi, request,
+        customer_name, plate, phone, seri_no, eski_giris_tarihi, islem_tarihi
+    )
@@ -6,7 +6,7 @@ from app.utils.enums import RackDurumEnum
 class RackCreate(BaseModel):
     """Schema for creating a rack"""
     kod: str = Field(..., description="Rack code")
-    durum: RackDurumEnum = Field(default=RackDurumEnum.BOS, description="Rack status")
+    durum: RackDurumEnum = Field(default=RackDurumEnum.BOS, description="Rack status (ignored, derived from active tires)")
     not_: Optional[str] = Field(None, alias="not", description="Optional note")
 
     class Config:
@@ -25,6 +25,7 @@ class RackRead(BaseModel):
     id: int
     kod: str
     durum: RackDurumEnum
+    active_tire_count: int = 0
     not_: Optional[str] = Field(None, alias="not")
 
     class Config:
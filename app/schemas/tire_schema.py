@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from app.utils.enums import MevsimEnum, DisDurumuEnum, TireDurumEnum, BRAND_LIST
+from app.utils.enum_codec import TIRE_DURUM
 
 
 class TireCreate(BaseModel):
@@ -48,27 +49,11 @@ class TireCreate(BaseModel):
     def validate_durum(cls, v):
         if v is None:
             return TireDurumEnum.DEPODA
-        if isinstance(v, str):
-            # Convert string to enum
-            v_clean = v.strip()
-            if v_clean == "Çıkmış" or v_clean == "CIKTI":
-                return TireDurumEnum.CIKTI
-            elif v_clean == "Depoda" or v_clean == "DEPODA":
-                return TireDurumEnum.DEPODA
-            else:
-                # Try to convert directly using enum value
-                try:
-                    # Try by value first
-                    for enum_item in TireDurumEnum:
-                        if enum_item.value == v_clean:
-                            return enum_item
-                    # If not found, try by name
-                    return TireDurumEnum[v_clean]
-                except (ValueError, KeyError):
-                    raise ValueError(f"Invalid tire status: '{v}'. Must be 'Depoda', 'Çıkmış', 'DEPODA', or 'CIKTI'")
-        elif isinstance(v, TireDurumEnum):
-            return v
-        return v
+        # "Depoda" / "DEPODA" / "Çıkmış" / "CIKTI" / enum üyeleri -> utils TireDurumEnum
+        durum = TIRE_DURUM.to_api(v)
+        if durum is None:
+            raise ValueError(f"Invalid tire status: '{v}'. Must be 'Depoda', 'Çıkmış', 'DEPODA', or 'CIKTI'")
+        return durum
 
     # Brand validation removed - brands are now stored in database and can be added dynamically
 
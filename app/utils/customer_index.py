@@ -0,0 +1,430 @@
+"""
+In-process Turkish n-gram (trigram) index of customers for type-ahead search.
+
+Müşterilerin normalize edilmiş ad/plaka/telefon değerleri trigram'lara bölünür ve
+her trigram bir müşteri ID kümesine (posting list) eşlenir. İndeks startup'ta bir kez
+kurulur, customer_routes create/update/delete işlemlerinde artımlı güncellenir.
+
+Her worker kendi indeksini tutar. Bu worker'ın yazımları yukarıdaki kancalarla indekse
+yansır; başka bir worker customers tablosuna yazdığında (paylaşılan data_versions sürümü,
+bkz. app.models.data_version) indeks eskimiş sayılır ve arka planda (tek thread, istek
+yolunun dışında) yeniden kurulur. CUSTOMER_INDEX_MAX_AGE yalnızca bir emniyet ağıdır
+(sürüm takibi dışındaki yazımlar, ör. elle SQL). Eski indeks kullanılmaz: yeniden kurulum
+bitene kadar aramalar SQL (ad_soyad_norm) filtresine düşer. Bellek bütçesi (CUSTOMER_INDEX_MAX_MB) aşılırsa
+indeks devre dışı kalır ve otomatik olarak yeniden denenmez (yalnızca elle rebuild).
+"""
+import heapq
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, or_
+from sqlalchemy.orm import Session
+
+from app.models.data_version import data_versions
+from app.models.database import SessionLocal
+from app.models.models import Customer
+from app.models.search_index import customer_name_filter
+from app.utils.text_utils import normalize_name, normalize_turkish_text
+
+NGRAM_SIZE = 3
+FIELDS = ("name", "plate", "phone")
+
+# Kaba bellek tahmini için sabitler (CPython set/dict/int maliyetleri)
+_POSTING_ENTRY_BYTES = 56
+_NGRAM_KEY_BYTES = 120
+_DOC_BYTES = 200
+
+# Çok kısa aramalar neredeyse tüm müşterileri döndürür; dev IN (...) listesi yerine SQL'e düş
+MAX_CANDIDATE_IDS = int(os.getenv("CUSTOMER_INDEX_MAX_CANDIDATES", "1000"))
+
+# Başarısız arka plan kurulumundan sonra yeniden denemeden önce beklenecek süre
+REBUILD_RETRY_SECONDS = 60
+
+# İndeks yokken autocomplete için SQL'den çekilecek en fazla aday
+SQL_FALLBACK_CANDIDATES = 200
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]")
+_NON_DIGIT = re.compile(r"[^0-9]")
+
+
+def normalize_plate(value: str) -> str:
+    # "34 ABC 12", "34-abc-12" -> "34abc12"
+    return _NON_ALNUM.sub("", normalize_turkish_text(value or ""))
+
+
+def normalize_phone(value: str) -> str:
+    # "0555 123 45 67" -> "05551234567"
+    return _NON_DIGIT.sub("", value or "")
+
+
+NORMALIZERS = {
+    "name": normalize_name,
+    "plate": normalize_plate,
+    "phone": normalize_phone,
+}
+
+
+def search_needles(query: str) -> Tuple[str, str, str]:
+    """Normalized (name, plate, phone) needles for a search query"""
+    name, plate, phone = (NORMALIZERS[field](query) for field in FIELDS)
+    if not plate.isdigit():
+        # Harf içeren arama telefon değildir: "34 ABC 12" -> "3412" telefonlarla eşleşmemeli
+        phone = ""
+    return name, plate, phone
+
+
+def ngrams(value: str) -> Set[str]:
+    if len(value) < NGRAM_SIZE:
+        return set()
+    return {value[i:i + NGRAM_SIZE] for i in range(len(value) - NGRAM_SIZE + 1)}
+
+
+def normalize_doc(ad_soyad: str, plaka: str, telefon: str) -> Tuple[str, str, str]:
+    return normalize_name(ad_soyad), normalize_plate(plaka), normalize_phone(telefon)
+
+
+def match_rank(value: str, needle: str) -> Optional[int]:
+    """0 = exact, 1 = prefix, 2 = word prefix, 3 = substring, None = no match"""
+    if needle not in value:
+        return None
+    if value == needle:
+        return 0
+    if value.startswith(needle):
+        return 1
+    if f" {needle}" in value:
+        return 2
+    return 3
+
+
+def rank_docs(docs: Iterable[Tuple[int, Tuple[str, str, str]]], needles: Tuple[str, str, str], limit: int) -> List[int]:
+    """Best `limit` customer IDs by (best field rank, name)"""
+    scored = []
+    for customer_id, doc in docs:
+        best = None
+        for value, needle in zip(doc, needles):
+            if needle:
+                rank = match_rank(value, needle)
+                if rank is not None and (best is None or rank < best):
+                    best = rank
+        if best is not None:
+            scored.append((best, doc[0], customer_id))
+    return [customer_id for _, _, customer_id in heapq.nsmallest(limit, scored)]
+
+
+class CustomerSearchIndex:
+    """Trigram -> customer ID posting lists for name, plate and phone"""
+
+    def __init__(self, max_memory_bytes: int, max_age_seconds: float):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._docs: Dict[int, Tuple[str, str, str]] = {}
+        self._postings: Dict[str, Dict[str, Set[int]]] = {field: {} for field in FIELDS}
+        self._posting_entries = 0
+        # Kurulum sürerken gelen yazımlar (id -> (ad, plaka, telefon) / None = silindi); takasta uygulanır
+        self._changes_during_build: Optional[Dict[int, Optional[Tuple[str, str, str]]]] = None
+        self.ready = False
+        self.disabled_reason: Optional[str] = None
+        self.over_budget = False
+        self.built_at = 0.0
+        self.build_seconds = 0.0
+        self.background_rebuilds = 0
+        self._retry_at = 0.0
+
+    # -------------------------
+    # BUILD / WRITE-THROUGH
+    # -------------------------
+    def build_from_rows(self, rows: Iterable[Tuple[int, str, str, str]]):
+        """Build from (id, ad_soyad, plaka, telefon) rows and swap in atomically"""
+        started = time.perf_counter()
+        started_at = time.monotonic()
+        with self._lock:
+            self._changes_during_build = {}
+        docs: Dict[int, Tuple[str, str, str]] = {}
+        postings: Dict[str, Dict[str, Set[int]]] = {field: {} for field in FIELDS}
+        entries = 0
+        over_budget = False
+
+        for customer_id, ad_soyad, plaka, telefon in rows:
+            doc = normalize_doc(ad_soyad, plaka, telefon)
+            docs[customer_id] = doc
+            for field, value in zip(FIELDS, doc):
+                field_postings = postings[field]
+                for gram in ngrams(value):
+                    field_postings.setdefault(gram, set()).add(customer_id)
+                    entries += 1
+            if self._estimate_bytes(len(docs), entries, postings) > self.max_memory_bytes:
+                over_budget = True
+                break
+
+        with self._lock:
+            changes, self._changes_during_build = self._changes_during_build, None
+            self.build_seconds = time.perf_counter() - started
+            # Yaş, okunan verinin yaşıdır: kurulumun başladığı an
+            self.built_at = started_at
+            if over_budget:
+                self._clear(f"memory budget exceeded ({self.max_memory_bytes} bytes)")
+                return
+            self._docs = docs
+            self._postings = postings
+            self._posting_entries = entries
+            self.ready = True
+            self.disabled_reason = None
+            self.over_budget = False
+            for customer_id, raw in (changes or {}).items():
+                self._remove_locked(customer_id)
+                if raw is not None:
+                    self._add_locked(customer_id, *raw)
+
+    def rebuild(self, db: Session):
+        rows = db.query(Customer.id, Customer.ad_soyad, Customer.plaka, Customer.telefon).yield_per(2000)
+        try:
+            self.build_from_rows(rows)
+        except Exception:
+            with self._lock:
+                self._changes_during_build = None
+            raise
+        return self.stats()
+
+    def add_or_update(self, customer: Customer):
+        with self._lock:
+            if self._changes_during_build is not None:
+                self._changes_during_build[customer.id] = (customer.ad_soyad, customer.plaka, customer.telefon)
+            if not self.ready:
+                return
+            self._remove_locked(customer.id)
+            self._add_locked(customer.id, customer.ad_soyad, customer.plaka, customer.telefon)
+            if self.approx_bytes() > self.max_memory_bytes:
+                self._clear(f"memory budget exceeded ({self.max_memory_bytes} bytes)")
+
+    def remove(self, customer_id: int):
+        with self._lock:
+            if self._changes_during_build is not None:
+                self._changes_during_build[customer_id] = None
+            if self.ready:
+                self._remove_locked(customer_id)
+
+    def _add_locked(self, customer_id: int, ad_soyad: str, plaka: str, telefon: str):
+        doc = normalize_doc(ad_soyad, plaka, telefon)
+        self._docs[customer_id] = doc
+        for field, value in zip(FIELDS, doc):
+            field_postings = self._postings[field]
+            for gram in ngrams(value):
+                field_postings.setdefault(gram, set()).add(customer_id)
+                self._posting_entries += 1
+
+    def _remove_locked(self, customer_id: int):
+        doc = self._docs.pop(customer_id, None)
+        if doc is None:
+            return
+        for field, value in zip(FIELDS, doc):
+            field_postings = self._postings[field]
+            for gram in ngrams(value):
+                ids = field_postings.get(gram)
+                if ids and customer_id in ids:
+                    ids.discard(customer_id)
+                    self._posting_entries -= 1
+                    if not ids:
+                        del field_postings[gram]
+
+    def _clear(self, reason: str):
+        self._docs = {}
+        self._postings = {field: {} for field in FIELDS}
+        self._posting_entries = 0
+        self.ready = False
+        self.disabled_reason = reason
+        # Bütçe aşımı veri büyüdükçe tekrarlanır; arka planda yeniden denenmez
+        self.over_budget = True
+
+    def refresh_in_background(self, session_factory) -> bool:
+        """Start a background rebuild unless one is running or the index is over budget"""
+        if self.over_budget or time.monotonic() < self._retry_at:
+            return False
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                with session_factory() as db:
+                    self.rebuild(db)
+                self.background_rebuilds += 1
+            except Exception as e:
+                print(f"Customer index rebuild failed: {e}")
+                # Hata halinde her aramada yeniden denenmez
+                self._retry_at = time.monotonic() + REBUILD_RETRY_SECONDS
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=run, name="customer-index-rebuild", daemon=True).start()
+        return True
+
+    # -------------------------
+    # QUERY
+    # -------------------------
+    def is_stale(self) -> bool:
+        if not self.built_at:
+            return True
+        return data_versions.changed_externally_since("customers", self.built_at) \
+            or (time.monotonic() - self.built_at) > self.max_age_seconds
+
+    def is_fresh(self) -> bool:
+        """Ready, no other worker wrote customers since the build, within max_age"""
+        return self.ready and not self.is_stale()
+
+    def search(self, field: str, query: str) -> Optional[Set[int]]:
+        """IDs whose normalized `field` contains `query`; None if the index is unavailable"""
+        value = NORMALIZERS[field](query)
+        with self._lock:
+            if not self.ready:
+                return None
+            if not value:
+                return set(self._docs)
+            position = FIELDS.index(field)
+            grams = ngrams(value)
+            if not grams:
+                # 3 karakterden kısa aramalar: normalize değerler üzerinde doğrudan tarama
+                return {cid for cid, doc in self._docs.items() if value in doc[position]}
+            field_postings = self._postings[field]
+            posting_lists = []
+            for gram in grams:
+                ids = field_postings.get(gram)
+                if not ids:
+                    return set()
+                posting_lists.append(ids)
+            posting_lists.sort(key=len)
+            candidates = set(posting_lists[0])
+            for ids in posting_lists[1:]:
+                candidates &= ids
+                if not candidates:
+                    return candidates
+            # Trigram kesişimi aday üretir; gerçek alt-dize eşleşmesini doğrula
+            return {cid for cid in candidates if value in self._docs[cid][position]}
+
+    def rank(self, query: str, limit: int) -> Optional[List[int]]:
+        """Top `limit` IDs matching `query` on name, plate or phone; None if the index is unavailable"""
+        needles = search_needles(query)
+        with self._lock:
+            if not self.ready:
+                return None
+            candidates: Set[int] = set()
+            for field, needle in zip(FIELDS, needles):
+                if needle:
+                    candidates |= self.search(field, query)
+            return rank_docs(((cid, self._docs[cid]) for cid in candidates), needles, limit)
+
+    # -------------------------
+    # STATS
+    # -------------------------
+    @staticmethod
+    def _estimate_bytes(doc_count: int, entries: int, postings) -> int:
+        keys = sum(len(field_postings) for field_postings in postings.values())
+        return doc_count * _DOC_BYTES + entries * _POSTING_ENTRY_BYTES + keys * _NGRAM_KEY_BYTES
+
+    def approx_bytes(self) -> int:
+        return self._estimate_bytes(len(self._docs), self._posting_entries, self._postings)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "fresh": self.ready and not self.is_stale(),
+                "disabled_reason": self.disabled_reason,
+                "rebuilding": self._refresh_lock.locked(),
+                "background_rebuilds": self.background_rebuilds,
+                "customers": len(self._docs),
+                "ngrams": {field: len(self._postings[field]) for field in FIELDS},
+                "posting_entries": self._posting_entries,
+                "approx_bytes": self.approx_bytes(),
+                "max_memory_bytes": self.max_memory_bytes,
+                "build_ms": round(self.build_seconds * 1000, 2),
+                "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+            }
+
+
+customer_index = CustomerSearchIndex(
+    max_memory_bytes=int(float(os.getenv("CUSTOMER_INDEX_MAX_MB", "128")) * 1024 * 1024),
+    max_age_seconds=float(os.getenv("CUSTOMER_INDEX_MAX_AGE", "3600")),
+)
+
+
+def _fresh_index(db: Session) -> bool:
+    """True if the index can answer now; otherwise schedules a background rebuild (-> use SQL)"""
+    # Diğer worker'ların müşteri yazımları (en fazla DATA_VERSION_POLL_SECONDS'ta bir okunur)
+    data_versions.refresh_if_due(db)
+    if customer_index.is_fresh():
+        return True
+    if customer_index.is_stale():
+        customer_index.refresh_in_background(SessionLocal)
+    return False
+
+
+def search_customer_ids(db: Session, field: str, query: str) -> Optional[Set[int]]:
+    """Candidate customer IDs from the in-memory index; None -> use SQL (index stale or unavailable)"""
+    if not _fresh_index(db):
+        return None
+    return customer_index.search(field, query)
+
+
+def customer_name_clause(db: Session, customer_name: str, id_column):
+    """
+    Filter clause "id_column is a customer whose name contains customer_name".
+
+    İndeksten aday ID'ler alınır; indeks eski / kullanılamıyorsa veya aday sayısı çok
+    büyükse ad_soyad_norm üzerindeki SQL filtresine düşülür.
+    """
+    if not normalize_name(customer_name):
+        return None
+    ids = search_customer_ids(db, "name", customer_name)
+    if ids is not None and len(ids) <= MAX_CANDIDATE_IDS:
+        return id_column.in_(list(ids))
+    name_filter = customer_name_filter(db, customer_name)
+    if name_filter is None:
+        return None
+    if id_column is Customer.id:
+        return name_filter
+    return id_column.in_(db.query(Customer.id).filter(name_filter))
+
+
+def rank_customer_ids(db: Session, query: str, limit: int) -> List[int]:
+    """
+    Ranked customer IDs for autocomplete (exact > prefix > word prefix > substring).
+
+    İndeks kullanılamıyorsa adaylar SQL ile sınırlı sayıda çekilir; arama indeksle aynı
+    normalizasyondan geçer ve ad_soyad_norm / plaka_norm / telefon_norm kolonlarıyla
+    eşleşir (PostgreSQL'de hepsi trigram indeksli).
+    """
+    ranked = customer_index.rank(query, limit) if _fresh_index(db) else None
+    if ranked is not None:
+        return ranked
+
+    needles = search_needles(query)
+    name, plate, phone = needles
+    conditions = []
+    ranked_columns = []
+    name_filter = customer_name_filter(db, query)
+    if name_filter is not None:
+        conditions.append(name_filter)
+        ranked_columns.append((Customer.ad_soyad_norm, name))
+    if plate:
+        conditions.append(Customer.plaka_norm.contains(plate))
+        ranked_columns.append((Customer.plaka_norm, plate))
+    if phone:
+        conditions.append(Customer.telefon_norm.contains(phone))
+        ranked_columns.append((Customer.telefon_norm, phone))
+    if not conditions:
+        return []
+    # Aday limiti sırasız bir alt küme seçmesin: tam / önek eşleşmeler (yeni_lastik.html tam
+    # eşleşmeye güvenir, yoksa mükerrer müşteri açılır) limitten önce SQL'de öne alınır
+    match_order = case(
+        *[(column == needle, 0) for column, needle in ranked_columns],
+        *[(column.startswith(needle, autoescape=True), 1) for column, needle in ranked_columns],
+        else_=2
+    )
+    rows = db.query(Customer.id, Customer.ad_soyad, Customer.plaka, Customer.telefon).filter(
+        or_(*conditions)
+    ).order_by(match_order, Customer.id).limit(SQL_FALLBACK_CANDIDATES).all()
+    return rank_docs(((row.id, normalize_doc(row.ad_soyad, row.plaka, row.telefon)) for row in rows), needles, limit)
@@ -0,0 +1,81 @@
+"""
+Enum codec: raw DB / request value -> canonical model enum -> display / API value.
+
+İki enum ailesi vardır:
+- app.models.models: kolonlarda saklanan enum'lar (ör. TireDurumEnum "DEPODA" / "CIKTI")
+- app.utils.enums: API şemaları ve ekranlar (ör. TireDurumEnum "Depoda" / "Çıkmış")
+
+Aynı isimli üyeler birbirine karşılık gelir. Tüm eşlemeler import sırasında bir kez
+sözlüklere açılır; her alan tek bir dict lookup ile çözülür (isinstance / regex zinciri yok).
+Kabul edilen ham değerler: model enum üyesi, API enum üyesi, üye adı ("YAZ"), model / API
+değeri ("Yaz", "Çıkmış"), "MevsimEnum.YAZ" biçimi ve bunların büyük harfli yazımları.
+"""
+from enum import Enum
+from typing import Any, Dict, Optional, Type
+
+from app.models.models import (
+    DisDurumuEnum as ModelDisDurumuEnum,
+    IslemTuruEnum as ModelIslemTuruEnum,
+    MevsimEnum as ModelMevsimEnum,
+    RackDurumEnum as ModelRackDurumEnum,
+    TireDurumEnum as ModelTireDurumEnum,
+)
+from app.utils.enums import DisDurumuEnum, IslemTuruEnum, MevsimEnum, RackDurumEnum, TireDurumEnum
+
+
+class EnumCodec:
+    """Precomputed lookups between a model enum and its API/display counterpart"""
+
+    def __init__(self, model_enum: Type[Enum], api_enum: Type[Enum]):
+        self.model_enum = model_enum
+        self.api_enum = api_enum
+        self._decode: Dict[Any, Enum] = {}
+        self._api: Dict[Enum, Enum] = {}
+        self._display: Dict[Enum, str] = {}
+        for member in model_enum:
+            api_member = api_enum[member.name]
+            self._api[member] = api_member
+            self._display[member] = api_member.value
+            keys = (
+                member.name,
+                member.value,
+                api_member.value,
+                f"{model_enum.__name__}.{member.name}",
+            )
+            for key in keys:
+                self._decode.setdefault(key, member)
+                self._decode.setdefault(key.upper(), member)
+
+    def decode(self, raw) -> Optional[Enum]:
+        """Canonical model enum member for `raw`, or None if it is empty / unknown"""
+        if raw is None:
+            return None
+        # str tabanlı enum üyeleri değerleriyle aynı hash'e sahip: üyeler de doğrudan bulunur
+        member = self._decode.get(raw)
+        if member is None and isinstance(raw, str):
+            member = self._decode.get(raw.strip().upper())
+        return member
+
+    def decode_strict(self, raw) -> Optional[Enum]:
+        """Like decode(), but an unknown non-empty value raises ValueError instead of returning None"""
+        member = self.decode(raw)
+        if member is None and raw is not None and str(raw).strip():
+            raise ValueError(f"{raw!r} is not a valid {self.model_enum.__name__} value")
+        return member
+
+    def to_api(self, raw, default: Optional[Enum] = None, strict: bool = False) -> Optional[Enum]:
+        """app.utils.enums member for `raw` (API / schema side); strict: see decode_strict()"""
+        member = self.decode_strict(raw) if strict else self.decode(raw)
+        return self._api[member] if member is not None else default
+
+    def display(self, raw, default: Optional[str] = None, strict: bool = False) -> Optional[str]:
+        """Display string for `raw` (e.g. "Çıkmış", "4 Mevsim"); strict: see decode_strict()"""
+        member = self.decode_strict(raw) if strict else self.decode(raw)
+        return self._display[member] if member is not None else default
+
+
+TIRE_DURUM = EnumCodec(ModelTireDurumEnum, TireDurumEnum)
+MEVSIM = EnumCodec(ModelMevsimEnum, MevsimEnum)
+DIS_DURUMU = EnumCodec(ModelDisDurumuEnum, DisDurumuEnum)
+RACK_DURUM = EnumCodec(ModelRackDurumEnum, RackDurumEnum)
+ISLEM_TURU = EnumCodec(ModelIslemTuruEnum, IslemTuruEnum)
@@ -0,0 +1,119 @@
+"""
+Keyset (seek) pagination helpers.
+
+İmleç (cursor), son görülen satırın sıralama anahtarını taşıyan opak bir metindir
+(URL-safe base64 JSON). OFFSET yerine `(kolonlar) < (anahtar)` karşılaştırması
+kullanıldığından her sayfa indeks üzerinden sabit maliyetle okunur.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import func, tuple_
+
+# İsteğe bağlı toplam: "exact" (indeksli COUNT) veya "estimate" (PostgreSQL planlayıcı tahmini)
+TOTAL_MODES = ("exact", "estimate")
+
+
+def _encode_value(value: Any):
+    # datetime değerleri JSON'da tipini kaybetmesin diye etiketlenir
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode a sort key tuple into an opaque, URL-safe cursor"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str], length: int = 2) -> Optional[Tuple[Any, ...]]:
+    """Decode a cursor produced by encode_cursor; returns None for missing/invalid tokens"""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(values, list) or len(values) != length:
+            return None
+        return tuple(_decode_value(v) for v in values)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def keyset_page(
+    query,
+    sort_columns: Sequence,
+    after_key: Optional[Tuple[Any, ...]],
+    limit: int,
+    descending: bool = False,
+    offset: int = 0
+):
+    """
+    Apply keyset pagination to an ORM query.
+
+    `sort_columns` must form a unique key (e.g. end with the primary key). Returns
+    (rows, has_more); fetching limit + 1 rows avoids a separate COUNT for "has more".
+    `offset` only exists for legacy `skip` callers.
+    """
+    if after_key is not None:
+        sort_key = tuple_(*sort_columns)
+        boundary = tuple_(*after_key)
+        query = query.filter(sort_key < boundary if descending else sort_key > boundary)
+    order = [column.desc() if descending else column.asc() for column in sort_columns]
+    query = query.order_by(*order)
+    if offset:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def _postgres_row_estimate(query) -> Optional[int]:
+    """Planner row estimate for `query` (EXPLAIN, no execution); None if unavailable"""
+    session = query.session
+    try:
+        compiled = query.order_by(None).statement.compile(
+            dialect=session.get_bind().dialect,
+            compile_kwargs={"render_postcompile": True}
+        )
+        # SAVEPOINT: EXPLAIN hata verirse işlem (transaction) iptal durumuna düşmesin
+        with session.begin_nested():
+            plan = session.connection().exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+            ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        print(f"Row estimate failed, falling back to COUNT: {e}")
+        return None
+
+
+def count_total(query, count_column, mode: Optional[str]) -> Optional[int]:
+    """
+    Total row count for a filtered query, or None when `mode` is not requested.
+
+    "estimate" uses the PostgreSQL planner estimate (O(1) regardless of table size);
+    on other databases it falls back to an exact COUNT over `count_column`.
+    """
+    if mode not in TOTAL_MODES:
+        return None
+    if mode == "estimate" and query.session.get_bind().dialect.name == "postgresql":
+        estimate = _postgres_row_estimate(query)
+        if estimate is not None:
+            return estimate
+    return query.order_by(None).with_entities(func.count(count_column)).scalar()
@@ -0,0 +1,26 @@
+import re
+from typing import Tuple
+
+_LEGACY_PREFIX = re.compile(r'^([^0-9]+)')
+_NUMBER = re.compile(r'\d+')
+
+
+def rack_sort_keys(kod: str) -> Tuple[str, int]:
+    """
+    Raf kodundan (grup öneki, numara) sıralama anahtarlarını çıkarır.
+    "A-1" -> ("A", 1), "ARKA JENARATOR-2" -> ("ARKA JENARATOR", 2), eski format "BAHÇE2" -> ("BAHÇE", 2).
+    Racks.sort_prefix / racks.sort_number kolonları bu fonksiyonla doldurulur.
+    """
+    if not kod:
+        return "OTHER", 0
+    if '-' in kod:
+        prefix, suffix = kod.rsplit('-', 1)
+    else:
+        # Legacy support for codes like A1 or BAHÇE2
+        match = _LEGACY_PREFIX.match(kod)
+        if match:
+            prefix, suffix = match.group(1).strip(), kod[match.end():]
+        else:
+            prefix, suffix = kod[0], kod[1:]
+    number = _NUMBER.search(suffix)
+    return prefix, int(number.group()) if number else 0
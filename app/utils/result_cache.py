@@ -0,0 +1,108 @@
+"""
+Bounded in-memory result cache (LRU + TTL) with version-based invalidation.
+
+Her girdi bir `version` değeriyle saklanır (ör. ilgili tabloların data_versions değerleri).
+Farklı bir sürümle okuma/yazma yapıldığında eski sürüme ait tüm girdiler atılır; böylece
+yazma işlemleri önbelleği anında geçersiz kılar. data_versions tüm worker'larca paylaşıldığı
+için TTL yalnızca sürüm takibi dışında kalan yazmalar (ör. elle SQL) için bir üst sınırdır.
+
+Boyut sınırı yaklaşıktır: girdinin boyutu repr() uzunluğu ile tahmin edilir.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by entry count, approximate size and age"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._version: Any = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def _sync_version_locked(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _drop_locked(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable, version) -> Optional[Any]:
+        """Cached value for `key` at `version`, or None (counted as a miss)"""
+        with self._lock:
+            self._sync_version_locked(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at, _ = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                self._drop_locked(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, version, value: Any):
+        if not self.enabled:
+            return
+        size = len(repr(value))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._sync_version_locked(version)
+            if key in self._entries:
+                self._drop_locked(key)
+            self._entries[key] = (value, time.monotonic(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._drop_locked(oldest_key)
+                self.evictions += 1
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "approx_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
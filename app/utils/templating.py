@@ -0,0 +1,97 @@
+"""
+Jinja2 environment for the HTML pages.
+
+TEMPLATE_MODE=development (varsayılan): her istekte dosya değişikliği kontrol edilir,
+bytecode cache yok; düzenlenen şablonlar yeniden başlatmadan görünür.
+TEMPLATE_MODE=production (dağıtımda ayarlanmalı): auto_reload kapalı, derlenmiş şablonlar
+FileSystemBytecodeCache ile diske yazılır (TEMPLATE_CACHE_DIR) ve startup'ta
+warm_up_templates() ile tüm şablonlar önceden derlenir. Şablon dosyaları
+değiştirildiğinde uygulama yeniden başlatılmalıdır.
+
+Her şablonun render süresi template_render_stats() ile izlenebilir.
+"""
+import os
+import tempfile
+import threading
+import time
+from typing import Dict
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+TEMPLATE_MODE = os.getenv("TEMPLATE_MODE", "development").lower()
+TEMPLATE_CACHE_DIR = os.getenv(
+    "TEMPLATE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "lastikdepo-jinja-cache")
+)
+
+_stats_lock = threading.Lock()
+_render_stats: Dict[str, dict] = {}
+
+
+def _record_render(name: str, elapsed_ms: float):
+    with _stats_lock:
+        entry = _render_stats.setdefault(
+            name, {"renders": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+        )
+        entry["renders"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["last_ms"] = elapsed_ms
+        if elapsed_ms > entry["max_ms"]:
+            entry["max_ms"] = elapsed_ms
+
+
+class TimedTemplate(Template):
+    """Template that records its render time (top-level render calls only)"""
+
+    def render(self, *args, **kwargs) -> str:
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            _record_render(self.name or "<string>", (time.perf_counter() - started) * 1000)
+
+
+class TimedEnvironment(Environment):
+    template_class = TimedTemplate
+
+
+def create_template_environment(template_dir: str) -> Environment:
+    """Build the page template environment for the configured TEMPLATE_MODE"""
+    if TEMPLATE_MODE == "development":
+        return TimedEnvironment(loader=FileSystemLoader(template_dir), auto_reload=True)
+
+    bytecode_cache = None
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+    except OSError as e:
+        # Yazılamayan dizin: şablonlar yine bellekte derlenmiş olarak tutulur
+        print(f"⚠️ Template bytecode cache disabled ({TEMPLATE_CACHE_DIR}): {e}")
+    return TimedEnvironment(
+        loader=FileSystemLoader(template_dir),
+        auto_reload=False,
+        bytecode_cache=bytecode_cache,
+        cache_size=-1
+    )
+
+
+def warm_up_templates(env: Environment) -> dict:
+    """Compile (and bytecode-cache) every template up front; returns {"templates", "compile_ms"}"""
+    started = time.perf_counter()
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return {"templates": len(names), "compile_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def template_render_stats() -> dict:
+    """Per-template render count and timings (ms) since process start"""
+    with _stats_lock:
+        return {
+            name: {
+                "renders": entry["renders"],
+                "avg_ms": round(entry["total_ms"] / entry["renders"], 2),
+                "max_ms": round(entry["max_ms"], 2),
+                "last_ms": round(entry["last_ms"], 2)
+            }
+            for name, entry in sorted(_render_stats.items())
+        }
@@ -0,0 +1,35 @@
+def normalize_turkish_text(text: str) -> str:
+    """
+    Türkçe karakterleri normalize eder ve lowercase'e çevirir.
+    Büyük/küçük harf duyarsız ve Türkçe karakter desteği için kullanılır.
+    Veritabanındaki *_norm kolonları da bu fonksiyonla doldurulur.
+    """
+    if not text:
+        return ""
+    # Büyük harfli Türkçe karakterleri lowercase'den ÖNCE normalize et
+    # ("İ".lower() Python'da "i" + birleşik nokta (U+0307) üretir)
+    text = text.replace('İ', 'i')
+    text = text.replace('Ş', 's')
+    text = text.replace('Ğ', 'g')
+    text = text.replace('Ü', 'u')
+    text = text.replace('Ö', 'o')
+    text = text.replace('Ç', 'c')
+    # Sonra lowercase'e çevir
+    text = text.lower()
+    # Küçük harfli Türkçe karakterleri normalize et
+    text = text.replace('ı', 'i')
+    text = text.replace('ş', 's')
+    text = text.replace('ğ', 'g')
+    text = text.replace('ü', 'u')
+    text = text.replace('ö', 'o')
+    text = text.replace('ç', 'c')
+    return text
+
+
+def normalize_name(text: str) -> str:
+    """
+    normalize_turkish_text + boşluk sadeleştirme ("  Ali   Veli " -> "ali veli").
+    İsim aramaları ve isim *_norm kolonları (ad_soyad_norm, musteri_adi_norm) bunu kullanır;
+    arama ile saklanan değer aynı normalizasyondan geçmeli.
+    """
+    return " ".join(normalize_turkish_text(text).split())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent read/write throughput on SQLite, default settings vs. the tuned
+fallback mode (app.models.sqlite_mode: WAL + pragmas + BEGIN IMMEDIATE with retry).
+
+Geçici bir SQLite veritabanı kullanılır; uygulama veritabanına dokunulmaz.
+Yazıcı thread'ler uygulamadaki gibi önce okuyup sonra yazar (raf okunur, lastik eklenir,
+raf sayacı session event'i ile güncellenir); okuyucu thread'ler /lastik-ara listesini sorgular.
+Kullanım: python benchmark_sqlite_concurrency.py [yazıcı] [okuyucu] [süre_sn]
+"""
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+from app.models.models import Brand, Customer, MevsimEnum, DisDurumuEnum, Rack, Tire
+from app.models.sqlite_mode import WRITE_OPTION, configure_sqlite
+from app.models.tire_listing import tire_listing_query
+
+RACKS = 200
+CUSTOMERS = 500
+
+
+def prepare(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Brand.__table__), [{"marka_adi": "Michelin"}])
+        conn.execute(insert(Customer.__table__), [
+            {"ad_soyad": f"Müşteri {i}", "telefon": "0555", "plaka": f"34 AB {i}"} for i in range(1, CUSTOMERS + 1)
+        ])
+        conn.execute(insert(Rack.__table__), [
+            {"kod": f"R-{i}", "durum": "BOS", "sort_prefix": "R", "sort_number": i, "active_tire_count": 0}
+            for i in range(1, RACKS + 1)
+        ])
+    engine.dispose()
+
+
+def run(path: str, tuned: bool, writers: int, readers: int, duration: float) -> dict:
+    engine = create_engine(f"sqlite:///{path}")
+    write_engine = engine
+    if tuned:
+        configure_sqlite(engine)
+        write_engine = engine.execution_options(**{WRITE_OPTION: True})
+    ReadSession = sessionmaker(bind=engine)
+    WriteSession = sessionmaker(bind=write_engine)
+
+    seri_no = itertools.count(1_000_000 if tuned else 1)
+    seri_lock = threading.Lock()
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    counts_lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def bump(key):
+        with counts_lock:
+            counts[key] += 1
+
+    def writer(index: int):
+        rack_ids = itertools.cycle(range(1 + index, RACKS + 1, writers))
+        while time.perf_counter() < deadline:
+            with seri_lock:
+                number = next(seri_no)
+            try:
+                with WriteSession() as db:
+                    rack = db.get(Rack, next(rack_ids))
+                    db.add(Tire(
+                        seri_no=number, musteri_id=number % CUSTOMERS + 1, marka_id=1, ebat="205/55 R16",
+                        mevsim=MevsimEnum.YAZ, dis_durumu=DisDurumuEnum.IYI, raf_id=rack.id
+                    ))
+                    db.commit()
+                bump("writes")
+            except OperationalError:
+                bump("locked")
+
+    def reader():
+        while time.perf_counter() < deadline:
+            try:
+                with ReadSession() as db:
+                    tire_listing_query(db).order_by(Tire.giris_tarihi.desc(), Tire.id.desc()).limit(50).all()
+                bump("reads")
+            except OperationalError:
+                bump("locked")
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return {key: value / elapsed if key != "locked" else value for key, value in counts.items()}
+
+
+def main():
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    print(f"Writers: {writers}, readers: {readers}, duration: {duration:.0f} s per mode")
+    print()
+    print(f"{'mode':<10}{'writes/s':>10}{'reads/s':>10}{'locked errors':>15}")
+    for name, tuned in (("default", False), ("tuned", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            prepare(path)
+            result = run(path, tuned, writers, readers, duration)
+        print(f"{name:<10}{result['writes']:>10.1f}{result['reads']:>10.1f}{result['locked']:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark: size / brand filters on tire_items (correlated EXISTS per tire) vs. the old
+filters on the tires table (ILIKE over ebat + tire1..tire6_size, marka_id equality).
+
+Geçici bir SQLite veritabanı kullanılır; uygulama veritabanına dokunulmaz. Veri arayüzün
+yazdığı biçimdedir (ebat = 1. lastiğin ebatı, marka = 1. lastiğin markası). Her filtre için
+/lastik-ara'daki gibi ilk 50 satır ve eşleşen lastik sayısı (COUNT) ayrı ölçülür.
+Kullanım: python benchmark_tire_filters.py [lastik_sayısı]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+from app.models.models import Brand, Customer, MevsimEnum, DisDurumuEnum, Rack, Tire, TireDurumEnum, TireItem
+from app.models.search_index import ensure_search_indexes, tire_size_filter
+from app.models.tire_items import SLOT_FIELDS, has_item, item_values
+from app.models.tire_listing import tire_listing_query
+from app.utils.text_utils import normalize_turkish_text
+
+BRANDS = ["Michelin", "Pirelli", "Goodyear", "Lassa", "Continental", "Petlas", "Bridgestone"]
+SIZES = [
+    "175/65 R14", "185/60 R15", "195/55 R16", "205/55 R16", "205/60 R15", "215/65 R16",
+    "225/45 R17", "225/40 R18", "235/55 R19", "245/45 R18", "255/35 R19", "265/70 R16",
+]
+SIZE_QUERIES = ["205/55 R16", "225/45", "R19", "265"]
+
+
+def populate(engine, tire_count: int):
+    rng = random.Random(42)
+    customer_count = max(1, tire_count // 3)
+    rack_count = max(1, tire_count // 4)
+    started = datetime(2023, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Brand.__table__), [{"marka_adi": name} for name in BRANDS])
+        conn.execute(insert(Customer.__table__), [
+            {"ad_soyad": f"Müşteri {i}", "telefon": f"0555{i:07d}", "plaka": f"34 AB {i}"}
+            for i in range(1, customer_count + 1)
+        ])
+        conn.execute(insert(Rack.__table__), [
+            {"kod": f"R-{i}", "durum": "DOLU", "sort_prefix": "R", "sort_number": i, "active_tire_count": 1}
+            for i in range(1, rack_count + 1)
+        ])
+        brand_ids = {name: i for i, name in enumerate(BRANDS, start=1)}
+        rows = []
+        for i in range(1, tire_count + 1):
+            # Bir set genelde aynı ebat / markadan 2-4 lastik
+            size = rng.choice(SIZES)
+            brand = rng.choice(BRANDS)
+            row = {
+                "seri_no": i,
+                "musteri_id": rng.randint(1, customer_count),
+                "marka_id": brand_ids[brand],
+                "ebat": size,
+                "mevsim": rng.choice(list(MevsimEnum)),
+                "dis_durumu": rng.choice(list(DisDurumuEnum)),
+                "raf_id": rng.randint(1, rack_count),
+                "giris_tarihi": started + timedelta(minutes=i),
+                "durum": TireDurumEnum.DEPODA,
+            }
+            # executemany tüm satırlarda aynı anahtarları ister
+            row.update({key: None for fields in SLOT_FIELDS.values() for key in fields})
+            for slot in range(1, rng.randint(2, 4) + 1):
+                row[f"tire{slot}_size"] = size if slot == 1 or rng.random() < 0.7 else rng.choice(SIZES)
+                row[f"tire{slot}_production_date"] = str(rng.randint(2018, 2024))
+                row[f"tire{slot}_brand"] = brand if slot == 1 or rng.random() < 0.7 else rng.choice(BRANDS)
+                row[f"tire{slot}_mevsim"] = row["mevsim"]
+            rows.append(row)
+        conn.execute(insert(Tire.__table__), rows)
+        # Core INSERT dual-write event'ini tetiklemez; tire_items burada yazılır
+        tire_ids = [tire_id for (tire_id,) in conn.execute(select(Tire.id).order_by(Tire.seri_no))]
+        conn.execute(insert(TireItem.__table__), [
+            {"tire_id": tire_id, "position": position, "size_norm": normalize_turkish_text(item["size"]), **item}
+            for tire_id, row in zip(tire_ids, rows)
+            for position, item in item_values(Tire(**row), brand_ids.get).items()
+        ])
+
+
+def old_size_clause(search: str):
+    pattern = f"%{search}%"
+    return or_(Tire.ebat.ilike(pattern), *[getattr(Tire, f"tire{i}_size").ilike(pattern) for i in range(1, 7)])
+
+
+def new_size_clause(search: str):
+    return has_item(Tire, tire_size_filter(search))
+
+
+def old_brand_clause(brand_id: int):
+    return Tire.marka_id == brand_id
+
+
+def new_brand_clause(brand_id: int):
+    return has_item(Tire, TireItem.brand_id == brand_id)
+
+
+def count(db, clause):
+    return db.query(func.count(Tire.id)).filter(clause).scalar()
+
+
+def first_page(db, clause):
+    """/lastik-ara first page: ORDER BY giris_tarihi DESC LIMIT 50"""
+    return tire_listing_query(db).filter(clause).order_by(Tire.giris_tarihi.desc(), Tire.id.desc()).limit(50).all()
+
+
+def matching_ids(db, clause) -> set:
+    return {tire_id for (tire_id,) in db.query(Tire.id).filter(clause)}
+
+
+def timed(fn, repeat: int = 5):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def main():
+    tire_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, tire_count)
+        ensure_search_indexes(engine)
+        with sessionmaker(bind=engine)() as db:
+            items = db.query(func.count(TireItem.id)).scalar()
+            print(f"Tires: {tire_count}, tire_items: {items}")
+            print()
+            print(f"{'filter':<20}{'old n':>7}{'new n':>7}{'page old/new ms':>18}{'count old/new ms':>19}")
+
+            cases = [(f"size {query}", old_size_clause, new_size_clause, query) for query in SIZE_QUERIES]
+            cases += [(f"brand {name}", old_brand_clause, new_brand_clause, brand_id)
+                      for brand_id, name in enumerate(BRANDS[:3], start=1)]
+            for label, old_fn, new_fn, value in cases:
+                page_old, _ = timed(lambda: first_page(db, old_fn(value)))
+                page_new, _ = timed(lambda: first_page(db, new_fn(value)))
+                count_old, _ = timed(lambda: count(db, old_fn(value)))
+                count_new, _ = timed(lambda: count(db, new_fn(value)))
+                old_ids = matching_ids(db, old_fn(value))
+                new_ids = matching_ids(db, new_fn(value))
+                if label.startswith("size"):
+                    # ebat = 1. lastiğin ebatı olduğundan sonuçlar birebir aynı olmalı
+                    assert old_ids == new_ids, f"result mismatch for {label!r}"
+                else:
+                    # Yeni filtre diğer lastiklerin markasını da bulur (eskisinin üst kümesi)
+                    assert old_ids <= new_ids, f"missing results for {label!r}"
+                print(f"{label:<20}{len(old_ids):>7}{len(new_ids):>7}"
+                      f"{page_old:>11.1f} / {page_new:<5.1f}{count_old:>12.1f} / {count_new:<5.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: column-projection tire listing (app.models.tire_listing) vs. the ORM path
+(full Tire objects + joinedload(brand, customer, rack) + format_tire_response).
+Her iki yol da lastik bilgilerini (tire_items) sayfa için tek sorguda okur.
+
+Geçici bir SQLite veritabanına sentetik veri yazılır; uygulama veritabanına dokunulmaz.
+Her yol için satır/saniye ve tracemalloc ile ölçülen tepe bellek raporlanır.
+Kullanım: python benchmark_tire_listing.py [lastik_sayısı] [sayfa_boyutu]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.models.database import Base
+from app.models.models import Brand, Customer, MevsimEnum, DisDurumuEnum, Rack, Tire, TireDurumEnum, TireItem
+from app.models.tire_items import item_values
+from app.models.tire_listing import api_item, load_tire_items, tire_listing_query
+from app.utils.text_utils import normalize_turkish_text
+from app.routes.tire_routes import format_tire_response
+
+BRANDS = ["Michelin", "Pirelli", "Goodyear", "Lassa", "Continental", "Petlas", "Bridgestone"]
+SIZES = ["195/55 R16", "205/55 R16", "205/60 R15", "215/65 R16", "225/45 R17"]
+
+
+def populate(engine, tire_count: int):
+    rng = random.Random(42)
+    customer_count = max(1, tire_count // 3)
+    rack_count = max(1, tire_count // 4)
+    started = datetime(2023, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Brand.__table__), [{"marka_adi": name} for name in BRANDS])
+        conn.execute(insert(Customer.__table__), [
+            {"ad_soyad": f"Müşteri {i}", "telefon": f"0555{i:07d}", "plaka": f"34 AB {i}"}
+            for i in range(1, customer_count + 1)
+        ])
+        conn.execute(insert(Rack.__table__), [
+            {"kod": f"R-{i}", "durum": "DOLU", "sort_prefix": "R", "sort_number": i, "active_tire_count": 1}
+            for i in range(1, rack_count + 1)
+        ])
+        rows = []
+        for i in range(1, tire_count + 1):
+            row = {
+                "seri_no": i,
+                "musteri_id": rng.randint(1, customer_count),
+                "marka_id": rng.randint(1, len(BRANDS)),
+                "ebat": rng.choice(SIZES),
+                "mevsim": rng.choice(list(MevsimEnum)),
+                "dis_durumu": rng.choice(list(DisDurumuEnum)),
+                "not_": "Not\n\nGenel not" if i % 5 == 0 else None,
+                "raf_id": rng.randint(1, rack_count),
+                "giris_tarihi": started + timedelta(minutes=i),
+                "durum": TireDurumEnum.DEPODA,
+            }
+            for slot in range(1, 5):
+                row[f"tire{slot}_size"] = rng.choice(SIZES)
+                row[f"tire{slot}_production_date"] = str(rng.randint(2018, 2024))
+                row[f"tire{slot}_brand"] = rng.choice(BRANDS)
+                row[f"tire{slot}_mevsim"] = rng.choice(list(MevsimEnum))
+            rows.append(row)
+        conn.execute(insert(Tire.__table__), rows)
+        populate_items(conn, rows)
+
+
+def populate_items(conn, rows):
+    """tire_items rows for the Core-inserted tires (the dual-write event only sees ORM flushes)"""
+    brand_ids = {name: i for i, name in enumerate(BRANDS, start=1)}
+    tire_ids = [tire_id for (tire_id,) in conn.execute(select(Tire.id).order_by(Tire.seri_no))]
+    items = [
+        {"tire_id": tire_id, "position": position, "size_norm": normalize_turkish_text(item["size"]), **item}
+        for tire_id, row in zip(tire_ids, rows)
+        for position, item in item_values(Tire(**row), brand_ids.get).items()
+    ]
+    conn.execute(insert(TireItem.__table__), items)
+
+
+def orm_path(db, limit: int):
+    tires = db.query(Tire).options(
+        joinedload(Tire.brand),
+        joinedload(Tire.customer),
+        joinedload(Tire.rack)
+    ).order_by(Tire.giris_tarihi.desc(), Tire.id.desc()).limit(limit).all()
+    items = load_tire_items(db, [tire.id for tire in tires])
+    return [format_tire_response(tire, db, items.get(tire.id, ())) for tire in tires]
+
+
+def projection_path(db, limit: int):
+    rows = tire_listing_query(db).order_by(Tire.giris_tarihi.desc(), Tire.id.desc()).limit(limit).all()
+    items = load_tire_items(db, [row.id for row in rows])
+    return [api_item(row, items.get(row.id, ())) for row in rows]
+
+
+def measure(session_factory, fn, limit: int, repeat: int):
+    # Her tekrar yeni session: identity map'ten okuma ölçümü bozmasın
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        with session_factory() as db:
+            started = time.perf_counter()
+            count = len(fn(db, limit))
+            timings.append(time.perf_counter() - started)
+
+    # tracemalloc süreyi şişirdiği için bellek ayrı bir turda ölçülür
+    with session_factory() as db:
+        tracemalloc.start()
+        fn(db, limit)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    best = min(timings)
+    return count, best * 1000, count / best if best else 0.0, peak
+
+
+def main():
+    tire_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, tire_count)
+        session_factory = sessionmaker(bind=engine)
+
+        print(f"Tires: {tire_count}, rows per listing: {page_size}")
+        print()
+        print(f"{'path':<14}{'rows':>7}{'ms':>10}{'rows/s':>12}{'peak MB':>10}")
+        results = {}
+        for name, fn in (("orm", orm_path), ("projection", projection_path)):
+            count, ms, rate, peak = measure(session_factory, fn, page_size, repeat=5)
+            results[name] = (ms, peak)
+            print(f"{name:<14}{count:>7}{ms:>10.1f}{rate:>12.0f}{peak / 1024 / 1024:>10.2f}")
+        print()
+        print(f"Speedup: {results['orm'][0] / results['projection'][0]:.1f}x, "
+              f"peak memory: {results['projection'][1] / results['orm'][1]:.0%} of ORM path")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent throughput of the HTML pages against a running server.
+
+Sunucu ayrıca başlatılır (ör. `uvicorn main:app`); aynı komut sync get_db ve async
+get_async_db sürümlerinde çalıştırılarak karşılaştırılır. Sayfa istekleri
+X-Cache-Bypass ile gönderilir (her istek veritabanına gider). Aynı anda /health
+yoklanır: event loop bir sorgu yüzünden bloklanırsa /health gecikmesi artar.
+Kullanım: python benchmark_web_concurrency.py [base_url] [eşzamanlılık] [istek_sayısı]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+PATHS = [
+    "/lastik-ara?status=Tümü",
+    "/lastik-ara?ebat=205",
+    "/musteriler",
+    "/raflar",
+    "/lastik-etiketleri",
+]
+HEADERS = {"X-Cache-Bypass": "1"}
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_pages(client: httpx.AsyncClient, concurrency: int, total: int):
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            path = PATHS[next_index % len(PATHS)]
+            next_index += 1
+            started = time.perf_counter()
+            response = await client.get(path, headers=HEADERS)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event):
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.02)
+    return latencies
+
+
+async def main():
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8000"
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    total = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        # Isınma: şablon / referans önbelleği / bağlantı havuzu
+        for path in PATHS:
+            await client.get(path, headers=HEADERS)
+
+        stop = asyncio.Event()
+        health_task = asyncio.create_task(probe_health(client, stop))
+        started = time.perf_counter()
+        latencies, errors = await run_pages(client, concurrency, total)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        health = await health_task
+
+    print(f"Server: {base_url}, concurrency: {concurrency}, requests: {total}")
+    print()
+    print(f"Throughput:      {total / elapsed:8.1f} req/s  ({elapsed:.2f} s, {errors} errors)")
+    print(f"Page latency:    p50 {statistics.median(latencies) * 1000:8.1f} ms   "
+          f"p95 {percentile(latencies, 0.95) * 1000:8.1f} ms")
+    print(f"/health latency: p50 {statistics.median(health) * 1000:8.1f} ms   "
+          f"p95 {percentile(health, 0.95) * 1000:8.1f} ms   max {max(health) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
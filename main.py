@@ -3,9 +3,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 from starlette.middleware.sessions import SessionMiddleware
+from sqlalchemy import inspect
 
-from app.models.database import engine, Base
+from app.models.database import (
+    engine, async_engine, read_engine, async_read_engine, Base, SessionLocal, DB_STATEMENT_TIMEOUT_MS
+)
+from app.models.pool import pool_stats
+from app.models.read_replica import mark_write, replica_router
 from app.models import models  # tabloların register olması için
+from app.models.search_index import ensure_search_indexes
+from app.models.seri_no import ensure_seri_no_sequence
+from app.models.data_version import data_versions, ensure_data_versions
+from app.models.tire_items import has_tires_missing_items
+from app.utils.customer_index import customer_index
+from app.utils.templating import TEMPLATE_MODE, warm_up_templates, template_render_stats
 
 from app.routes import (
     customer_routes,
@@ -25,6 +36,21 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# -------------------------------------------------
+# READ-YOUR-WRITES (OKUMA REPLİKASI VARSA)
+# ⚠️ SESSION MIDDLEWARE'DEN ÖNCE EKLENMELİ: onun içinde çalışır, cookie'ye yazabilir
+# -------------------------------------------------
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+if read_engine is not None:
+    @app.middleware("http")
+    async def mark_session_writes(request: Request, call_next):
+        response = await call_next(request)
+        # Başarılı yazmadan sonra bu oturumun okumaları bir süre birincilden yapılır
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            mark_write(request.session)
+        return response
+
 # -------------------------------------------------
 # SESSION MIDDLEWARE (LOGIN İÇİN)
 # ⚠️ ROOT ROUTE'TAN ÖNCE OLMALI
@@ -57,6 +83,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],  # keyset pagination
 )
 
 # -------------------------------------------------
@@ -85,11 +112,48 @@ async def startup_event():
         Base.metadata.create_all(bind=engine)
         print("✅ Database connection successful!")
         print("✅ All tables created successfully!")
+        ensure_seri_no_sequence(engine)
+        ensure_data_versions(engine)
+        with SessionLocal() as db:
+            data_versions.refresh(db)
+        try:
+            ensure_search_indexes(engine)
+            print("✅ Search indexes ready!")
+        except Exception as e:
+            # Eski şemada *_norm kolonları yoksa migrate_add_search_columns.py çalıştırılmalı
+            print(f"⚠️ Search indexes could not be created: {e}")
+        customer_columns = {column["name"] for column in inspect(engine).get_columns("customers")}
+        if not {"plaka_norm", "telefon_norm"} <= customer_columns:
+            print("⚠️ customers.plaka_norm / telefon_norm missing: run migrate_add_search_columns.py")
+        with engine.connect() as conn:
+            if has_tires_missing_items(conn):
+                # Listeler / arama tire_items'tan okur; eski kayıtlar doldurulmadan eksik görünür
+                print("⚠️ Some tires have no tire_items rows yet: run migrate_add_tire_items.py")
+        try:
+            with SessionLocal() as db:
+                stats = customer_index.rebuild(db)
+            print(f"✅ Customer search index built ({stats['customers']} customers, {stats['build_ms']} ms)")
+        except Exception as e:
+            # Aramalar indeks olmadan SQL filtresine düşer
+            print(f"⚠️ Customer search index could not be built: {e}")
+        warmup = warm_up_templates(web_routes.templates)
+        print(f"✅ Templates compiled ({warmup['templates']} templates, {warmup['compile_ms']} ms, "
+              f"TEMPLATE_MODE={TEMPLATE_MODE})")
+        if TEMPLATE_MODE != "production":
+            print("⚠️ Templates are re-checked on every request: set TEMPLATE_MODE=production when deploying")
         print("✅ LastikDepoSistemi is ready!")
     except Exception as e:
         print(f"❌ Error connecting to database: {e}")
         raise
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Web sayfalarının async bağlantı havuzlarını kapat
+    await async_engine.dispose()
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
+
 # -------------------------------------------------
 # API & HEALTH
 # -------------------------------------------------
@@ -104,3 +168,28 @@ async def api_root():
 @app.get("/health", include_in_schema=False)
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/api/metrics/templates", include_in_schema=False)
+async def template_metrics():
+    return template_render_stats()
+
+@app.get("/api/metrics/lastik-ara-cache", include_in_schema=False)
+async def lastik_ara_cache_metrics():
+    return web_routes.lastik_ara_cache.stats()
+
+@app.get("/api/metrics/pool", include_in_schema=False)
+async def pool_metrics():
+    # "sync": JSON API (get_db), "async": web sayfaları (get_async_db); *_read: replika havuzları
+    stats = {
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine),
+        "statement_timeout_ms": DB_STATEMENT_TIMEOUT_MS,
+    }
+    if read_engine is not None:
+        stats["sync_read"] = pool_stats(read_engine)
+        stats["async_read"] = pool_stats(async_read_engine.sync_engine)
+    return stats
+
+@app.get("/api/metrics/read-replica", include_in_schema=False)
+async def read_replica_metrics():
+    return {"enabled": read_engine is not None, **replica_router.stats()}
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Migration script to add racks.active_tire_count (materialized count of DEPODA tires
+per rack) and fill it, together with racks.durum, from the tires table.
+
+Uses the application's DATABASE_URL (app.models.database), so it works for both backends.
+"""
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+
+# Load environment variables (before importing the engine)
+load_dotenv()
+
+from app.models.database import engine, SessionLocal
+from app.models.rack_counter import reconcile_rack_counters
+
+
+def migrate():
+    """Add the active_tire_count column and reconcile all racks"""
+    try:
+        with engine.begin() as conn:
+            columns = [c["name"] for c in inspect(conn).get_columns("racks")]
+            if "active_tire_count" in columns:
+                print("✅ 'racks.active_tire_count' column already exists")
+            else:
+                conn.execute(text("ALTER TABLE racks ADD COLUMN active_tire_count INTEGER NOT NULL DEFAULT 0"))
+                print("✅ Added 'racks.active_tire_count' column")
+
+        db = SessionLocal()
+        try:
+            drifted = reconcile_rack_counters(db)
+        finally:
+            db.close()
+        print(f"✅ Reconciled rack counters ({len(drifted)} racks updated)")
+        print("\nMigration completed successfully!")
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate()
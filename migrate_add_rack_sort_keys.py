@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Migration script to add racks.sort_prefix / racks.sort_number (precomputed natural
+sort keys for the /raflar board) and fill them from the rack codes.
+
+Uses the application's DATABASE_URL (app.models.database), so it works for both backends.
+"""
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+
+# Load environment variables (before importing the engine)
+load_dotenv()
+
+from app.models.database import engine
+from app.utils.rack_codes import rack_sort_keys
+
+SORT_COLUMNS = [
+    ("sort_prefix", "VARCHAR"),
+    ("sort_number", "INTEGER"),
+]
+
+
+def migrate():
+    """Add rack sort key columns, backfill them and create their index"""
+    try:
+        with engine.begin() as conn:
+            columns = [c["name"] for c in inspect(conn).get_columns("racks")]
+            for column_name, column_type in SORT_COLUMNS:
+                if column_name in columns:
+                    print(f"✅ 'racks.{column_name}' column already exists")
+                    continue
+                conn.execute(text(f"ALTER TABLE racks ADD COLUMN {column_name} {column_type}"))
+                print(f"✅ Added 'racks.{column_name}' column")
+
+            # Raf sayısı küçük (yüzlerce); tek işlemde doldurulur
+            rows = conn.execute(text("SELECT id, kod FROM racks")).fetchall()
+            updates = []
+            for rack_id, kod in rows:
+                prefix, number = rack_sort_keys(kod)
+                updates.append({"id": rack_id, "prefix": prefix, "number": number})
+            if updates:
+                conn.execute(
+                    text("UPDATE racks SET sort_prefix = :prefix, sort_number = :number WHERE id = :id"),
+                    updates
+                )
+            print(f"✅ Backfilled sort keys for {len(updates)} racks")
+
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_racks_sort_prefix_number ON racks (sort_prefix, sort_number)"
+            ))
+        print("\nMigration completed successfully!")
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate()
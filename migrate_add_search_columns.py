@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Migration script to add normalized search columns (customers.ad_soyad_norm,
+customers.plaka_norm, customers.telefon_norm, tire_history.musteri_adi_norm) and their
+substring indexes (pg_trgm on PostgreSQL, FTS5 trigram on SQLite fallback for the name
+columns). Safe to re-run: existing columns are kept and values are recomputed (re-run it
+after normalizer changes, e.g. name columns now collapse whitespace).
+
+Uses the application's DATABASE_URL (app.models.database), so it works for both backends.
+"""
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+
+# Load environment variables (before importing the engine)
+load_dotenv()
+
+from app.models.database import engine
+from app.models.search_index import ensure_search_indexes
+from app.utils.customer_index import normalize_phone, normalize_plate
+from app.utils.text_utils import normalize_name
+
+BATCH_SIZE = 1000
+
+# (table, source column, normalized column, normalizer)
+SEARCH_COLUMNS = [
+    ("customers", "ad_soyad", "ad_soyad_norm", normalize_name),
+    ("customers", "plaka", "plaka_norm", normalize_plate),
+    ("customers", "telefon", "telefon_norm", normalize_phone),
+    ("tire_history", "musteri_adi", "musteri_adi_norm", normalize_name),
+]
+
+
+def add_column(conn, table_name: str, column_name: str):
+    """Add the normalized column and its b-tree index if missing"""
+    columns = [c["name"] for c in inspect(conn).get_columns(table_name)]
+    if column_name in columns:
+        print(f"✅ '{table_name}.{column_name}' column already exists")
+        return
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} VARCHAR"))
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{column_name} ON {table_name} ({column_name})"
+    ))
+    print(f"✅ Added '{table_name}.{column_name}' column")
+
+
+def backfill(table_name: str, source_column: str, column_name: str, normalize):
+    """Fill the normalized column in id-ordered batches (one short transaction per batch)"""
+    last_id = 0
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(f"""
+                SELECT id, {source_column} FROM {table_name}
+                WHERE id > :last_id
+                ORDER BY id
+                LIMIT :batch_size
+            """), {"last_id": last_id, "batch_size": BATCH_SIZE}).fetchall()
+            if not rows:
+                break
+            conn.execute(
+                text(f"UPDATE {table_name} SET {column_name} = :norm WHERE id = :id"),
+                [{"id": row[0], "norm": normalize(row[1] or "")} for row in rows]
+            )
+        last_id = rows[-1][0]
+        total += len(rows)
+        print(f"  {table_name}: {total} rows normalized...")
+    print(f"✅ Backfilled {total} rows in '{table_name}'")
+
+
+def migrate():
+    """Add normalized search columns, backfill them and create substring indexes"""
+    try:
+        with engine.begin() as conn:
+            for table_name, _, column_name, _ in SEARCH_COLUMNS:
+                add_column(conn, table_name, column_name)
+
+        for table_name, source_column, column_name, normalize in SEARCH_COLUMNS:
+            backfill(table_name, source_column, column_name, normalize)
+
+        ensure_search_indexes(engine)
+        print("\nMigration completed successfully!")
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the tire_items table (one row per stored tire, from the
+tire1..tire6_* slot columns) and backfill it from the existing tires.
+
+- tire_items tablosu, indeksleri ve (PostgreSQL'de) ebat arama indeksi (pg_trgm) oluşturulur
+- tire_items satırı olmayan lastikler id sırasıyla, her parti kısa bir transaction'da doldurulur
+  (uygulama çalışırken de güvenle tekrar çalıştırılabilir; dolu lastikler atlanır)
+- slotlarda geçen ama brands tablosunda olmayan marka adları brands'e eklenir
+
+Yeni / güncellenen lastikler uygulama tarafından iki yere birden yazılır
+(app/models/tire_items.py), bu script yalnızca mevcut kayıtlar içindir.
+
+Uses the application's DATABASE_URL (app.models.database), so it works for both backends.
+"""
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import insert, select
+
+# Load environment variables (before importing the engine)
+load_dotenv()
+
+from app.models.database import engine
+from app.models.models import Brand, Tire, TireItem
+from app.models.search_index import ensure_search_indexes
+from app.models.tire_items import SLOT_FIELDS, item_values, tires_missing_items
+from app.utils.text_utils import normalize_turkish_text
+
+BATCH_SIZE = 1000
+
+SOURCE_COLUMNS = [Tire.id, Tire.ebat, Tire.marka_id, Tire.mevsim] + [
+    getattr(Tire, key) for fields in SLOT_FIELDS.values() for key in fields
+]
+
+
+def ensure_slot_brands(conn) -> dict:
+    """Brand name -> id, adding slot brand names that are missing from brands"""
+    brand_ids = {row.marka_adi: row.id for row in conn.execute(select(Brand.id, Brand.marka_adi))}
+    slot_names = set()
+    for _, _, brand_key, _ in SLOT_FIELDS.values():
+        column = getattr(Tire, brand_key)
+        slot_names.update(
+            name.strip() for (name,) in conn.execute(select(column).where(column.isnot(None)).distinct())
+            if name and name.strip()
+        )
+    missing = sorted(slot_names - set(brand_ids))
+    for name in missing:
+        print(f"  + brand {name!r}")
+    if missing:
+        conn.execute(insert(Brand.__table__), [{"marka_adi": name} for name in missing])
+        brand_ids = {row.marka_adi: row.id for row in conn.execute(select(Brand.id, Brand.marka_adi))}
+    print(f"✅ Added {len(missing)} missing slot brand(s)")
+    return brand_ids
+
+
+def backfill(brand_ids: dict):
+    """Insert tire_items for tires that have none, in id-ordered batches"""
+    last_id = 0
+    tires = 0
+    items = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(*SOURCE_COLUMNS)
+                .where(Tire.id > last_id, tires_missing_items())
+                .order_by(Tire.id)
+                .limit(BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                break
+            values = [
+                {"tire_id": row.id, "position": position, "size_norm": normalize_turkish_text(item["size"]), **item}
+                for row in rows
+                for position, item in item_values(row, brand_ids.get).items()
+            ]
+            if values:
+                conn.execute(insert(TireItem.__table__), values)
+        last_id = rows[-1].id
+        tires += len(rows)
+        items += len(values)
+        print(f"  tire_items: {tires} tires, {items} rows...")
+    print(f"✅ Backfilled {items} tire_items rows for {tires} tires")
+
+
+def migrate():
+    """Create tire_items, add missing slot brands and backfill from the slot columns"""
+    try:
+        TireItem.__table__.create(bind=engine, checkfirst=True)
+        print("✅ tire_items table ready")
+
+        with engine.begin() as conn:
+            brand_ids = ensure_slot_brands(conn)
+
+        backfill(brand_ids)
+
+        # PostgreSQL: tire_items.size_norm pg_trgm indeksi
+        ensure_search_indexes(engine)
+        print("✅ Tire size search index ready")
+        print("\nMigration completed successfully!")
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate()
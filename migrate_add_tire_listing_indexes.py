@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the indexes used by keyset pagination
+and rack lookups (/lastik-ara, /musteriler, /raflar, /api/tires, /api/tire-history):
+- ix_tires_giris_tarihi_id (giris_tarihi, id)
+- ix_tires_musteri_id_giris_tarihi (musteri_id, giris_tarihi, id)
+- ix_tire_history_islem_tarihi_id (islem_tarihi, id)
+- ix_customers_ad_soyad_id (ad_soyad, id)
+- ix_tires_raf_id (raf_id)
+
+Uses the application's DATABASE_URL (app.models.database), so it works for both backends.
+"""
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+# Load environment variables (before importing the engine)
+load_dotenv()
+
+from app.models.database import engine
+
+# (index name, table, columns)
+TIRE_LISTING_INDEXES = [
+    ("ix_tires_giris_tarihi_id", "tires", "giris_tarihi, id"),
+    ("ix_tires_musteri_id_giris_tarihi", "tires", "musteri_id, giris_tarihi, id"),
+    ("ix_tire_history_islem_tarihi_id", "tire_history", "islem_tarihi, id"),
+    ("ix_customers_ad_soyad_id", "customers", "ad_soyad, id"),
+    ("ix_tires_raf_id", "tires", "raf_id"),
+]
+
+
+def migrate():
+    """Create the listing indexes if they do not exist"""
+    try:
+        with engine.begin() as conn:
+            for index_name, table_name, columns in TIRE_LISTING_INDEXES:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})"))
+                print(f"✅ Index '{index_name}' is ready")
+        print("\nMigration completed successfully!")
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate()
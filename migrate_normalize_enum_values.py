@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+One-time normalization of stored enum values + CHECK constraints on the enum columns.
+
+Enum kolonlarında yalnızca üye adları (ör. "DEPODA", "YAZ", "DORT_MEVSIM") saklanır.
+Eski kayıtlardaki farklı yazımlar ("Depoda", "Kış", "MevsimEnum.YAZ", "cikti" ...)
+EnumCodec.decode_strict ile üye adına çevrilir; boş metin NULL olur (kolon izin veriyorsa).
+Tanınmayan bir değer varsa hiçbir şey değiştirilmez ve değerler listelenir.
+
+Ardından modeldeki ck_<tablo>_<kolon> kısıtları eklenir:
+- PostgreSQL: ALTER TABLE ... ADD CONSTRAINT ... CHECK
+- SQLite: mevcut tabloya CHECK eklenemediği için aynı koşulu uygulayan
+  BEFORE INSERT / BEFORE UPDATE trigger'ları (create_all ile yeni oluşturulan
+  tablolarda CHECK zaten vardır, o tablolar atlanır)
+
+Uses the application's DATABASE_URL (app.models.database), so it works for both backends.
+Kullanım: python migrate_normalize_enum_values.py [--dry-run]
+"""
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import CheckConstraint, Enum, text
+
+# Load environment variables (before importing the engine)
+load_dotenv()
+
+from app.models.database import engine
+from app.models.models import Rack, Tire, TireHistory, TireItem
+from app.utils.enum_codec import DIS_DURUMU, ISLEM_TURU, MEVSIM, RACK_DURUM, TIRE_DURUM
+
+CODECS = {codec.model_enum: codec for codec in (TIRE_DURUM, MEVSIM, DIS_DURUMU, RACK_DURUM, ISLEM_TURU)}
+TABLES = [Rack.__table__, Tire.__table__, TireItem.__table__, TireHistory.__table__]
+
+
+def enum_columns(table):
+    return [column for column in table.columns if isinstance(column.type, Enum)]
+
+
+def enum_checks(table):
+    return [
+        constraint for constraint in table.constraints
+        if isinstance(constraint, CheckConstraint) and (constraint.name or "").startswith("ck_")
+    ]
+
+
+def plan_updates(conn):
+    """(table, column, raw, canonical_name_or_None, row_count) for every non-canonical value"""
+    updates = []
+    unknown = []
+    for table in TABLES:
+        for column in enum_columns(table):
+            codec = CODECS[column.type.enum_class]
+            rows = conn.execute(text(
+                f'SELECT "{column.name}", COUNT(*) FROM {table.name} '
+                f'WHERE "{column.name}" IS NOT NULL GROUP BY "{column.name}"'
+            )).fetchall()
+            for raw, count in rows:
+                raw = str(raw)
+                if raw in codec.model_enum.__members__:
+                    continue
+                if not raw.strip():
+                    if column.nullable:
+                        updates.append((table.name, column.name, raw, None, count))
+                    else:
+                        unknown.append((table.name, column.name, raw, count))
+                    continue
+                try:
+                    updates.append((table.name, column.name, raw, codec.decode_strict(raw).name, count))
+                except ValueError:
+                    unknown.append((table.name, column.name, raw, count))
+    return updates, unknown
+
+
+def add_postgres_checks(conn):
+    for table in TABLES:
+        for constraint in enum_checks(table):
+            exists = conn.execute(
+                text("SELECT 1 FROM pg_constraint WHERE conname = :name"),
+                {"name": constraint.name}
+            ).first()
+            if exists:
+                print(f"✅ {constraint.name} already exists")
+                continue
+            conn.execute(text(
+                f"ALTER TABLE {table.name} ADD CONSTRAINT {constraint.name} CHECK ({constraint.sqltext})"
+            ))
+            print(f"✅ Added {constraint.name}")
+
+
+def add_sqlite_checks(conn):
+    for table in TABLES:
+        table_sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": table.name}
+        ).scalar() or ""
+        for constraint in enum_checks(table):
+            if constraint.name in table_sql:
+                print(f"✅ {constraint.name} is part of the table definition")
+                continue
+            trigger_exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+                {"name": f"{constraint.name}_insert"}
+            ).first()
+            if trigger_exists:
+                print(f"✅ {constraint.name} triggers already exist")
+                continue
+            # enum_check koşulu "<kolon> IN (...)" biçiminde
+            condition = str(constraint.sqltext)
+            column_name = condition.split(" ", 1)[0]
+            message = f"CHECK constraint failed: {constraint.name}"
+            for event_name, timing in (("insert", "BEFORE INSERT"), ("update", f"BEFORE UPDATE OF {column_name}")):
+                conn.execute(text(
+                    f"CREATE TRIGGER {constraint.name}_{event_name} {timing} ON {table.name} "
+                    f"WHEN NEW.{column_name} IS NOT NULL AND NOT (NEW.{condition}) "
+                    f"BEGIN SELECT RAISE(ABORT, '{message}'); END"
+                ))
+            print(f"✅ Added {constraint.name} triggers")
+
+
+def migrate(dry_run: bool = False):
+    """Normalize enum values in racks / tires / tire_history and add the CHECK constraints"""
+    try:
+        with engine.begin() as conn:
+            updates, unknown = plan_updates(conn)
+            for table_name, column_name, raw, name, count in updates:
+                print(f"{table_name}.{column_name}: {raw!r} -> {name!r} ({count} rows)")
+            if unknown:
+                print("\n❌ Unrecognized enum values (nothing was changed):")
+                for table_name, column_name, raw, count in unknown:
+                    print(f"   {table_name}.{column_name}: {raw!r} ({count} rows)")
+                sys.exit(1)
+            if dry_run:
+                print(f"\nDry run: {len(updates)} value(s) would be normalized")
+                return
+
+            for table_name, column_name, raw, name, _ in updates:
+                conn.execute(
+                    text(f'UPDATE {table_name} SET "{column_name}" = :name WHERE "{column_name}" = :raw'),
+                    {"name": name, "raw": raw}
+                )
+            print(f"✅ Normalized {len(updates)} distinct value(s)")
+
+            if conn.dialect.name == "postgresql":
+                add_postgres_checks(conn)
+            elif conn.dialect.name == "sqlite":
+                add_sqlite_checks(conn)
+            else:
+                print(f"⚠️ CHECK constraints not added for dialect {conn.dialect.name}")
+        print("\nMigration completed successfully!")
+    except SystemExit:
+        raise
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate(dry_run="--dry-run" in sys.argv)
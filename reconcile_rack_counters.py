@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Repair drift in racks.active_tire_count / racks.durum by recounting DEPODA tires.
+
+Kullanım: python reconcile_rack_counters.py
+(Aynı işlem çalışan uygulamada POST /api/racks/reconcile-counters ile de yapılabilir.)
+"""
+from dotenv import load_dotenv
+
+# Load environment variables (before importing the engine)
+load_dotenv()
+
+from app.models.database import SessionLocal
+from app.models.rack_counter import reconcile_rack_counters
+
+
+def main():
+    db = SessionLocal()
+    try:
+        drifted = reconcile_rack_counters(db)
+    finally:
+        db.close()
+    if not drifted:
+        print("✅ All rack counters are consistent")
+        return
+    for rack in drifted:
+        print(f"  {rack['kod']}: {rack['old_count']} -> {rack['new_count']}")
+    print(f"✅ Fixed {len(drifted)} racks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Test ayarları: uygulama geçici bir SQLite veritabanıyla import edilir.
+
+Testler depo kökünden çalıştırılır (python -m pytest); main.py statik dosyaları
+göreli "app/static" yolundan bağlar.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# app.models.database import edilmeden önce ayarlanmalı
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
@@ -0,0 +1,105 @@
+"""
+Customer autocomplete tests for the in-memory index and its SQL fallback.
+
+İndeks kullanılamadığında SQL adayları limitle kesilir; tam eşleşme yüzlerce alt-dize
+eşleşmesinin arkasında kalmamalı (yeni_lastik.html tam eşleşme yoksa yeni müşteri açar).
+Harf içeren plaka araması telefon numaralarıyla eşleşmemeli. İndeks ve SQL isim araması
+aynı normalizasyonu (boşluk sadeleştirme dahil) kullanmalı; başka bir worker'ın müşteri
+yazması indeksi eskitmeli, bu worker'ın kendi yazmaları eskitmemeli.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import main
+from app.models.data_version import DATA_VERSION_TABLE, data_versions
+from app.models.database import SessionLocal, engine
+from app.models.models import Customer
+from app.utils.customer_index import SQL_FALLBACK_CANDIDATES, customer_index, normalize_doc
+
+# Limiti aşan sayıda önek / alt-dize eşleşmesi
+SIMILAR_COUNT = SQL_FALLBACK_CANDIDATES + 50
+
+
+def _customer(ad_soyad: str, plaka: str, telefon: str) -> dict:
+    ad_soyad_norm, plaka_norm, telefon_norm = normalize_doc(ad_soyad, plaka, telefon)
+    return {
+        "ad_soyad": ad_soyad, "ad_soyad_norm": ad_soyad_norm,
+        "plaka": plaka, "plaka_norm": plaka_norm, "telefon": telefon, "telefon_norm": telefon_norm,
+    }
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        rows = [_customer(f"Benzer Müşteri {i}", f"34 ABC 12{i}", f"0532341200{i:03d}") for i in range(SIMILAR_COUNT)]
+        rows.append(_customer("Tam Eşleşme", "34 ABC 12", "05550000000"))
+        with SessionLocal() as db:
+            db.execute(Customer.__table__.insert(), rows)
+            db.commit()
+        yield client
+
+
+@pytest.fixture(params=["index", "sql"])
+def search_mode(request, client):
+    response = client.post("/api/customers/search-index/rebuild")
+    assert response.status_code == 200, response.text
+    if request.param == "sql":
+        customer_index._clear("test: SQL fallback")
+    yield request.param
+    client.post("/api/customers/search-index/rebuild")
+
+
+def _names(client, query: str):
+    response = client.get("/api/customers/search", params={"q": query})
+    assert response.status_code == 200, response.text
+    return [customer["ad_soyad"] for customer in response.json()]
+
+
+@pytest.mark.parametrize("query", ["34 ABC 12", "34-abc-12", "34abc12"])
+def test_exact_plate_ranks_first(client, search_mode, query):
+    assert _names(client, query)[0] == "Tam Eşleşme"
+
+
+def test_exact_name_ranks_first(client, search_mode):
+    assert _names(client, "tam eşleşme")[0] == "Tam Eşleşme"
+
+
+def test_plate_query_does_not_match_phone_digits(client, search_mode):
+    # "34ab12" hiçbir plakada yok; rakamları ("3412") Benzer Müşteri telefonlarında geçer
+    assert _names(client, "34 AB 12") == []
+    assert len(_names(client, "3412")) > 0
+
+
+def test_name_search_collapses_whitespace(client, search_mode):
+    response = client.post("/api/customers/", json={
+        "ad_soyad": "  Boşluklu   İsim ", "telefon": "05550000001", "plaka": "06 BS 1"
+    })
+    assert response.status_code == 201, response.text
+    assert "  Boşluklu   İsim " in _names(client, "boşluklu  isim")
+    client.delete(f"/api/customers/{response.json()['id']}")
+
+
+def test_own_write_keeps_index_fresh(client, monkeypatch):
+    monkeypatch.setattr(data_versions, "poll_seconds", 0.0)
+    client.post("/api/customers/search-index/rebuild")
+    response = client.post("/api/customers/", json={"ad_soyad": "Yerel Yazma", "telefon": "05550000002", "plaka": "06 YY 1"})
+    assert response.status_code == 201, response.text
+
+    assert _names(client, "yerel yazma") == ["Yerel Yazma"]
+    assert customer_index.is_fresh()
+
+
+def test_write_from_another_worker_marks_index_stale(client, monkeypatch):
+    monkeypatch.setattr(data_versions, "poll_seconds", 0.0)
+    client.post("/api/customers/search-index/rebuild")
+    # Diğer worker: aynı veritabanında commit (bu process'in indeks kancaları çalışmaz)
+    with engine.begin() as conn:
+        conn.execute(Customer.__table__.insert(), [_customer("Başka Worker", "06 BW 1", "05550000003")])
+        conn.execute(text(f"""
+            INSERT INTO {DATA_VERSION_TABLE} (table_name, version) VALUES ('customers', 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = {DATA_VERSION_TABLE}.version + 1
+        """))
+
+    # Eski indeks kullanılmaz: SQL'e düşülür (veya arka plan kurulumu bitmişse yeni indeks)
+    assert _names(client, "başka worker") == ["Başka Worker"]
@@ -0,0 +1,89 @@
+"""
+Shared data versions: page ETags and the /lastik-ara result cache across workers.
+
+Başka bir worker'ın commit'i yalnızca data_versions tablosundaki sayaçları artırır (bu
+process'in Session event'leri çalışmaz); bu process bir sonraki yoklamada yeni sürümü
+görmeli ve eski ETag'e 304 dönmemeli.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import main
+from app.models.data_version import DATA_VERSION_TABLE, data_versions
+from app.models.database import SessionLocal, engine
+from app.models.models import Customer
+
+# Diğer testlerin müşterileri de tek sayfaya sığsın
+PAGE = "/musteriler?page_size=1000"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def poll_every_request(monkeypatch):
+    monkeypatch.setattr(data_versions, "poll_seconds", 0.0)
+
+
+def _stored_version(table: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f"SELECT version FROM {DATA_VERSION_TABLE} WHERE table_name = :table_name"), {"table_name": table}
+        ).scalar() or 0
+
+
+def _bump_as_other_worker(conn, table: str):
+    conn.execute(text(f"""
+        INSERT INTO {DATA_VERSION_TABLE} (table_name, version) VALUES (:table_name, 1)
+        ON CONFLICT (table_name) DO UPDATE SET version = {DATA_VERSION_TABLE}.version + 1
+    """), {"table_name": table})
+
+
+def test_commit_bumps_shared_and_local_version(client):
+    before = _stored_version("customers")
+    response = client.post("/api/customers/", json={
+        "ad_soyad": "Sürüm Müşteri", "telefon": "05320000001", "plaka": "06 DV 1"
+    })
+    assert response.status_code in (200, 201), response.text
+    assert _stored_version("customers") == before + 1
+    assert data_versions.version("customers") == before + 1
+
+
+def test_rollback_does_not_bump(client):
+    before = _stored_version("customers")
+    with SessionLocal() as db:
+        db.add(Customer(ad_soyad="Geri Alınan", telefon="05320000002", plaka="06 DV 2"))
+        db.flush()
+        db.rollback()
+    assert _stored_version("customers") == before
+
+
+def test_write_from_another_worker_changes_etag(client, poll_every_request):
+    etag = client.get(PAGE).headers["ETag"]
+    assert client.get(PAGE, headers={"If-None-Match": etag}).status_code == 304
+
+    # Diğer worker: aynı veritabanında commit (bu process'in event'leri dışında)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO customers (ad_soyad, telefon, plaka) VALUES ('Diğer Worker', '05320000003', '06 DV 3')"
+        ))
+        _bump_as_other_worker(conn, "customers")
+
+    response = client.get(PAGE, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "Diğer Worker" in response.text
+
+
+def test_write_from_another_worker_invalidates_result_cache(client, poll_every_request):
+    client.get("/lastik-ara")
+    assert client.get("/lastik-ara").headers["X-Cache"] == "HIT"
+
+    with engine.begin() as conn:
+        _bump_as_other_worker(conn, "customers")
+
+    assert client.get("/lastik-ara").headers["X-Cache"] == "MISS"
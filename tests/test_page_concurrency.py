@@ -0,0 +1,83 @@
+"""
+Concurrency test for the run_sync web pages.
+
+Sayfa gövdeleri AsyncSession.run_sync ile event loop thread'inde çalışır; DB IO sırasında
+aynı thread'de başka bir istek devreye girer. IO boyunca tutulan bir threading.Lock
+(ör. referans önbelleği yenilenirken) bu durumda worker'ı kalıcı olarak kilitler.
+Önbellekler eskitilip sayfalar eşzamanlı istenir; tümü zaman aşımından önce bitmeli.
+
+Kilitlenen bir event loop kendi zaman aşımını işletemez ve kapanamaz; senaryo bu yüzden
+ayrı bir process'te çalışır (python tests/test_page_concurrency.py) ve test onu süreyle bekler.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+
+CONCURRENT_REQUESTS = 8
+TIMEOUT_SECONDS = 60
+
+PAGES = [
+    "/lastik-ara",
+    "/lastik-ara?brand=Michelin",
+    "/yeni-lastik",
+    "/musteriler",
+    "/raflar",
+    "/lastik-etiketleri",
+    "/musteri-gecmisi",
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pages_survive_concurrent_cache_reload():
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'concurrency.db')}")
+    try:
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__)], cwd=ROOT, env=env,
+            capture_output=True, text=True, timeout=TIMEOUT_SECONDS
+        )
+    except subprocess.TimeoutExpired:
+        raise AssertionError(f"concurrent page requests did not finish in {TIMEOUT_SECONDS} s (event loop deadlock)")
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-2000:]
+
+
+def _scenario():
+    """Seed data, then for each page: stale reference cache + concurrent GETs on one event loop"""
+    import httpx
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.models.reference_cache import reference_cache
+
+    async def fetch_all(paths):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as http:
+            return await asyncio.gather(*(http.get(path) for path in paths))
+
+    with TestClient(main.app) as client:
+        racks = client.post("/api/racks/bulk", json={"raf_adi": "C", "sayi": 3}).json()
+        customer = client.post(
+            "/api/customers/", json={"ad_soyad": "Eşzamanlı Müşteri", "telefon": "05320000000", "plaka": "06 CC 1"}
+        ).json()
+        response = client.post("/api/tires/", json={
+            "musteri_id": customer["id"], "brand": "Michelin", "mevsim": "Yaz", "dis_durumu": "İyi",
+            "raf_id": racks[0]["id"], "tire1_size": "205/55 R16",
+        })
+        assert response.status_code == 201, response.text
+
+        for path in PAGES:
+            reference_cache.bump()
+            # Sayfa sonuç önbelleklerini atla: her istek gerçekten render edilsin
+            paths = [f"{path}{'&' if '?' in path else '?'}_={i}" for i in range(CONCURRENT_REQUESTS)]
+            # TestClient'ın event loop'unda (uygulamanın engine'leri bu loop'a bağlı)
+            responses = client.portal.call(fetch_all, paths)
+            statuses = [response.status_code for response in responses]
+            assert statuses == [200] * CONCURRENT_REQUESTS, (path, statuses)
+            print(f"{path}: {statuses}")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, ROOT)
+    _scenario()
@@ -0,0 +1,75 @@
+"""
+Query-count regression test for the search pages.
+
+/lastik-ara ve /lastik-etiketleri her filtre kombinasyonunda tek bir sayfa sorgusu ve
+sayfadaki lastiklerin tire_items satırları için tek bir sorgu çalıştırmalı (enum çözümü
+başarısız olunca ikinci / üçüncü sorguya düşen eski yollar kaldırıldı). Satır sayısı
+arttıkça sorgu sayısı artmamalı (N+1 yok).
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main
+from app.models.database import async_engine
+
+# Sayfa sorgusu + tire_items sorgusu
+MAX_SELECTS_PER_PAGE = 2
+
+TIRE_COUNT = 30
+
+PAGES = [
+    "/lastik-ara",
+    "/lastik-ara?ebat=205",
+    "/lastik-ara?ebat=205&brand=Michelin&status=Tümü",
+    "/lastik-ara?customer_name=sukru&dis_durumu=İyi",
+    "/lastik-etiketleri",
+    "/lastik-etiketleri?customer_name=sukru",
+    "/lastik-etiketleri?plate=34",
+]
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        racks = client.post("/api/racks/bulk", json={"raf_adi": "Q", "sayi": TIRE_COUNT}).json()
+        customer = client.post(
+            "/api/customers/", json={"ad_soyad": "Şükrü Çelik", "telefon": "05551234567", "plaka": "34 ABC 12"}
+        ).json()
+        for i in range(TIRE_COUNT):
+            response = client.post("/api/tires/", json={
+                "musteri_id": customer["id"], "brand": "Michelin", "mevsim": "Yaz", "dis_durumu": "İyi",
+                "raf_id": racks[i]["id"],
+                "tire1_size": "205/55 R16", "tire1_production_date": "2023", "tire1_brand": "Michelin",
+                "tire2_size": "205/55 R16", "tire2_brand": "Pirelli", "tire2_mevsim": "Kış",
+                "tire3_size": "225/45 R17", "tire4_size": "225/45 R17",
+            })
+            assert response.status_code == 201, response.text
+        yield client
+
+
+@pytest.fixture
+def page_statements():
+    """SELECT statements run by the web pages (async engine) during the test"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("path", PAGES)
+def test_search_page_query_count(client, page_statements, path):
+    # Isınma: referans önbelleği / müşteri indeksi ilk istekte yüklenir
+    client.get("/lastik-ara?seri_no=0")
+    page_statements.clear()
+
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert "Şükrü Çelik" in response.text
+    assert 1 <= len(page_statements) <= MAX_SELECTS_PER_PAGE, page_statements
@@ -0,0 +1,68 @@
+"""
+Rack active tire counter with expired Tire attributes.
+
+commit sonrası (expire_on_commit) veya elle expire edilmiş raf_id / durum değiştirildiğinde
+eski değer history'de bulunmalı; yoksa eski raf azaltılmaz ve sayaç kayar.
+"""
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.models.database import SessionLocal
+from app.models.models import Rack, Tire, TireDurumEnum
+
+
+_sequence = itertools.count(1)
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def tire_id(client):
+    n = next(_sequence)
+    racks = client.post("/api/racks/bulk", json={"raf_adi": f"R{n}", "sayi": 2}).json()
+    customer = client.post("/api/customers/", json={
+        "ad_soyad": f"Sayaç Müşteri {n}", "telefon": f"053200000{n:02d}", "plaka": f"06 RC {n}"
+    }).json()
+    response = client.post("/api/tires/", json={
+        "musteri_id": customer["id"], "brand": "Michelin", "mevsim": "Yaz", "dis_durumu": "İyi",
+        "raf_id": racks[0]["id"], "tire1_size": "205/55 R16",
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _counts(db, *rack_ids):
+    db.expire_all()
+    return [db.get(Rack, rack_id).active_tire_count for rack_id in rack_ids]
+
+
+def test_move_expired_tire_updates_both_racks(tire_id):
+    with SessionLocal() as db:
+        tire = db.get(Tire, tire_id)
+        old_rack_id = tire.raf_id
+        new_rack_id = db.query(Rack.id).filter(Rack.active_tire_count == 0, Rack.id != old_rack_id).first()[0]
+        db.expire(tire)
+
+        tire.raf_id = new_rack_id
+        db.commit()
+
+        assert _counts(db, old_rack_id, new_rack_id) == [0, 1]
+
+
+def test_status_change_on_expired_tire_releases_rack(tire_id):
+    with SessionLocal() as db:
+        tire = db.get(Tire, tire_id)
+        rack_id = tire.raf_id
+        db.commit()  # expire_on_commit
+
+        tire.durum = TireDurumEnum.CIKTI
+        db.commit()
+
+        assert _counts(db, rack_id) == [0]